@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Local SQLite store for flattened questionnaire answers.
+
+generate_session_reports.py --store <db> loads every flattened response, its
+answers and the question catalog into a SQLite database, so ad-hoc questions can
+be answered with an indexed query instead of regenerating the report:
+
+    python3 answer_store.py answers.db sessions --participant +16501234567
+    python3 answer_store.py answers.db answers --link-id <linkId> --since 2025-03-01 --until 2025-04-01
+    python3 answer_store.py answers.db sql "SELECT questionnaire, COUNT(*) FROM responses GROUP BY 1"
+
+Responses are keyed by session and Questionnaire definition file (the stem of the
+definition, since two definitions may share a title) and upserted incrementally: a
+response whose content fingerprint is unchanged is left alone, and a changed one
+has its answers replaced. Responses are never deleted by a load. Authored times
+are stored as given and as UTC (``YYYY-MM-DDTHH:MM:SS``) for range queries.
+The query commands open the database read-only and never change it.
+
+Uses only the Python standard library.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import sqlite3
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    participants TEXT,
+    questionnaire_count INTEGER NOT NULL,
+    first_authored_utc TEXT
+);
+CREATE TABLE IF NOT EXISTS responses (
+    response_id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL REFERENCES sessions (session_id),
+    definition TEXT NOT NULL,
+    questionnaire TEXT NOT NULL,
+    subject TEXT,
+    authored TEXT,
+    authored_utc TEXT,
+    answer_count INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    UNIQUE (session_id, definition)
+);
+CREATE TABLE IF NOT EXISTS answers (
+    response_id INTEGER NOT NULL REFERENCES responses (response_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    link_id TEXT NOT NULL,
+    section TEXT,
+    question TEXT,
+    code TEXT,
+    display TEXT,
+    raw_value,
+    PRIMARY KEY (response_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS questions (
+    questionnaire TEXT NOT NULL,
+    link_id TEXT NOT NULL,
+    section TEXT,
+    question TEXT,
+    type TEXT,
+    choices TEXT,
+    PRIMARY KEY (questionnaire, link_id)
+);
+CREATE INDEX IF NOT EXISTS responses_subject ON responses (subject, authored_utc);
+CREATE INDEX IF NOT EXISTS responses_authored ON responses (authored_utc);
+CREATE INDEX IF NOT EXISTS responses_questionnaire ON responses (questionnaire, authored_utc);
+CREATE INDEX IF NOT EXISTS answers_link_id ON answers (link_id, response_id);
+"""
+
+ANSWER_QUERY = """
+SELECT r.session_id, r.subject, r.questionnaire, r.authored, r.authored_utc,
+       a.link_id, a.section, a.question, a.code, a.display, a.raw_value
+FROM answers AS a JOIN responses AS r ON r.response_id = a.response_id
+"""
+
+
+class StoreError(Exception):
+    """Raised when a database cannot be used as an answer store."""
+
+
+@dataclass
+class UpsertStats:
+    """Responses written by one :meth:`AnswerStore.upsert` call."""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    answers_written: int = 0
+
+
+def _store_value(value: Any) -> Any:
+    """Map a raw answer value onto a SQLite storage class."""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _utc_text(timestamp: Any) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return timestamp.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _fingerprint(
+    title: Optional[str], subject: Optional[str], authored: Optional[str], answers: Sequence[tuple]
+) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((title, subject, authored, answers)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class AnswerStore:
+    """A SQLite database of flattened responses with a small query API.
+
+    With ``read_only`` an existing database is opened in SQLite's read-only mode and
+    only its schema version is checked; otherwise the database is created as needed
+    and its tables are created or verified by the first :meth:`upsert`.
+    """
+
+    def __init__(self, path: Path, read_only: bool = False) -> None:
+        self.path = path
+        self.read_only = read_only
+        self._schema_ready = False
+        if read_only:
+            self.connection = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(str(path))
+        self.connection.row_factory = sqlite3.Row
+        if read_only:
+            self._check_schema_version()
+        else:
+            self.connection.execute("PRAGMA foreign_keys = ON")
+            self.connection.execute("PRAGMA journal_mode = WAL")
+
+    def __enter__(self) -> "AnswerStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def _schema_version_error(self, version: Any) -> StoreError:
+        return StoreError(
+            f"{self.path} has answer store schema version {version}, expected {SCHEMA_VERSION}; "
+            "delete it and load again."
+        )
+
+    def _check_schema_version(self) -> None:
+        if self.connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meta'").fetchone():
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        else:
+            row = None
+        if row is None:
+            raise StoreError(f"{self.path} is not an answer store; create it with generate_session_reports.py --store.")
+        if int(row["value"]) != SCHEMA_VERSION:
+            raise self._schema_version_error(row["value"])
+
+    def _ensure_schema(self) -> None:
+        if self._schema_ready:
+            return
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None:
+                self.connection.execute(
+                    "INSERT INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+                )
+            elif int(row["value"]) != SCHEMA_VERSION:
+                raise self._schema_version_error(row["value"])
+        self._schema_ready = True
+
+    def upsert(
+        self,
+        sessions: Mapping[str, Sequence[Any]],
+        question_catalog: Sequence[Mapping[str, Any]] = (),
+        timestamps: Optional[Mapping[str, Any]] = None,
+    ) -> UpsertStats:
+        """Insert or update the responses of ``sessions`` (session ID -> response bundles).
+
+        ``timestamps`` maps authored strings to parsed UTC times (see
+        ``collect_authored_timestamps``); without it no UTC times are stored.
+        """
+        if self.read_only:
+            raise StoreError(f"{self.path} was opened read-only.")
+        self._ensure_schema()
+        timestamps = timestamps or {}
+        stats = UpsertStats()
+        cursor = self.connection.cursor()
+        existing = {
+            (row["session_id"], row["definition"]): (row["response_id"], row["fingerprint"])
+            for row in cursor.execute("SELECT response_id, session_id, definition, fingerprint FROM responses")
+        }
+
+        with self.connection:
+            cursor.executemany(
+                """
+                INSERT INTO questions (questionnaire, link_id, section, question, type, choices)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (questionnaire, link_id) DO UPDATE SET
+                    section = excluded.section, question = excluded.question,
+                    type = excluded.type, choices = excluded.choices
+                """,
+                [
+                    (
+                        entry.get("Questionnaire"),
+                        entry.get("LinkId"),
+                        entry.get("Section"),
+                        entry.get("Question"),
+                        entry.get("Type"),
+                        entry.get("Possible Choices"),
+                    )
+                    for entry in question_catalog
+                ],
+            )
+
+            for session_id, bundles in sessions.items():
+                authored_utc = [_utc_text(timestamps.get(bundle.authored)) for bundle in bundles if bundle.authored]
+                authored_utc = [value for value in authored_utc if value is not None]
+                participants = sorted({bundle.subject for bundle in bundles if bundle.subject})
+                cursor.execute(
+                    """
+                    INSERT INTO sessions (session_id, participants, questionnaire_count, first_authored_utc)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (session_id) DO UPDATE SET
+                        participants = excluded.participants,
+                        questionnaire_count = excluded.questionnaire_count,
+                        first_authored_utc = excluded.first_authored_utc
+                    """,
+                    (session_id, "; ".join(participants) or None, len(bundles), min(authored_utc, default=None)),
+                )
+
+                for bundle in bundles:
+                    answers = [
+                        (
+                            position,
+                            answer.link_id,
+                            answer.section,
+                            answer.question,
+                            answer.code,
+                            answer.display,
+                            _store_value(answer.raw_value),
+                        )
+                        for position, answer in enumerate(bundle.answers)
+                    ]
+                    fingerprint = _fingerprint(bundle.title, bundle.subject, bundle.authored, answers)
+                    key = (session_id, bundle.questionnaire_id)
+                    previous = existing.get(key)
+                    if previous is not None and previous[1] == fingerprint:
+                        stats.unchanged += 1
+                        continue
+
+                    values = (
+                        bundle.title,
+                        bundle.subject,
+                        bundle.authored,
+                        _utc_text(timestamps.get(bundle.authored)) if bundle.authored else None,
+                        len(answers),
+                        fingerprint,
+                    )
+                    if previous is None:
+                        cursor.execute(
+                            """
+                            INSERT INTO responses
+                                (session_id, definition, questionnaire, subject, authored, authored_utc, answer_count,
+                                fingerprint)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                            """,
+                            key + values,
+                        )
+                        response_id = cursor.lastrowid
+                        stats.inserted += 1
+                    else:
+                        response_id = previous[0]
+                        cursor.execute(
+                            """
+                            UPDATE responses SET questionnaire = ?, subject = ?, authored = ?, authored_utc = ?,
+                                answer_count = ?, fingerprint = ?
+                            WHERE response_id = ?
+                            """,
+                            values + (response_id,),
+                        )
+                        cursor.execute("DELETE FROM answers WHERE response_id = ?", (response_id,))
+                        stats.updated += 1
+                    existing[key] = (response_id, fingerprint)
+
+                    cursor.executemany(
+                        """
+                        INSERT INTO answers (response_id, position, link_id, section, question, code, display, raw_value)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        [(response_id,) + answer for answer in answers],
+                    )
+                    stats.answers_written += len(answers)
+        return stats
+
+    def query(self, sql: str, parameters: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        """Run an arbitrary SQL query and return the rows as dictionaries."""
+        return [dict(row) for row in self.connection.execute(sql, parameters)]
+
+    def participants(self) -> List[Dict[str, Any]]:
+        """Every response subject with its response count and authored time range."""
+        return self.query(
+            """
+            SELECT subject, COUNT(DISTINCT session_id) AS sessions, COUNT(*) AS responses,
+                   MIN(authored_utc) AS first_authored_utc, MAX(authored_utc) AS last_authored_utc
+            FROM responses WHERE subject IS NOT NULL
+            GROUP BY subject ORDER BY subject
+            """
+        )
+
+    def sessions_for_participant(self, subject: str) -> List[Dict[str, Any]]:
+        """The responses of one participant, oldest first."""
+        return self.query(
+            """
+            SELECT session_id, questionnaire, definition, authored, authored_utc, answer_count
+            FROM responses WHERE subject = ?
+            ORDER BY authored_utc, session_id, questionnaire
+            """,
+            (subject,),
+        )
+
+    def answers(
+        self,
+        link_id: Optional[str] = None,
+        questionnaire: Optional[str] = None,
+        subject: Optional[str] = None,
+        session_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        question_like: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Answers matching every given filter, ordered by authored time.
+
+        ``since`` and ``until`` are UTC ISO dates or times (``until`` is exclusive);
+        ``question_like`` is an SQL ``LIKE`` pattern on the question text.
+        """
+        conditions: List[str] = []
+        parameters: List[Any] = []
+        for clause, value in (
+            ("a.link_id = ?", link_id),
+            ("r.questionnaire = ?", questionnaire),
+            ("r.subject = ?", subject),
+            ("r.session_id = ?", session_id),
+            ("r.authored_utc >= ?", since),
+            ("r.authored_utc < ?", until),
+            ("a.question LIKE ?", question_like),
+        ):
+            if value is not None:
+                conditions.append(clause)
+                parameters.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.query(f"{ANSWER_QUERY} {where} ORDER BY r.authored_utc, r.session_id, a.position", parameters)
+
+
+def write_rows(rows: Iterable[Mapping[str, Any]], output: Any = None) -> int:
+    """Write query rows as CSV (with a header) and return the row count."""
+    output = output or sys.stdout
+    writer: Optional[csv.DictWriter] = None
+    count = 0
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(output, fieldnames=list(row))
+            writer.writeheader()
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Query the ENGAGE-HF answer store (see generate_session_reports.py --store).")
+    parser.add_argument("database", type=Path, help="SQLite answer store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("participants", help="List participants with their response counts.")
+
+    sessions_parser = commands.add_parser("sessions", help="List the responses of one participant.")
+    sessions_parser.add_argument("--participant", required=True, help="Response subject, e.g. the phone number.")
+
+    answers_parser = commands.add_parser("answers", help="List answers matching the given filters.")
+    answers_parser.add_argument("--link-id", default=None, help="Questionnaire item linkId.")
+    answers_parser.add_argument("--questionnaire", default=None, help="Questionnaire title, e.g. KCCQ-12.")
+    answers_parser.add_argument("--participant", default=None, help="Response subject.")
+    answers_parser.add_argument("--session", default=None, help="Session ID.")
+    answers_parser.add_argument("--since", default=None, help="Earliest authored UTC date or time (inclusive).")
+    answers_parser.add_argument("--until", default=None, help="Latest authored UTC date or time (exclusive).")
+    answers_parser.add_argument("--question", default=None, help="SQL LIKE pattern on the question text.")
+
+    sql_parser = commands.add_parser("sql", help="Run a read-only SQL query.")
+    sql_parser.add_argument("statement", help="SELECT statement.")
+
+    args = parser.parse_args(argv)
+    if not args.database.is_file():
+        parser.error(f"{args.database} does not exist; create it with generate_session_reports.py --store.")
+
+    try:
+        store = AnswerStore(args.database, read_only=True)
+    except (StoreError, sqlite3.Error) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    with store:
+        if args.command == "participants":
+            rows = store.participants()
+        elif args.command == "sessions":
+            rows = store.sessions_for_participant(args.participant)
+        elif args.command == "answers":
+            rows = store.answers(
+                link_id=args.link_id,
+                questionnaire=args.questionnaire,
+                subject=args.participant,
+                session_id=args.session,
+                since=args.since,
+                until=args.until,
+                question_like=args.question,
+            )
+        else:
+            store.connection.execute("PRAGMA query_only = ON")
+            try:
+                rows = store.query(args.statement)
+            except sqlite3.Error as error:
+                print(f"Error: {error}", file=sys.stderr)
+                return 1
+        write_rows(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Benchmark the session report pipeline on synthetic exports.
+
+Generates (or reuses) a synthetic export of the requested size with
+generate_synthetic_export.py and runs every stage of generate_session_reports.py
+on it separately, through the same helpers the report uses: export indexing,
+question bank build, ingestion (reading and parsing response files), flattening,
+end-to-end collection, summary build, vitals trends, Excel write and CSV write.
+Each stage is timed (wall and CPU time) and, in a second traced run, profiled for
+its tracemalloc peak.
+
+The outputs of every stage are reduced to counts and SHA-256 digests and checked
+against the stored baselines in benchmark_baselines.json, together with a
+tolerance on wall time and peak memory. So that the committed baselines hold on
+any machine, wall times are stored relative to a fixed pure-Python calibration
+workload timed at the start of every run (see calibrate()); refresh them with
+--update-baselines after an intended change.
+
+Example: python3 benchmark_session_reports.py --sessions 10000 --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import hashlib
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# The report script imports pandas lazily; load it up front so no stage is charged for the import.
+import pandas  # noqa: F401
+
+import generate_session_reports as reports
+from export_index import index_export
+from generate_synthetic_export import generate_export
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINES = SCRIPT_DIR / "benchmark_baselines.json"
+
+# Regressions smaller than this are treated as noise, whatever the tolerance factor says.
+MIN_WALL_SECONDS_DELTA = 0.05
+MIN_PEAK_MB_DELTA = 1.0
+
+STAGES = ["index", "question_bank", "ingestion", "flattening", "collect", "summary", "vitals_trends", "excel", "csv"]
+
+
+@dataclass
+class StageResult:
+    """Measurements and result checks for one pipeline stage."""
+
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_mb: Optional[float] = None
+    results: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class PipelineState:
+    """Intermediate outputs handed from one stage to the next."""
+
+    root: Path
+    output_dir: Path
+    workers: int
+    streaming_excel: bool
+    export_index: Any = None
+    question_banks: List[Tuple[int, str, Path, Dict[str, reports.QuestionInfo]]] = field(default_factory=list)
+    documents: List[Tuple[int, str, Any]] = field(default_factory=list)
+    sessions: Dict[str, List[reports.QuestionnaireResponseBundle]] = field(default_factory=dict)
+    question_catalog: List[Dict[str, Any]] = field(default_factory=list)
+    summary_df: Any = None
+    vitals_trends: Any = None
+    timestamps: Dict[str, Any] = field(default_factory=dict)
+
+
+def digest_sessions(sessions: Dict[str, List[reports.QuestionnaireResponseBundle]]) -> Dict[str, Any]:
+    hasher = hashlib.sha256()
+    answers = 0
+    for session_id in sorted(sessions):
+        for bundle in sessions[session_id]:
+            hasher.update(repr((session_id, bundle.title, bundle.authored, bundle.subject)).encode())
+            for answer in bundle.answers:
+                answers += 1
+                hasher.update(repr((answer.link_id, answer.code, answer.display, answer.raw_value)).encode())
+    return {"sessions": len(sessions), "answers": answers, "sha256": hasher.hexdigest()}
+
+
+def stage_index(state: PipelineState) -> Dict[str, Any]:
+    state.export_index = index_export(state.root)
+    return {
+        "definitions": len(state.export_index.definitions),
+        "response_files": sum(len(paths) for paths in state.export_index.response_folders.values()),
+    }
+
+
+def stage_question_bank(state: PipelineState) -> Dict[str, Any]:
+    entries = [
+        (priority, title, q_path, reports.build_question_bank(questionnaire, title))
+        for priority, title, q_path, _data, questionnaire in reports.read_questionnaire_definitions(
+            state.export_index.definitions
+        )
+    ]
+    entries.sort(key=lambda entry: (entry[0], entry[1]))
+    state.question_banks = entries
+    return {"questionnaires": len(entries), "questions": sum(len(entry[3]) for entry in entries)}
+
+
+def stage_ingestion(state: PipelineState) -> Dict[str, Any]:
+    # The file reads and JSON parsing read_and_flatten does, over the files the export index lists.
+    documents = []
+    total_bytes = 0
+    for entry_index, (_priority, _title, q_path, _bank) in enumerate(state.question_banks):
+        for response_path in state.export_index.response_folders.get(q_path.stem, []):
+            data = response_path.read_bytes()
+            total_bytes += len(data)
+            documents.append((entry_index, response_path.stem, json.loads(data)))
+    state.documents = documents
+    return {"files": len(documents), "bytes": total_bytes}
+
+
+def stage_flattening(state: PipelineState) -> Dict[str, Any]:
+    sessions: Dict[str, List[reports.QuestionnaireResponseBundle]] = defaultdict(list)
+    for entry_index, session_id, document in state.documents:
+        _priority, title, _q_path, bank = state.question_banks[entry_index]
+        sessions[session_id].append(reports.flatten_response(document, title, bank))
+    state.sessions = sessions
+    return digest_sessions(sessions)
+
+
+def stage_collect(state: PipelineState) -> Dict[str, Any]:
+    sessions, question_catalog = reports.collect_questionnaire_data(
+        state.root, workers=state.workers, export_index=state.export_index
+    )
+    state.question_catalog = question_catalog
+    result = digest_sessions(sessions)
+    if result != digest_sessions(state.sessions):
+        raise AssertionError("collect_questionnaire_data disagrees with the staged ingestion and flattening")
+    state.sessions = sessions
+    return result
+
+
+def stage_summary(state: PipelineState) -> Dict[str, Any]:
+    state.timestamps = reports.collect_authored_timestamps(state.sessions)
+    state.summary_df = reports.build_summary_dataframe(state.sessions, state.question_catalog, state.timestamps)
+    state.summary_df = reports.add_kccq12_scores(state.summary_df, state.sessions)
+    csv_text = state.summary_df.to_csv(index=False)
+    return {
+        "rows": int(state.summary_df.shape[0]),
+        "columns": int(state.summary_df.shape[1]),
+        "sha256": hashlib.sha256(csv_text.encode("utf-8")).hexdigest(),
+    }
+
+
+def stage_vitals_trends(state: PipelineState) -> Dict[str, Any]:
+    from vitals_trends import build_vitals_trends
+
+    state.vitals_trends = build_vitals_trends(state.sessions, state.timestamps)
+    csv_text = state.vitals_trends.to_csv(index=False)
+    return {
+        "rows": int(state.vitals_trends.shape[0]),
+        "sha256": hashlib.sha256(csv_text.encode("utf-8")).hexdigest(),
+    }
+
+
+def stage_excel(state: PipelineState) -> Dict[str, Any]:
+    excel_path = state.output_dir / "session_reports.xlsx"
+    writer = reports.write_excel_report_streaming if state.streaming_excel else reports.write_excel_report
+    writer(excel_path, state.summary_df, state.sessions, state.question_catalog, state.timestamps, state.vitals_trends)
+    # Workbook bytes embed a creation time, so only the sheet count is compared.
+    extra_sheets = (1 if state.question_catalog else 0) + (0 if state.vitals_trends.empty else 1)
+    return {"sheets": len(state.sessions) + 1 + extra_sheets}
+
+
+def stage_csv(state: PipelineState) -> Dict[str, Any]:
+    csv_path = state.output_dir / "session_summary.csv"
+    reports.write_csv_summary(csv_path, state.summary_df)
+    return {"sha256": hashlib.sha256(csv_path.read_bytes()).hexdigest()}
+
+
+STAGE_FUNCTIONS: Dict[str, Callable[[PipelineState], Dict[str, Any]]] = {
+    "index": stage_index,
+    "question_bank": stage_question_bank,
+    "ingestion": stage_ingestion,
+    "flattening": stage_flattening,
+    "collect": stage_collect,
+    "summary": stage_summary,
+    "vitals_trends": stage_vitals_trends,
+    "excel": stage_excel,
+    "csv": stage_csv,
+}
+
+
+CALIBRATION_ROUNDS = 5
+
+
+def _calibration_workload() -> int:
+    # JSON round trips, hashing and sorting of small records: the kind of work the report does.
+    records = [{"linkId": f"item-{index}", "answer": [{"valueCoding": {"code": str(index % 7)}}]} for index in range(20000)]
+    text = json.dumps(records)
+    parsed = json.loads(text)
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return len(sorted(record["linkId"] for record in parsed)) + len(digest)
+
+
+def calibrate() -> float:
+    """Return the fastest of a few timings of a fixed workload; stage times are stored relative to it."""
+    timings = []
+    for _round in range(CALIBRATION_ROUNDS):
+        gc.collect()
+        start = time.perf_counter()
+        _calibration_workload()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_stage(name: str, state: PipelineState, measure_memory: bool) -> StageResult:
+    function = STAGE_FUNCTIONS[name]
+    stage = StageResult(name=name)
+
+    gc.collect()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    stage.results = function(state)
+    stage.cpu_seconds = time.process_time() - cpu_start
+    stage.wall_seconds = time.perf_counter() - wall_start
+
+    if measure_memory:
+        # Repeat the stage under tracemalloc so tracing overhead does not skew the timings.
+        gc.collect()
+        tracemalloc.start()
+        try:
+            function(state)
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        stage.peak_mb = peak / (1024 * 1024)
+    return stage
+
+
+def scenario_key(args: argparse.Namespace) -> str:
+    excel = "skip" if args.skip_excel else ("streaming" if args.streaming_excel else "pandas")
+    return (
+        f"sessions={args.sessions} participants={args.participants or 'auto'} seed={args.seed}"
+        f" workers={args.workers} excel={excel}"
+    )
+
+
+def compare_with_baseline(
+    stages: List[StageResult],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    calibration_seconds: float,
+) -> List[str]:
+    """Return a description of every result mismatch or performance regression.
+
+    Baseline wall times are ratios to the calibration workload, scaled by this machine's
+    ``calibration_seconds`` before comparing.
+    """
+    problems: List[str] = []
+    for stage in stages:
+        expected = baseline.get(stage.name)
+        if expected is None:
+            problems.append(f"{stage.name}: no baseline recorded")
+            continue
+        if expected.get("results") != stage.results:
+            problems.append(f"{stage.name}: results {stage.results} differ from baseline {expected.get('results')}")
+        baseline_wall = expected["wall_ratio"] * calibration_seconds if expected.get("wall_ratio") else None
+        if (
+            baseline_wall
+            and stage.wall_seconds > baseline_wall * tolerance
+            and stage.wall_seconds - baseline_wall > MIN_WALL_SECONDS_DELTA
+        ):
+            problems.append(
+                f"{stage.name}: wall time {stage.wall_seconds:.3f}s exceeds baseline {baseline_wall:.3f}s x {tolerance}"
+            )
+        baseline_peak = expected.get("peak_mb")
+        if (
+            baseline_peak
+            and stage.peak_mb is not None
+            and stage.peak_mb > baseline_peak * tolerance
+            and stage.peak_mb - baseline_peak > MIN_PEAK_MB_DELTA
+        ):
+            problems.append(
+                f"{stage.name}: peak memory {stage.peak_mb:.1f} MB exceeds baseline {baseline_peak:.1f} MB x {tolerance}"
+            )
+    return problems
+
+
+def print_table(stages: List[StageResult]) -> None:
+    print(f"{'stage':<14} {'wall (s)':>10} {'cpu (s)':>10} {'peak (MB)':>10}")
+    for stage in stages:
+        peak = f"{stage.peak_mb:10.1f}" if stage.peak_mb is not None else f"{'-':>10}"
+        print(f"{stage.name:<14} {stage.wall_seconds:10.3f} {stage.cpu_seconds:10.3f} {peak}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the ENGAGE-HF session report pipeline.")
+    parser.add_argument("--sessions", type=int, default=1000, help="Number of synthetic calls (default: 1000).")
+    parser.add_argument("--participants", type=int, default=None, help="Number of participants (default: sessions / 10).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the synthetic export (default: 0).")
+    parser.add_argument(
+        "--export-dir",
+        type=Path,
+        default=None,
+        help="Reuse or create the synthetic export here instead of a temporary directory.",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for the collect stage.")
+    parser.add_argument("--streaming-excel", action="store_true", help="Benchmark the constant-memory Excel writer.")
+    parser.add_argument("--skip-excel", action="store_true", help="Skip the Excel stage (useful for very large runs).")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced run that measures peak memory.")
+    parser.add_argument("--baselines", type=Path, default=DEFAULT_BASELINES, help="Baseline file to check against.")
+    parser.add_argument("--update-baselines", action="store_true", help="Record this run as the baseline.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=2.0,
+        help="Allowed factor over the baseline wall time and peak memory (default: 2.0).",
+    )
+    parser.add_argument("--report", type=Path, default=None, help="Write the measurements as JSON to this path.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="engage-hf-bench-") as scratch:
+        scratch_dir = Path(scratch)
+        export_dir = args.export_dir or (scratch_dir / "export")
+        if not any(export_dir.glob("*.json")):
+            print(f"Generating {args.sessions} synthetic sessions in {export_dir} ...")
+            generate_export(export_dir, sessions=args.sessions, participants=args.participants, seed=args.seed)
+
+        calibration_seconds = calibrate()
+        state = PipelineState(
+            root=export_dir,
+            output_dir=scratch_dir / "output",
+            workers=args.workers,
+            streaming_excel=args.streaming_excel,
+        )
+        stage_names = [name for name in STAGES if not (args.skip_excel and name == "excel")]
+        stages = [run_stage(name, state, measure_memory=not args.no_memory) for name in stage_names]
+
+    print_table(stages)
+    print(f"calibration: {calibration_seconds:.3f}s")
+    key = scenario_key(args)
+    measurements = {
+        stage.name: {
+            "wall_seconds": round(stage.wall_seconds, 4),
+            "cpu_seconds": round(stage.cpu_seconds, 4),
+            "wall_ratio": round(stage.wall_seconds / calibration_seconds, 3),
+            "peak_mb": round(stage.peak_mb, 2) if stage.peak_mb is not None else None,
+            "results": stage.results,
+        }
+        for stage in stages
+    }
+    if args.report is not None:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(
+            json.dumps(
+                {"scenario": key, "calibration_seconds": round(calibration_seconds, 4), "stages": measurements},
+                indent=2,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+
+    baselines: Dict[str, Any] = {}
+    if args.baselines.is_file():
+        baselines = json.loads(args.baselines.read_text(encoding="utf-8"))
+
+    if args.update_baselines:
+        # Absolute timings only hold on this machine, so the committed baseline keeps the ratios.
+        baselines[key] = {
+            name: {field_name: values[field_name] for field_name in ("wall_ratio", "peak_mb", "results")}
+            for name, values in measurements.items()
+        }
+        args.baselines.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Recorded baseline '{key}' in {args.baselines}")
+        return 0
+
+    if key not in baselines:
+        print(f"No baseline for '{key}'; run with --update-baselines to record one.")
+        return 0
+
+    problems = compare_with_baseline(stages, baselines[key], args.tolerance, calibration_seconds)
+    for problem in problems:
+        print(f"REGRESSION {problem}", file=sys.stderr)
+    if problems:
+        return 1
+    print(f"All stages match baseline '{key}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
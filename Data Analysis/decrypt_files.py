@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Decrypt the AES-GCM encrypted session export.
+
+The voice service encrypts every questionnaire response and call recording with
+AES-GCM (CryptoKit's combined format: 12-byte nonce, ciphertext, 16-byte tag).
+This tool mirrors the folder layout of the export (``vital_signs``,
+``kccq12_questionnairs``, ``q17``, ``recordings``) into an output directory,
+decrypting files across a pool of worker processes. Each worker sets up the key
+once and streams every file through AES-GCM in fixed-size chunks into a temporary
+file, which only replaces the output once the authentication tag has been
+verified. Outputs that are at least as new as their source are skipped using a
+single ``os.scandir`` walk of each tree.
+
+Recordings make up most of the export's bytes. With ``--audio-format flac`` the
+workers re-encode each verified recording losslessly as FLAC, and with
+``--analysis-dir`` they also write a 16-bit copy decimated to ``--analysis-rate``
+Hz (see ``recording_audio.py``).
+
+Requires the cryptography package ("pip install cryptography"); FLAC output also
+requires soundfile ("pip install soundfile") and analysis copies numpy.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import binascii
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT_DIR = SCRIPT_DIR.parent / "Decrypted Sessions"
+
+FOLDERS = ["vital_signs", "kccq12_questionnairs", "q17", "recordings"]
+RECORDINGS_FOLDER = "recordings"
+ENCRYPTED_SUFFIXES = (".json", ".wav")
+DECRYPTED_SUFFIXES = (".json", ".wav", ".flac")
+
+NONCE_SIZE = 12
+TAG_SIZE = 16
+KEY_SIZE = 32
+CHUNK_SIZE = 1 << 20
+
+# Mirrors recording_audio, which is only imported when a recording option is used.
+AUDIO_FORMATS = ("wav", "flac")
+DEFAULT_ANALYSIS_RATE = 8000
+
+
+class DecryptionError(Exception):
+    """Raised when an encrypted payload cannot be decrypted."""
+
+
+@dataclass(frozen=True)
+class RecordingOptions:
+    """How decrypted recordings are written."""
+
+    audio_format: str = "wav"
+    analysis_dir: Optional[Path] = None
+    analysis_rate: int = DEFAULT_ANALYSIS_RATE
+
+
+@dataclass
+class DecryptionJob:
+    """A single file to decrypt, with the analysis copy to write for recordings."""
+
+    source: Path
+    destination: Path
+    analysis_destination: Optional[Path] = None
+
+
+@dataclass
+class DecryptionPlan:
+    """Files to decrypt plus the counts reported at the end of a run."""
+
+    jobs: List[DecryptionJob]
+    total_files: int
+    skipped_files: int
+    missing_folders: List[str]
+
+
+def _require_aesgcm() -> Any:
+    try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ImportError as error:
+        raise SystemExit(
+            "Error: Python cryptography library is required.\nInstall it with: pip3 install cryptography"
+        ) from error
+    return AESGCM
+
+
+def decode_key(key_base64: str) -> bytes:
+    """Decode a base64 encryption key, validating it the way the voice service does."""
+    try:
+        key = base64.b64decode(key_base64, validate=True)
+    except (binascii.Error, ValueError) as error:
+        raise DecryptionError(f"Encryption key is not valid base64: {error}") from error
+    if len(key) != KEY_SIZE:
+        raise DecryptionError(f"Encryption key must be {KEY_SIZE} bytes, got {len(key)}.")
+    return key
+
+
+def create_cipher(key: bytes) -> Any:
+    """Return an ``AESGCM`` instance for ``key``."""
+    return _require_aesgcm()(key)
+
+
+def decrypt_payload(cipher: Any, data: bytes) -> bytes:
+    """Decrypt a combined ``nonce || ciphertext || tag`` payload and verify its tag."""
+    if len(data) < NONCE_SIZE + TAG_SIZE:
+        raise DecryptionError("File too small to be valid AES-GCM encrypted data")
+    from cryptography.exceptions import InvalidTag
+
+    try:
+        return cipher.decrypt(data[:NONCE_SIZE], data[NONCE_SIZE:], None)
+    except InvalidTag as error:
+        raise DecryptionError("Authentication tag mismatch (wrong key or corrupted file)") from error
+
+
+def create_stream_key(key: bytes) -> Any:
+    """Return the AES key object :func:`decrypt_stream` builds each file's GCM context from."""
+    _require_aesgcm()
+    from cryptography.hazmat.primitives.ciphers import algorithms
+
+    return algorithms.AES(key)
+
+
+def iter_decrypt_stream(
+    stream_key: Any,
+    source: BinaryIO,
+    size: int,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[memoryview]:
+    """Decrypt a combined payload of ``size`` bytes from ``source``, yielding the plaintext in chunks.
+
+    Each chunk is a view of a reused buffer and is only valid until the next one is
+    requested. The tag at the end of the payload is verified after the last chunk, so
+    nothing derived from the chunks may be trusted until the iterator is exhausted;
+    a mismatch raises :class:`DecryptionError` at that point.
+    """
+    if size < NONCE_SIZE + TAG_SIZE:
+        raise DecryptionError("File too small to be valid AES-GCM encrypted data")
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers import Cipher, modes
+
+    nonce = source.read(NONCE_SIZE)
+    source.seek(size - TAG_SIZE)
+    tag = source.read(TAG_SIZE)
+    source.seek(NONCE_SIZE)
+    decryptor = Cipher(stream_key, modes.GCM(nonce, tag)).decryptor()
+
+    remaining = size - NONCE_SIZE - TAG_SIZE
+    buffer = memoryview(bytearray(max(1, min(chunk_size, remaining))))
+    # update_into needs room for one block beyond the input.
+    output = memoryview(bytearray(len(buffer) + 15))
+    while remaining:
+        read = source.readinto(buffer[:min(len(buffer), remaining)])
+        if not read:
+            raise DecryptionError("File truncated while decrypting")
+        yield output[:decryptor.update_into(buffer[:read], output)]
+        remaining -= read
+    try:
+        tail = decryptor.finalize()
+    except InvalidTag as error:
+        raise DecryptionError("Authentication tag mismatch (wrong key or corrupted file)") from error
+    if tail:
+        yield memoryview(tail)
+
+
+def decrypt_stream(
+    stream_key: Any,
+    source: BinaryIO,
+    size: int,
+    destination: BinaryIO,
+    chunk_size: int = CHUNK_SIZE,
+) -> None:
+    """Decrypt a combined payload of ``size`` bytes from ``source`` into ``destination`` in chunks.
+
+    Plaintext is written before the tag at the end of the payload is verified, so when
+    this raises the caller must discard everything written to ``destination``.
+    """
+    for chunk in iter_decrypt_stream(stream_key, source, size, chunk_size):
+        destination.write(chunk)
+
+
+def iter_encrypted_files(
+    folder: Path,
+    suffixes: Tuple[str, ...] = ENCRYPTED_SUFFIXES,
+) -> Iterator[Tuple[str, os.DirEntry]]:
+    """Yield ``(relative_path, entry)`` for every file below ``folder`` ending in one of ``suffixes``."""
+    stack: List[Tuple[str, str]] = [(str(folder), "")]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    relative = f"{prefix}{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, f"{relative}/"))
+                    elif entry.name.endswith(suffixes) and entry.is_file():
+                        yield relative, entry
+        except FileNotFoundError:
+            continue
+
+
+def _output_mtimes(folder: Path) -> Dict[str, int]:
+    # Whole-second mtimes, matching the comparison the shell script used to make.
+    return {
+        relative: int(entry.stat().st_mtime) for relative, entry in iter_encrypted_files(folder, DECRYPTED_SUFFIXES)
+    }
+
+
+def _recording_is_current(
+    existing: Mapping[str, int], dest_folder: Path, relative: str, source_mtime: int, audio_format: str
+) -> bool:
+    """Whether the decrypted recording ``relative`` exists in ``audio_format`` and is up to date.
+
+    In FLAC mode a WAV output only counts when its encoding has no lossless FLAC
+    equivalent, i.e. when it is the fallback :func:`decrypt_file` writes; a WAV left
+    over from a run in WAV mode is converted again.
+    """
+    if audio_format != "flac":
+        return existing.get(relative, -1) >= source_mtime
+    if existing.get(relative[: -len(".wav")] + ".flac", -1) >= source_mtime:
+        return True
+    if existing.get(relative, -1) < source_mtime:
+        return False
+    from recording_audio import AudioConversionError, flac_compatible
+
+    try:
+        return not flac_compatible(dest_folder / relative)
+    except AudioConversionError:
+        return False
+
+
+def plan_decryption(
+    source_dir: Path,
+    output_dir: Path,
+    folders: Sequence[str] = FOLDERS,
+    recording_options: RecordingOptions = RecordingOptions(),
+) -> DecryptionPlan:
+    """Collect the files that need decrypting, skipping outputs that are up to date.
+
+    A recording is only skipped when its analysis copy (if requested) is up to date too.
+    """
+    jobs: List[DecryptionJob] = []
+    total_files = 0
+    skipped_files = 0
+    missing_folders: List[str] = []
+
+    for folder in folders:
+        source_folder = source_dir / folder
+        if not source_folder.is_dir():
+            missing_folders.append(folder)
+            continue
+        dest_folder = output_dir / folder
+        existing = _output_mtimes(dest_folder)
+
+        analysis_folder: Optional[Path] = None
+        existing_analysis: Dict[str, int] = {}
+        if folder == RECORDINGS_FOLDER and recording_options.analysis_dir is not None:
+            analysis_folder = recording_options.analysis_dir / folder
+            existing_analysis = _output_mtimes(analysis_folder)
+
+        for relative, entry in sorted(iter_encrypted_files(source_folder), key=lambda item: item[0]):
+            total_files += 1
+            source_mtime = int(entry.stat().st_mtime)
+            is_recording = folder == RECORDINGS_FOLDER and relative.endswith(".wav")
+            if is_recording:
+                current = _recording_is_current(
+                    existing, dest_folder, relative, source_mtime, recording_options.audio_format
+                )
+            else:
+                current = existing.get(relative, -1) >= source_mtime
+            if current and (analysis_folder is None or existing_analysis.get(relative, -1) >= source_mtime):
+                skipped_files += 1
+                continue
+            destination = dest_folder / relative
+            if is_recording and recording_options.audio_format == "flac":
+                destination = destination.with_suffix(".flac")
+            jobs.append(
+                DecryptionJob(
+                    source=Path(entry.path),
+                    destination=destination,
+                    analysis_destination=analysis_folder / relative if analysis_folder is not None else None,
+                )
+            )
+
+    return DecryptionPlan(
+        jobs=jobs,
+        total_files=total_files,
+        skipped_files=skipped_files,
+        missing_folders=missing_folders,
+    )
+
+
+# Key and recording options shared by the jobs of one worker process.
+_WORKER_STREAM_KEY: Any = None
+_WORKER_OPTIONS = RecordingOptions()
+
+
+def _init_decrypt_worker(key: bytes, recording_options: RecordingOptions = RecordingOptions()) -> None:
+    global _WORKER_STREAM_KEY, _WORKER_OPTIONS
+    _WORKER_STREAM_KEY = create_stream_key(key)
+    _WORKER_OPTIONS = recording_options
+
+
+def decrypt_file(stream_key: Any, job: DecryptionJob, recording_options: RecordingOptions = RecordingOptions()) -> Path:
+    """Decrypt ``job`` and write its outputs; returns the path the decrypted file was written to.
+
+    Nothing is written unless the authentication tag verifies. Recordings are re-encoded
+    from the verified temporary WAV; encodings FLAC cannot hold losslessly stay WAV. A
+    copy of the recording left in the other format by an earlier run is removed.
+    """
+    job.destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = job.destination.with_name(f".{job.source.name}.tmp")
+    converted_tmp = job.destination.with_name(f".{job.destination.name}.converted.tmp")
+    analysis_tmp = None
+    if job.analysis_destination is not None:
+        job.analysis_destination.parent.mkdir(parents=True, exist_ok=True)
+        analysis_tmp = job.analysis_destination.with_name(f".{job.analysis_destination.name}.tmp")
+
+    try:
+        with job.source.open("rb") as source, tmp_path.open("wb") as output:
+            decrypt_stream(stream_key, source, os.fstat(source.fileno()).st_size, output)
+
+        is_recording = job.source.suffix == ".wav"
+        if analysis_tmp is not None:
+            if is_recording:
+                from recording_audio import write_analysis_copy
+
+                write_analysis_copy(tmp_path, analysis_tmp, recording_options.analysis_rate)
+            else:
+                shutil.copyfile(tmp_path, analysis_tmp)
+            os.replace(analysis_tmp, job.analysis_destination)
+
+        destination = job.destination
+        if destination.suffix == ".flac":
+            from recording_audio import write_flac
+
+            if not write_flac(tmp_path, converted_tmp):
+                destination = destination.with_suffix(".wav")
+        os.replace(converted_tmp if destination.suffix == ".flac" else tmp_path, destination)
+        if is_recording:
+            stale = destination.with_suffix(".wav" if destination.suffix == ".flac" else ".flac")
+            if stale.is_file():
+                stale.unlink()
+        return destination
+    finally:
+        for leftover in (tmp_path, converted_tmp, analysis_tmp):
+            if leftover is not None and os.path.lexists(leftover):
+                os.unlink(leftover)
+
+
+def _decrypt_job(job: DecryptionJob) -> Tuple[Optional[str], int]:
+    """Return the error message (or ``None``) and the number of bytes written."""
+    try:
+        destination = decrypt_file(_WORKER_STREAM_KEY, job, _WORKER_OPTIONS)
+        return None, destination.stat().st_size
+    except (DecryptionError, OSError, ValueError) as error:
+        # ValueError covers recording_audio.AudioConversionError.
+        return f"Failed to decrypt {job.source}: {error}", 0
+
+
+@dataclass
+class DecryptionResult:
+    """Outcome of :func:`run_decryption`."""
+
+    errors: List[str]
+    bytes_written: int
+
+
+def run_decryption(
+    key: bytes,
+    jobs: Sequence[DecryptionJob],
+    workers: int = 1,
+    verbose: bool = False,
+    recording_options: RecordingOptions = RecordingOptions(),
+) -> DecryptionResult:
+    """Decrypt ``jobs``; returns the error message of every failed file and the bytes written."""
+    result = DecryptionResult(errors=[], bytes_written=0)
+    if not jobs:
+        return result
+
+    if workers > 1 and len(jobs) > 1:
+        chunksize = max(1, len(jobs) // (workers * 8))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_decrypt_worker,
+            initargs=(key, recording_options),
+        ) as executor:
+            outcomes = executor.map(_decrypt_job, jobs, chunksize=chunksize)
+            for job, outcome in zip(jobs, outcomes):
+                _report(job, outcome, result, verbose)
+    else:
+        _init_decrypt_worker(key, recording_options)
+        for job in jobs:
+            _report(job, _decrypt_job(job), result, verbose)
+    return result
+
+
+def _report(job: DecryptionJob, outcome: Tuple[Optional[str], int], result: DecryptionResult, verbose: bool) -> None:
+    error, size = outcome
+    result.bytes_written += size
+    if error is not None:
+        result.errors.append(error)
+        print(error, file=sys.stderr)
+    elif verbose:
+        print(f"Decrypted: {job.source} -> {job.destination}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Decrypt the ENGAGE-HF AI Voice session export.")
+    # The key is not accepted as a value on the command line, where the process list and
+    # shell history would expose it.
+    parser.add_argument(
+        "--key-file",
+        type=Path,
+        default=None,
+        help="File holding the base64 encryption key (defaults to the ENCRYPTION_KEY environment variable).",
+    )
+    parser.add_argument(
+        "--source",
+        type=Path,
+        default=SCRIPT_DIR,
+        help="Directory containing the encrypted questionnaire and recording folders.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_OUTPUT_DIR,
+        help="Directory that receives the decrypted files.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (default: number of CPUs).",
+    )
+    parser.add_argument(
+        "--audio-format",
+        choices=AUDIO_FORMATS,
+        default="wav",
+        help="Write recordings as WAV (as exported) or losslessly compressed FLAC (requires soundfile).",
+    )
+    parser.add_argument(
+        "--analysis-dir",
+        type=Path,
+        help="Also write 16-bit recordings decimated to --analysis-rate Hz, with their metadata, to this directory.",
+    )
+    parser.add_argument(
+        "--analysis-rate",
+        type=int,
+        default=DEFAULT_ANALYSIS_RATE,
+        help=f"Target sample rate of the analysis copies (default: {DEFAULT_ANALYSIS_RATE}).",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Print every decrypted file.")
+    args = parser.parse_args(argv)
+
+    key_text: Optional[str] = os.environ.get("ENCRYPTION_KEY")
+    if args.key_file is not None:
+        try:
+            key_text = args.key_file.read_text(encoding="utf-8").strip()
+        except OSError as error:
+            parser.error(f"cannot read --key-file: {error}")
+    if not key_text:
+        parser.error("an encryption key is required (ENCRYPTION_KEY environment variable or --key-file).")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1.")
+    if args.analysis_rate < 1:
+        parser.error("--analysis-rate must be at least 1.")
+
+    _require_aesgcm()
+    if args.audio_format == "flac":
+        from recording_audio import require_soundfile
+
+        require_soundfile()
+    try:
+        key = decode_key(key_text)
+    except DecryptionError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    source_dir = args.source.resolve()
+    output_dir = args.output.resolve()
+    recording_options = RecordingOptions(
+        audio_format=args.audio_format,
+        analysis_dir=args.analysis_dir.resolve() if args.analysis_dir is not None else None,
+        analysis_rate=args.analysis_rate,
+    )
+
+    print("Starting decryption process...")
+    print(f"Source directory: {source_dir}")
+    print(f"Output directory: {output_dir}")
+    print("")
+
+    plan = plan_decryption(source_dir, output_dir, recording_options=recording_options)
+    for folder in plan.missing_folders:
+        print(f"Warning: Source folder '{source_dir / folder}' does not exist, skipping...")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    result = run_decryption(
+        key, plan.jobs, workers=args.workers, verbose=args.verbose, recording_options=recording_options
+    )
+    errors = result.errors
+
+    print("")
+    print("Decryption complete!")
+    print(f"Total files found: {plan.total_files}")
+    print(f"Successfully processed: {len(plan.jobs) - len(errors)}")
+    print(f"Skipped (already existed): {plan.skipped_files}")
+    print(f"Failed: {len(errors)}")
+    print(f"Bytes written: {result.bytes_written / 1e6:.1f} MB")
+
+    if errors:
+        print("Some files failed to decrypt. Check the error messages above.")
+        return 1
+
+    print(f"All files successfully decrypted to: {output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
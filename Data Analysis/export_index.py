@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Index a session export in a single directory walk.
+
+The voice service names every file after the call it belongs to: questionnaire
+responses are ``<prefix>.json`` in one folder per questionnaire, and recordings
+are ``<prefix>_<RecordingSid>.wav`` (``.flac`` once compressed by
+``decrypt_files.py``) with a ``<prefix>_<RecordingSid>.json`` metadata sidecar
+in ``recordings``. ``<prefix>`` is the first 16 hex digits of
+SHA-256 over the caller's phone number and the call date (or call time, in
+internal testing mode), so it identifies a session without opening any file.
+
+``index_export`` lists the export root and each of its folders exactly once with
+``os.scandir`` and builds a hash index from session prefix to the response files
+and recording SIDs of that session. Report generation and recording analytics
+both read their file lists from this index instead of globbing each folder.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+RECORDINGS_FOLDER = "recordings"
+# Recordings are WAV as exported; decrypt_files.py --audio-format flac writes FLAC instead.
+RECORDING_SUFFIXES = (".wav", ".flac")
+
+SESSION_PREFIX_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+RECORDING_SID_PATTERN = re.compile(r"^RE[0-9a-fA-F]{32}$")
+
+
+@dataclass
+class SessionFiles:
+    """Files of one session, keyed by questionnaire folder and recording SID."""
+
+    session_id: str
+    responses: Dict[str, Path] = field(default_factory=dict)
+    recordings: Dict[str, Path] = field(default_factory=dict)
+    recording_metadata: Dict[str, Path] = field(default_factory=dict)
+
+    @property
+    def recording_sids(self) -> List[str]:
+        return sorted(set(self.recordings) | set(self.recording_metadata))
+
+
+@dataclass
+class ExportIndex:
+    """Every file of an export, classified by folder and joined per session.
+
+    File lists are sorted by name, matching the order the report has always processed
+    response files in. ``unrecognised`` holds files whose names do not follow the
+    service's naming scheme (they are still indexed under their stem).
+    """
+
+    root: Path
+    definitions: List[Path] = field(default_factory=list)
+    response_folders: Dict[str, List[Path]] = field(default_factory=dict)
+    recordings: List[Path] = field(default_factory=list)
+    recording_metadata: List[Path] = field(default_factory=list)
+    sessions: Dict[str, SessionFiles] = field(default_factory=dict)
+    unrecognised: List[Path] = field(default_factory=list)
+
+    def session(self, session_id: str) -> SessionFiles:
+        files = self.sessions.get(session_id)
+        if files is None:
+            files = self.sessions[session_id] = SessionFiles(session_id)
+        return files
+
+
+def parse_session_name(stem: str) -> Tuple[str, Optional[str], bool]:
+    """Split a file stem into ``(session prefix, recording SID, follows naming scheme)``.
+
+    ``<prefix>`` yields no SID; ``<prefix>_<RecordingSid>`` yields the SID.
+    """
+    prefix, separator, sid = stem.partition("_")
+    if not separator:
+        return stem, None, bool(SESSION_PREFIX_PATTERN.match(stem))
+    recognised = bool(SESSION_PREFIX_PATTERN.match(prefix) and RECORDING_SID_PATTERN.match(sid))
+    return prefix, sid, recognised
+
+
+def _list_files(directory: str) -> List[Tuple[str, str]]:
+    """Return ``(name, path)`` for every visible regular file in ``directory``, sorted by name."""
+    files: List[Tuple[str, str]] = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.startswith(".") and entry.is_file():
+                    files.append((entry.name, entry.path))
+    except FileNotFoundError:
+        return []
+    files.sort()
+    return files
+
+
+def _scan_top_level(directory: Path) -> Tuple[List[Path], List[Tuple[str, str]]]:
+    """Return the visible JSON files and ``(name, path)`` of the folders directly in ``directory``."""
+    json_files: List[Path] = []
+    folders: List[Tuple[str, str]] = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    folders.append((entry.name, entry.path))
+                elif entry.name.endswith(".json") and entry.is_file():
+                    json_files.append(Path(entry.path))
+    except FileNotFoundError:
+        pass
+    json_files.sort()
+    folders.sort()
+    return json_files, folders
+
+
+def list_response_stems(folder: Path) -> List[str]:
+    """Return the sorted stems of the response files in one questionnaire folder.
+
+    A compact alternative to :func:`index_export` for callers that only need the session
+    order: one short string per file instead of ``Path`` objects and per-session records.
+    """
+    stems: List[str] = []
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not entry.name.startswith(".") and entry.name.endswith(".json") and entry.is_file():
+                    stems.append(entry.name[: -len(".json")])
+    except FileNotFoundError:
+        return []
+    stems.sort()
+    return stems
+
+
+def list_definitions(directory: Path) -> List[Path]:
+    """Return the candidate Questionnaire definition files directly inside ``directory``."""
+    return _scan_top_level(directory)[0]
+
+
+def index_export(root: Path) -> ExportIndex:
+    """Walk ``root`` once and index its definitions, responses and recordings."""
+    index = ExportIndex(root=root)
+    index.definitions, folders = _scan_top_level(root)
+
+    for folder, folder_path in folders:
+        if folder == RECORDINGS_FOLDER:
+            _index_recordings(index, folder_path)
+            continue
+        responses: List[Path] = []
+        for name, path in _list_files(folder_path):
+            if not name.endswith(".json"):
+                continue
+            response_path = Path(path)
+            responses.append(response_path)
+            session_id, _sid, recognised = parse_session_name(response_path.stem)
+            if not recognised:
+                index.unrecognised.append(response_path)
+            index.session(session_id).responses[folder] = response_path
+        index.response_folders[folder] = responses
+    return index
+
+
+def _index_recordings(index: ExportIndex, folder_path: str) -> None:
+    for name, path in _list_files(folder_path):
+        if not name.endswith((*RECORDING_SUFFIXES, ".json")):
+            continue
+        file_path = Path(path)
+        session_id, sid, recognised = parse_session_name(file_path.stem)
+        if not recognised:
+            index.unrecognised.append(file_path)
+        session = index.session(session_id)
+        if name.endswith(RECORDING_SUFFIXES):
+            index.recordings.append(file_path)
+            session.recordings[sid or ""] = file_path
+        else:
+            index.recording_metadata.append(file_path)
+            session.recording_metadata[sid or ""] = file_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarise how the files of a session export join up per session.")
+    parser.add_argument("root", type=Path, nargs="?", default=Path.cwd(), help="Export root directory.")
+    args = parser.parse_args()
+
+    index = index_export(args.root.resolve())
+    sessions = list(index.sessions.values())
+    joined = sum(1 for files in sessions if files.responses and files.recordings)
+    print(f"Questionnaire definitions: {len(index.definitions)}")
+    for folder, responses in index.response_folders.items():
+        print(f"{folder}: {len(responses)} responses")
+    print(f"{RECORDINGS_FOLDER}: {len(index.recordings)} recordings, {len(index.recording_metadata)} metadata files")
+    print(f"Sessions: {len(sessions)}")
+    print(f"Sessions with responses and recordings: {joined}")
+    print(f"Sessions with responses only: {sum(1 for files in sessions if files.responses) - joined}")
+    print(f"Sessions with recordings only: {sum(1 for files in sessions if files.recordings) - joined}")
+    missing_metadata = sum(1 for files in sessions for sid in files.recordings if sid not in files.recording_metadata)
+    print(f"Recordings without metadata: {missing_metadata}")
+    print(f"Files not following the naming scheme: {len(index.unrecognised)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,24 +14,63 @@ from the ENGAGE-HF Voice AI decrypted session export and produces:
 
 * An Excel workbook with a summary sheet plus one sheet per session.
 * A CSV summary mirroring the summary sheet.
+* Per-participant vitals trends over time, as a workbook sheet and a CSV
+  (see vitals_trends.py).
 
 Each per-session worksheet contains the responses from all available
 questionnaires (e.g., KCCQ-12, well-being comparison, vitals).
-
-The script requires pandas (with an Excel writer backend such as xlsxwriter or
-openpyxl). Install via "pip install pandas xlsxwriter" if needed.
+The summary also carries the KCCQ-12 domain and overall summary scores of each
+session (see kccq12_scoring.py).
+
+With --encrypted the responses are read straight from the encrypted export and
+decrypted in memory (see decrypt_files.py), so no plaintext copy is written.
+
+With --store the flattened answers and question catalog are also upserted into a
+local SQLite database for ad-hoc queries (see answer_store.py).
+
+All outputs are written from one shared, read-only ReportData built after
+flattening. --workers sets the number of processes for every parallel stage:
+flattening, recording analytics, shard workbooks and output writing. With
+--workers above 1 the Excel workbook is written in the main process while the
+CSV, --answers and --store outputs are written concurrently in worker processes,
+so writing takes about as long as the slowest output; with the default of 1
+every stage runs serially.
+
+The script requires Python 3.10+ and pandas (with an Excel writer backend such
+as xlsxwriter or openpyxl). Install via "pip install pandas xlsxwriter" if needed.
+pandas and xlsxwriter are only imported by the stages that need them: with
+--csv-only the workbook and vitals trends are skipped and the CSV summary (plus
+--answers as .csv and --store) is produced with the standard library alone,
+which keeps start-up short for frequent small runs. --streaming-csv goes further
+and writes the CSV summary one session at a time in bounded memory.
 """
 from __future__ import annotations
 
 import argparse
+import csv
+import hashlib
+import heapq
+import itertools
 import json
+import multiprocessing
+import os
+import pickle
 import re
+import sys
+import time
+import tracemalloc
 from collections import defaultdict
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from export_index import ExportIndex, index_export, list_definitions, list_response_stems
 
-import pandas as pd
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 SCRIPT_DIR = Path(__file__).resolve().parent
@@ -44,21 +83,63 @@ QUESTIONNAIRE_ORDER = [
 ]
 QUESTIONNAIRE_PRIORITY = {title: index for index, title in enumerate(QUESTIONNAIRE_ORDER)}
 
+VITALS_TRENDS_SHEET = "Vitals Trends"
 
-@dataclass
+
+@dataclass(slots=True)
 class QuestionInfo:
-    """Metadata about a single questionnaire item."""
+    """Metadata about a single questionnaire item.
+
+    The summary label, the choice string and the answer-code lookups are compiled once
+    when the item is created so flattening a response only needs dictionary lookups.
+    """
 
     link_id: str
     text: str
     section: str
     answer_map: Mapping[str, str]
     q_type: str
+    questionnaire: str = ""
+    label: str = field(init=False, repr=False)
+    choices: Optional[str] = field(init=False, repr=False)
+    code_lookup: Dict[str, str] = field(init=False, repr=False)
+    numeric_code_lookup: Dict[str, str] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.label = build_question_label(self.questionnaire, self.text, self.section, self.link_id)
+        self.choices = format_answer_choices(self.answer_map)
+        self.code_lookup = {code: code for code in self.answer_map}
+        # Numeric answers match codes by their string form, and integral floats also match
+        # the integer code (1.0 -> "1"), mirroring how numeric answers were reconciled before.
+        self.numeric_code_lookup = dict(self.code_lookup)
+        for code in self.answer_map:
+            try:
+                number = int(code)
+            except ValueError:
+                continue
+            if str(number) != code or int(float(number)) != number:
+                continue
+            self.numeric_code_lookup.setdefault(str(float(number)), code)
+            if number == 0:
+                self.numeric_code_lookup.setdefault("-0.0", code)
 
+    def lookup_code(self, value: Any) -> Optional[str]:
+        """Return the answer code matching ``value``, if any."""
+        if isinstance(value, str):
+            return self.code_lookup.get(value)
+        if isinstance(value, (int, float)):
+            return self.numeric_code_lookup.get(str(value))
+        return self.code_lookup.get(str(value))
 
-@dataclass
+
+@dataclass(slots=True)
 class AnswerRow:
-    """Flattened questionnaire response entry."""
+    """Flattened questionnaire response entry.
+
+    Slotted to keep full-history runs small: the text fields reference the strings of the
+    matching :class:`QuestionInfo`, and answer codes and displays are interned, so an answer
+    costs little more than its references.
+    """
 
     questionnaire: str
     link_id: str
@@ -68,17 +149,26 @@ class AnswerRow:
     display: Optional[str]
     raw_value: Any
     choices: Optional[str] = None
+    label: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class QuestionnaireResponseBundle:
-    """Container for a questionnaire response and its flattened answers."""
+    """Container for a questionnaire response and its flattened answers.
+
+    ``questionnaire_id`` names the Questionnaire definition file the response belongs to
+    (its stem, which is also the name of the folder the response was read from); unlike
+    ``title`` it is unique per definition. ``skipped_items`` counts the response items
+    whose linkId is not in the questionnaire definition and whose answers were therefore
+    dropped.
+    """
 
     questionnaire_id: str
     title: str
     authored: Optional[str]
     subject: Optional[str]
     answers: List[AnswerRow] = field(default_factory=list)
+    skipped_items: int = 0
 
 
 
@@ -97,7 +187,7 @@ def normalise_text(value: Optional[str]) -> str:
 CALL_TIMESTAMP_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}$")
 
 
-def parse_timestamp(value: Optional[str]) -> Optional[pd.Timestamp]:
+def _normalise_timestamp_text(value: Optional[str]) -> Optional[str]:
     if not value:
         return None
     value = value.strip()
@@ -108,6 +198,15 @@ def parse_timestamp(value: Optional[str]) -> Optional[pd.Timestamp]:
         date_part = "-".join(parts[:3])
         time_part = ":".join(parts[3:])
         value = f"{date_part}T{time_part}"
+    return value
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[pd.Timestamp]:
+    import pandas as pd
+
+    value = _normalise_timestamp_text(value)
+    if value is None:
+        return None
     timestamp = pd.to_datetime(value, errors="coerce", utc=True)
     if pd.isna(timestamp):
         return None
@@ -116,6 +215,80 @@ def parse_timestamp(value: Optional[str]) -> Optional[pd.Timestamp]:
     return timestamp
 
 
+TIMESTAMP_SHAPE_PATTERN = re.compile(r"\d")
+
+
+def parse_timestamps(values: Iterable[Optional[str]]) -> Dict[str, Optional[pd.Timestamp]]:
+    """Parse many timestamp strings at once with the same semantics as :func:`parse_timestamp`.
+
+    Distinct values are grouped by their digit-masked shape and each group is parsed in one
+    vectorized ISO 8601 call; grouping keeps strings with and without UTC offsets out of the
+    same call. Values the ISO parser rejects fall back to :func:`parse_timestamp`. Returns a
+    mapping from every distinct non-empty input to its UTC-naive timestamp (or ``None``).
+    """
+    import pandas as pd
+
+    groups: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+    result: Dict[str, Optional[pd.Timestamp]] = {}
+    for value in dict.fromkeys(values):
+        if not value:
+            continue
+        normalised = _normalise_timestamp_text(value)
+        if normalised is None:
+            result[value] = None
+            continue
+        groups[TIMESTAMP_SHAPE_PATTERN.sub("0", normalised)].append((value, normalised))
+
+    for entries in groups.values():
+        parsed = pd.to_datetime(
+            pd.Series([normalised for _value, normalised in entries], dtype=object),
+            errors="coerce",
+            utc=True,
+            format="ISO8601",
+        ).dt.tz_localize(None)
+        for (value, _normalised), timestamp in zip(entries, parsed):
+            result[value] = parse_timestamp(value) if pd.isna(timestamp) else timestamp
+    return result
+
+
+def collect_authored_timestamps(
+    sessions: Mapping[str, List[QuestionnaireResponseBundle]],
+) -> Dict[str, Optional[pd.Timestamp]]:
+    """Parse the authored value of every bundle in one batch."""
+    return parse_timestamps(bundle.authored for bundles in sessions.values() for bundle in bundles)
+
+
+def parse_iso_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO 8601 timestamp into a UTC-naive ``datetime`` with the standard library.
+
+    Matches :func:`parse_timestamp` for ISO 8601 input, which is all the voice service
+    writes; values only pandas' lenient parser understands yield ``None`` here.
+    """
+    value = _normalise_timestamp_text(value)
+    if value is None:
+        return None
+    if value[-1] in "Zz":
+        value = value[:-1] + "+00:00"
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def collect_authored_datetimes(
+    sessions: Mapping[str, List[QuestionnaireResponseBundle]],
+) -> Dict[str, Optional[datetime]]:
+    """Standard-library counterpart of :func:`collect_authored_timestamps`."""
+    return {
+        authored: parse_iso_timestamp(authored)
+        for authored in dict.fromkeys(bundle.authored for bundles in sessions.values() for bundle in bundles)
+        if authored
+    }
+
+
 def format_answer_choices(answer_map: Mapping[str, str]) -> Optional[str]:
     if not answer_map:
         return None
@@ -123,10 +296,10 @@ def format_answer_choices(answer_map: Mapping[str, str]) -> Optional[str]:
     return "; ".join(pairs)
 
 
-def build_answer_label(answer: AnswerRow) -> str:
-    questionnaire_name = normalise_text(answer.questionnaire)
-    question = normalise_text(answer.question)
-    section = normalise_text(answer.section)
+def build_question_label(questionnaire_title: str, question_text: str, section: str, link_id: Optional[str]) -> str:
+    questionnaire_name = normalise_text(questionnaire_title)
+    question = normalise_text(question_text)
+    section = normalise_text(section)
 
     parts: List[str] = []
     if questionnaire_name:
@@ -137,14 +310,20 @@ def build_answer_label(answer: AnswerRow) -> str:
     label = " | ".join(parts)
     if section and section not in label and section not in question:
         label = f"{label} ({section})" if label else section
-    if answer.link_id:
-        label = f"{label} [{answer.link_id}]"
+    if link_id:
+        label = f"{label} [{link_id}]"
 
     label = re.sub(r"[\r\n\t]", " ", label)
     label = re.sub(r"\s+", " ", label).strip()
     return label[:200]
 
 
+def build_answer_label(answer: AnswerRow) -> str:
+    if answer.label is not None:
+        return answer.label
+    return build_question_label(answer.questionnaire, answer.question, answer.section, answer.link_id)
+
+
 def build_metadata_label(questionnaire_title: str, descriptor: str, link_id: Optional[str] = None) -> str:
     title = normalise_text(questionnaire_title)
     label = f"{title} | {descriptor}" if title else descriptor
@@ -155,8 +334,14 @@ def build_metadata_label(questionnaire_title: str, descriptor: str, link_id: Opt
     return label[:200]
 
 
-def build_question_bank(questionnaire: Mapping[str, Any]) -> Dict[str, QuestionInfo]:
+def build_question_bank(questionnaire: Mapping[str, Any], title: Optional[str] = None) -> Dict[str, QuestionInfo]:
+    """Compile the answerable items of a Questionnaire definition, keyed by linkId.
+
+    ``title`` is the questionnaire name used in summary labels and defaults to the
+    definition's own title.
+    """
     bank: Dict[str, QuestionInfo] = {}
+    questionnaire_title = title if title is not None else questionnaire.get("title") or ""
 
     def walk(items: Sequence[Mapping[str, Any]], parents: List[str]) -> None:
         for item in items:
@@ -182,6 +367,7 @@ def build_question_bank(questionnaire: Mapping[str, Any]) -> Dict[str, QuestionI
                     section=section,
                     answer_map=answer_map,
                     q_type=item_type,
+                    questionnaire=questionnaire_title,
                 )
 
             child_parents = parents
@@ -219,178 +405,835 @@ def flatten_response(
     response: Mapping[str, Any],
     questionnaire_title: str,
     question_bank: Mapping[str, QuestionInfo],
+    questionnaire_id: Optional[str] = None,
 ) -> QuestionnaireResponseBundle:
     bundle = QuestionnaireResponseBundle(
-        questionnaire_id=questionnaire_title,
+        questionnaire_id=questionnaire_id or questionnaire_title,
         title=questionnaire_title,
         authored=response.get("authored"),
-        subject=(response.get("subject") or {}).get("reference"),
+        subject=_intern((response.get("subject") or {}).get("reference")),
     )
 
-    def walk(items: Sequence[Mapping[str, Any]], active_sections: List[str]) -> None:
+    def walk(items: Sequence[Mapping[str, Any]]) -> None:
         for item in items:
             link_id = item.get("linkId")
             question_info = question_bank.get(link_id)
-            section = question_info.section if question_info else " > ".join(active_sections)
-            question_text = question_info.text if question_info else link_id or "Unknown"
-
             if question_info is None:
                 # Skip answers for items not present in the reference questionnaire definition.
+                bundle.skipped_items += 1
                 continue
 
+            section = question_info.section
+            question_text = question_info.text
+            choices = question_info.choices
+            label = question_info.label if question_info.questionnaire == questionnaire_title else None
+
             for answer in item.get("answer", []):
-                value, coding_display = extract_answer_value(answer)
-                display = coding_display
+                value, display = extract_answer_value(answer)
+                if isinstance(value, str):
+                    value = sys.intern(value)
                 code: Optional[str] = None
 
                 if question_info.answer_map:
-                    key = str(value)
-                    if key in question_info.answer_map:
-                        display = question_info.answer_map[key]
-                        code = key
-                    else:
-                        # Attempt to handle numeric answers stored as ints vs. strings.
-                        if isinstance(value, (int, float)):
-                            key_num = str(int(value)) if isinstance(value, float) and value.is_integer() else str(value)
-                            if key_num in question_info.answer_map:
-                                display = question_info.answer_map[key_num]
-                                code = key_num
-                elif display is None and value is not None:
-                    display = str(value)
+                    code = question_info.lookup_code(value)
+                    if code is not None:
+                        display = question_info.answer_map[code]
 
                 if display is None and value is not None:
-                    display = str(value)
+                    display = sys.intern(str(value))
 
                 if code is None and value is not None and isinstance(value, str):
                     code = value
 
-                choices = format_answer_choices(question_info.answer_map) if question_info else None
-
                 bundle.answers.append(
                     AnswerRow(
                         questionnaire=questionnaire_title,
-                        link_id=link_id or "",
-                        question=question_text or link_id or "",
+                        link_id=question_info.link_id,
+                        question=question_text or question_info.link_id,
                         section=section,
                         code=code,
                         display=display,
                         raw_value=value,
                         choices=choices,
+                        label=label,
                     )
                 )
 
-            child_sections = active_sections
-            if question_text:
-                child_sections = [*active_sections, question_text]
             if "item" in item:
-                walk(item["item"], child_sections)
+                walk(item["item"])
 
-    walk(response.get("item", []), [])
+    walk(response.get("item", []))
     return bundle
 
-def collect_questionnaire_data(root: Path) -> Tuple[Dict[str, List[QuestionnaireResponseBundle]], List[Dict[str, Any]]]:
-    sessions: Dict[str, List[QuestionnaireResponseBundle]] = defaultdict(list)
-    question_catalog: List[Dict[str, Any]] = []
+# Bump whenever the cached record layout or the flattening rules change.
+CACHE_VERSION = 4
 
-    questionnaire_entries: List[Tuple[int, str, Path, Dict[str, QuestionInfo]]] = []
 
-    for q_path in sorted(root.glob("*.json")):
-        if q_path.name.startswith("."):
-            continue
-        questionnaire = load_json(q_path)
-        if questionnaire.get("resourceType") != "Questionnaire":
-            continue
-        title = questionnaire.get("title") or q_path.stem
-        question_bank = build_question_bank(questionnaire)
-        priority = QUESTIONNAIRE_PRIORITY.get(title, len(QUESTIONNAIRE_ORDER))
-        questionnaire_entries.append((priority, title, q_path, question_bank))
+@dataclass
+class QuestionnaireCache:
+    """Persisted question bank and flattened responses for one Questionnaire definition.
+
+    Records are stored as plain tuples so cache files do not depend on the module the
+    dataclasses were pickled from. Response entries are keyed by file name and hold
+    ``(size, mtime_ns, sha256, bundle_record)``.
+    """
+
+    definition_sha256: str
+    question_bank: Dict[str, QuestionInfo]
+    responses: Dict[str, Tuple[int, int, str, tuple]] = field(default_factory=dict)
+    dirty: bool = False
+
+
+def _bundle_to_record(bundle: QuestionnaireResponseBundle) -> tuple:
+    return (
+        bundle.questionnaire_id,
+        bundle.title,
+        bundle.authored,
+        bundle.subject,
+        [
+            (
+                answer.questionnaire,
+                answer.link_id,
+                answer.question,
+                answer.section,
+                answer.code,
+                answer.display,
+                answer.raw_value,
+                answer.choices,
+                answer.label,
+            )
+            for answer in bundle.answers
+        ],
+        bundle.skipped_items,
+    )
+
+
+def _bundle_from_record(record: tuple) -> QuestionnaireResponseBundle:
+    questionnaire_id, title, authored, subject, answers, skipped_items = record
+    return compact_bundle(
+        QuestionnaireResponseBundle(
+            questionnaire_id=questionnaire_id,
+            title=title,
+            authored=authored,
+            subject=subject,
+            answers=[AnswerRow(*answer) for answer in answers],
+            skipped_items=skipped_items,
+        )
+    )
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def compact_bundle(bundle: QuestionnaireResponseBundle) -> QuestionnaireResponseBundle:
+    """Intern the repeated strings of a bundle that was unpickled (from a worker or the cache).
+
+    Unpickling gives every copy of a question text, section or answer display its own
+    string object; interning makes all answers share one copy again.
+    """
+    bundle.title = _intern(bundle.title)
+    bundle.questionnaire_id = _intern(bundle.questionnaire_id)
+    bundle.subject = _intern(bundle.subject)
+    for answer in bundle.answers:
+        answer.questionnaire = _intern(answer.questionnaire)
+        answer.link_id = _intern(answer.link_id)
+        answer.question = _intern(answer.question)
+        answer.section = _intern(answer.section)
+        answer.code = _intern(answer.code)
+        answer.display = _intern(answer.display)
+        answer.choices = _intern(answer.choices)
+        answer.label = _intern(answer.label)
+        if isinstance(answer.raw_value, str):
+            answer.raw_value = _intern(answer.raw_value)
+    return bundle
 
-    questionnaire_entries.sort(key=lambda entry: (entry[0], entry[1]))
 
-    for _priority, title, q_path, question_bank in questionnaire_entries:
-        for question_info in question_bank.values():
-            question_catalog.append(
+def _cache_untrusted_reason(stat: os.stat_result) -> Optional[str]:
+    """Why a cache file or directory with ``stat`` must not be unpickled, or None if it may.
+
+    Unpickling runs arbitrary code, so only files and directories owned by the current user
+    and not writable by anyone else are trusted. Platforms without ``os.getuid`` trust
+    everything.
+    """
+    getuid = getattr(os, "getuid", None)
+    if getuid is None:
+        return None
+    if stat.st_uid != getuid():
+        return "it is owned by another user"
+    if stat.st_mode & 0o022:
+        return "it is writable by other users"
+    return None
+
+
+def load_questionnaire_cache(cache_path: Path, definition_sha256: str) -> Optional[QuestionnaireCache]:
+    """Load the cache for a questionnaire, discarding it if the definition or format changed.
+
+    A cache file that is not trusted (see :func:`_cache_untrusted_reason`), or whose
+    directory is not, is ignored with a warning and rebuilt.
+    """
+    try:
+        with cache_path.open("rb") as handle:
+            checks = ((cache_path.parent, cache_path.parent.stat()), (cache_path, os.fstat(handle.fileno())))
+            for path, stat in checks:
+                reason = _cache_untrusted_reason(stat)
+                if reason is not None:
+                    print(f"Warning: Ignoring cache '{path}' because {reason}.", file=sys.stderr)
+                    return None
+            payload = pickle.load(handle)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != CACHE_VERSION:
+        return None
+    if payload.get("definition_sha256") != definition_sha256:
+        return None
+    return QuestionnaireCache(
+        definition_sha256=definition_sha256,
+        question_bank={link_id: QuestionInfo(*info) for link_id, info in payload["question_bank"].items()},
+        responses=payload["responses"],
+    )
+
+
+def save_questionnaire_cache(cache_path: Path, cache: QuestionnaireCache) -> None:
+    payload = {
+        "version": CACHE_VERSION,
+        "definition_sha256": cache.definition_sha256,
+        "question_bank": {
+            link_id: (info.link_id, info.text, info.section, dict(info.answer_map), info.q_type, info.questionnaire)
+            for link_id, info in cache.question_bank.items()
+        },
+        "responses": cache.responses,
+    }
+    # Private to the current user, as load_questionnaire_cache only trusts such files.
+    cache_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    with os.fdopen(os.open(tmp_path, flags, 0o600), "wb") as handle:
+        pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+
+
+@dataclass
+class StageMetrics:
+    """Resource usage of one pipeline stage."""
+
+    name: str
+    wall_seconds: float
+    cpu_seconds: float
+    peak_memory_bytes: Optional[int] = None
+    # Enclosing stage of a step that ran concurrently with its siblings; its time is
+    # already part of the enclosing stage.
+    parent: Optional[str] = None
+
+
+@dataclass
+class RunReport:
+    """Per-stage timings and pipeline counts of one report run, written as JSON.
+
+    CPU time covers this process only and does not see flattening worker processes. Stages
+    nested in ``write_outputs`` report the CPU time of the process that wrote the output.
+
+    With ``trace_memory`` each stage reports the largest tracemalloc total while it ran
+    instead of its timings: tracing slows allocation-heavy stages down several times over,
+    so the wall and CPU times of a traced run are left out of the report.
+    """
+
+    trace_memory: bool = False
+    started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    settings: Dict[str, Any] = field(default_factory=dict)
+    stages: List[StageMetrics] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)
+    completed: bool = False
+
+    def start(self) -> None:
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.stages.append(
+                StageMetrics(
+                    name=name,
+                    wall_seconds=time.perf_counter() - wall_start,
+                    cpu_seconds=time.process_time() - cpu_start,
+                    peak_memory_bytes=tracemalloc.get_traced_memory()[1] if tracing else None,
+                )
+            )
+
+    def count(self, name: str, value: int) -> None:
+        self.counts[name] = self.counts.get(name, 0) + int(value)
+
+    def _timing(self, seconds: float) -> Optional[float]:
+        return None if self.trace_memory else round(seconds, 6)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "completed": self.completed,
+            "python": sys.version.split()[0],
+            "settings": self.settings,
+            "memory_traced": self.trace_memory,
+            "total_wall_seconds": self._timing(sum(stage.wall_seconds for stage in self.stages if stage.parent is None)),
+            "stages": [
                 {
-                    "Questionnaire": title,
-                    "Section": normalise_text(question_info.section),
-                    "Question": normalise_text(question_info.text),
-                    "LinkId": question_info.link_id,
-                    "Type": question_info.q_type,
-                    "Possible Choices": format_answer_choices(question_info.answer_map),
+                    "name": stage.name,
+                    "wall_seconds": self._timing(stage.wall_seconds),
+                    "cpu_seconds": self._timing(stage.cpu_seconds),
+                    "peak_memory_bytes": stage.peak_memory_bytes,
+                    "parent": stage.parent,
                 }
-            )
+                for stage in self.stages
+            ],
+            "counts": self.counts,
+        }
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2) + "\n", encoding="utf-8")
+
 
-        response_dir = root / q_path.stem
-        if not response_dir.is_dir():
+def _import_pandas() -> Any:
+    try:
+        import pandas
+    except ImportError as error:
+        raise SystemExit(
+            "Error: the workbook requires pandas.\nInstall it with: pip3 install pandas xlsxwriter "
+            "(or write the CSV summary alone with --csv-only)"
+        ) from error
+    return pandas
+
+
+def _stage(run_report: Optional[RunReport], name: str) -> ContextManager[None]:
+    return run_report.stage(name) if run_report is not None else nullcontext()
+
+
+# Question banks and decryption cipher shared with worker processes. Banks are keyed per
+# definition file rather than by title, since two definition files may share a title.
+_WORKER_QUESTION_BANKS: Mapping[Any, Mapping[str, QuestionInfo]] = {}
+_WORKER_CIPHER: Any = None
+
+
+def _init_flatten_worker(
+    question_banks: Mapping[Any, Mapping[str, QuestionInfo]],
+    decryption_key: Optional[bytes] = None,
+) -> None:
+    global _WORKER_QUESTION_BANKS, _WORKER_CIPHER
+    _WORKER_QUESTION_BANKS = question_banks
+    _WORKER_CIPHER = None
+    if decryption_key is not None:
+        from decrypt_files import create_cipher
+
+        _WORKER_CIPHER = create_cipher(decryption_key)
+
+
+def read_and_flatten(
+    response_path: Path,
+    questionnaire_title: str,
+    question_bank: Mapping[str, QuestionInfo],
+    cipher: Any = None,
+) -> Tuple[str, QuestionnaireResponseBundle]:
+    """Flatten a response file, returning the SHA-256 of its content alongside the bundle.
+
+    With a ``cipher`` the file is an encrypted export file and is decrypted in memory;
+    the plaintext never touches the disk.
+    """
+    data = response_path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    if cipher is not None:
+        from decrypt_files import DecryptionError, decrypt_payload
+
+        try:
+            data = decrypt_payload(cipher, data)
+        except DecryptionError as error:
+            raise DecryptionError(f"{response_path}: {error}") from error
+    bundle = flatten_response(json.loads(data), questionnaire_title, question_bank, response_path.parent.name)
+    return digest, bundle
+
+
+def _read_and_flatten_task(task: Tuple[str, Any, Path]) -> Tuple[str, QuestionnaireResponseBundle]:
+    title, bank_key, response_path = task
+    return read_and_flatten(response_path, title, _WORKER_QUESTION_BANKS[bank_key], _WORKER_CIPHER)
+
+
+def _cached_bundle(
+    cache: QuestionnaireCache,
+    response_path: Path,
+    stat: os.stat_result,
+) -> Optional[QuestionnaireResponseBundle]:
+    """Return the cached bundle for a response file if its content is unchanged."""
+    entry = cache.responses.get(response_path.name)
+    if entry is None:
+        return None
+    size, mtime_ns, sha256, record = entry
+    if size != stat.st_size:
+        return None
+    if mtime_ns != stat.st_mtime_ns:
+        # Touched but possibly unchanged (e.g. re-decrypted); fall back to the content hash.
+        if hashlib.sha256(response_path.read_bytes()).hexdigest() != sha256:
+            return None
+        cache.responses[response_path.name] = (size, stat.st_mtime_ns, sha256, record)
+        cache.dirty = True
+    return _bundle_from_record(record)
+
+
+def read_questionnaire_definitions(
+    definition_paths: Iterable[Path],
+) -> Iterator[Tuple[int, str, Path, bytes, Dict[str, Any]]]:
+    """Yield ``(priority, title, path, raw bytes, definition)`` for every Questionnaire file.
+
+    Files whose ``resourceType`` is not Questionnaire are skipped.
+    """
+    for q_path in definition_paths:
+        definition_data = q_path.read_bytes()
+        questionnaire = json.loads(definition_data)
+        if questionnaire.get("resourceType") != "Questionnaire":
             continue
+        title = questionnaire.get("title") or q_path.stem
+        yield QUESTIONNAIRE_PRIORITY.get(title, len(QUESTIONNAIRE_ORDER)), title, q_path, definition_data, questionnaire
+
+
+def question_catalog_entries(title: str, question_bank: Mapping[str, QuestionInfo]) -> List[Dict[str, Any]]:
+    """Return the question catalog rows of one questionnaire."""
+    return [
+        {
+            "Questionnaire": title,
+            "Section": normalise_text(question_info.section),
+            "Question": normalise_text(question_info.text),
+            "LinkId": question_info.link_id,
+            "Type": question_info.q_type,
+            "Possible Choices": question_info.choices,
+        }
+        for question_info in question_bank.values()
+    ]
+
+
+def collect_questionnaire_data(
+    root: Path,
+    workers: int = 1,
+    cache_dir: Optional[Path] = None,
+    decryption_key: Optional[bytes] = None,
+    definitions_dir: Optional[Path] = None,
+    run_report: Optional[RunReport] = None,
+    export_index: Optional[ExportIndex] = None,
+) -> Tuple[Dict[str, List[QuestionnaireResponseBundle]], List[Dict[str, Any]]]:
+    """Load questionnaire definitions and flatten every response file under ``root``.
+
+    Definitions are read from ``definitions_dir`` (default: ``root``) and responses from the
+    folder under ``root`` named after each definition file, as listed by ``export_index``
+    (built with one directory walk of ``root`` when not given). When ``cache_dir`` is given,
+    question banks and flattened responses are persisted per questionnaire and only new or
+    changed response files are flattened again. A changed Questionnaire definition
+    invalidates that questionnaire's cache only. With ``decryption_key`` the response files
+    are read straight from the encrypted export and decrypted in memory. A ``run_report``
+    receives the timings of the loading and flattening stages and the file counts.
+    """
+    if decryption_key is not None and cache_dir is not None:
+        raise ValueError("The flattened-response cache would store decrypted answers on disk; disable it for encrypted input.")
 
-        for response_path in sorted(response_dir.glob("*.json")):
-            if response_path.name.startswith("."):
-                continue
-            session_id = response_path.stem
-            response_json = load_json(response_path)
-            bundle = flatten_response(response_json, title, question_bank)
-            sessions[session_id].append(bundle)
+    sessions: Dict[str, List[QuestionnaireResponseBundle]] = defaultdict(list)
+    question_catalog: List[Dict[str, Any]] = []
 
-    return sessions, question_catalog
+    questionnaire_entries: List[Tuple[int, str, Path, Dict[str, QuestionInfo]]] = []
+    caches: Dict[str, QuestionnaireCache] = {}
+
+    with _stage(run_report, "load_questionnaires"):
+        if export_index is None:
+            export_index = index_export(root)
+        definition_paths = list_definitions(definitions_dir) if definitions_dir is not None else export_index.definitions
+        for priority, title, q_path, definition_data, questionnaire in read_questionnaire_definitions(definition_paths):
+            cache: Optional[QuestionnaireCache] = None
+            if cache_dir is not None:
+                definition_sha256 = hashlib.sha256(definition_data).hexdigest()
+                cache = load_questionnaire_cache(cache_dir / f"{q_path.stem}.pickle", definition_sha256)
+                if cache is None:
+                    cache = QuestionnaireCache(
+                        definition_sha256=definition_sha256,
+                        question_bank=build_question_bank(questionnaire, title),
+                        dirty=True,
+                    )
+                caches[q_path.stem] = cache
+                question_bank = cache.question_bank
+            else:
+                question_bank = build_question_bank(questionnaire, title)
 
-def build_summary_dataframe(
-    sessions: Mapping[str, List[QuestionnaireResponseBundle]],
-) -> pd.DataFrame:
-    rows: List[Dict[str, Any]] = []
+            questionnaire_entries.append((priority, title, q_path, question_bank))
 
-    for session_id in sorted(sessions.keys()):
-        bundles = sessions.get(session_id, [])
-        row: Dict[str, Any] = {
-            "Session ID": session_id,
-            "Questionnaire Count": len(bundles),
+    questionnaire_entries.sort(key=lambda entry: (entry[0], entry[1]))
+
+    with _stage(run_report, "flatten_responses"):
+        # Response slots in the order a serial run visits them; results are merged in this order
+        # regardless of how many files were cached or how many workers flattened the rest.
+        slots: List[Tuple[Path, Optional[QuestionnaireResponseBundle]]] = []
+        stats: Dict[Path, os.stat_result] = {}
+        tasks: List[Tuple[str, int, Path]] = []
+        task_slots: List[int] = []
+
+        for entry_index, (_priority, title, q_path, question_bank) in enumerate(questionnaire_entries):
+            question_catalog.extend(question_catalog_entries(title, question_bank))
+
+            cache = caches.get(q_path.stem)
+            for response_path in export_index.response_folders.get(q_path.stem, []):
+                bundle: Optional[QuestionnaireResponseBundle] = None
+                if cache is not None:
+                    stat = response_path.stat()
+                    stats[response_path] = stat
+                    bundle = _cached_bundle(cache, response_path, stat)
+                if bundle is None:
+                    task_slots.append(len(slots))
+                    tasks.append((title, entry_index, response_path))
+                slots.append((response_path, bundle))
+
+        question_banks = {
+            entry_index: question_bank for entry_index, (_priority, _title, _q_path, question_bank) in enumerate(questionnaire_entries)
+        }
+        if workers > 1 and len(tasks) > 1:
+            chunksize = max(1, len(tasks) // (workers * 8))
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_flatten_worker,
+                initargs=(question_banks, decryption_key),
+            ) as executor:
+                results = [
+                    (sha256, compact_bundle(bundle))
+                    for sha256, bundle in executor.map(_read_and_flatten_task, tasks, chunksize=chunksize)
+                ]
+        else:
+            cipher = None
+            if decryption_key is not None:
+                from decrypt_files import create_cipher
+
+                cipher = create_cipher(decryption_key)
+            results = [
+                read_and_flatten(response_path, title, question_banks[bank_key], cipher)
+                for title, bank_key, response_path in tasks
+            ]
+
+        for slot_index, (sha256, bundle) in zip(task_slots, results):
+            response_path = slots[slot_index][0]
+            slots[slot_index] = (response_path, bundle)
+            cache = caches.get(response_path.parent.name)
+            if cache is not None:
+                stat = stats[response_path]
+                cache.responses[response_path.name] = (stat.st_size, stat.st_mtime_ns, sha256, _bundle_to_record(bundle))
+                cache.dirty = True
+
+    for response_path, bundle in slots:
+        sessions[response_path.stem].append(bundle)
+
+    if run_report is not None:
+        run_report.count("questionnaires", len(questionnaire_entries))
+        run_report.count("response_files", len(slots))
+        run_report.count("cached_responses", len(slots) - len(tasks))
+        run_report.count("skipped_unknown_items", sum(bundle.skipped_items for _path, bundle in slots))
+
+    if cache_dir is not None:
+        for stem, cache in caches.items():
+            # Drop entries for response files that no longer exist.
+            seen = {response_path.name for response_path, _bundle in slots if response_path.parent.name == stem}
+            stale = [name for name in cache.responses if name not in seen]
+            for name in stale:
+                del cache.responses[name]
+            if cache.dirty or stale:
+                save_questionnaire_cache(cache_dir / f"{stem}.pickle", cache)
+
+    return sessions, question_catalog
+
+SUMMARY_LEADING_COLUMNS = ["Session ID", "Questionnaire Count", "Participant References"]
+
+
+def build_summary_columns(question_catalog: Sequence[Mapping[str, Any]]) -> List[str]:
+    """Return the summary column order derived from the question catalog.
+
+    Each questionnaire contributes its "Authored On" column followed by one column per
+    question, in catalog order. Distinct questions whose labels collide share a column.
+    """
+    columns: Dict[str, None] = dict.fromkeys(SUMMARY_LEADING_COLUMNS)
+    for entry in question_catalog:
+        title = entry.get("Questionnaire") or ""
+        columns.setdefault(build_metadata_label(title, "Authored On"))
+        columns.setdefault(
+            build_question_label(title, entry.get("Question") or "", entry.get("Section") or "", entry.get("LinkId"))
+        )
+    return list(columns)
+
+
+class _CellAccumulator:
+    """Ordered set of answer displays merged into one summary cell.
+
+    Reproduces the "; "-joined de-duplication of the row-based builder: ``tokens`` is the
+    split view of ``text`` and ``seen`` makes membership checks constant time.
+    """
+
+    __slots__ = ("text", "tokens", "seen")
+
+    def __init__(self, value: str) -> None:
+        self.text = value
+        self.tokens: Optional[List[str]] = None
+        self.seen: Optional[set] = None
+
+    def add(self, value: str) -> None:
+        if not self.text:
+            self.text = value
+            self.tokens = None
+            self.seen = None
+            return
+        if self.tokens is None:
+            self.tokens = [token.strip() for token in self.text.split(";") if token.strip()]
+            self.seen = set(self.tokens)
+        if value and value not in self.seen:
+            self.text = "; ".join([*self.tokens, value])
+            for token in value.split(";"):
+                token = token.strip()
+                if token:
+                    self.tokens.append(token)
+                    self.seen.add(token)
+
+
+class _SummaryColumns:
+    """Column index of the summary table, seeded from the question catalog.
+
+    Labels missing from the catalog are appended in order of first appearance; the
+    answer and "Authored On" labels are memoised so each is built once per run.
+    """
+
+    def __init__(self, question_catalog: Optional[Sequence[Mapping[str, Any]]]) -> None:
+        self.index: Dict[str, int] = {
+            column: index for index, column in enumerate(build_summary_columns(question_catalog or []))
         }
+        self.label_columns: Dict[Tuple[str, str, str, str], int] = {}
+        self.meta_columns: Dict[str, int] = {}
+        self.session = self.index["Session ID"]
+        self.count = self.index["Questionnaire Count"]
+        self.participants = self.column_for("Participant References")
+
+    def column_for(self, label: str) -> int:
+        index = self.index.get(label)
+        if index is None:
+            index = self.index[label] = len(self.index)
+        return index
+
+    def labels(self) -> List[str]:
+        return list(self.index)
+
+    def session_cells(
+        self,
+        session_id: str,
+        bundles: Sequence[QuestionnaireResponseBundle],
+        timestamps: Mapping[str, Any],
+    ) -> Dict[int, Any]:
+        """Return column -> cell value of one session's summary row."""
+        cells: Dict[int, Any] = {self.session: session_id, self.count: len(bundles)}
 
         subjects = {bundle.subject for bundle in bundles if bundle.subject}
         if subjects:
-            row["Participant References"] = "; ".join(sorted(subjects))
+            cells[self.participants] = "; ".join(sorted(subjects))
 
         for bundle in bundles:
             if bundle.authored:
-                authored_timestamp = parse_timestamp(bundle.authored)
-                meta_label = build_metadata_label(bundle.title, "Authored On")
-                row[meta_label] = authored_timestamp if authored_timestamp is not None else bundle.authored
+                meta_column = self.meta_columns.get(bundle.title)
+                if meta_column is None:
+                    meta_column = self.meta_columns[bundle.title] = self.column_for(
+                        build_metadata_label(bundle.title, "Authored On")
+                    )
+                authored_timestamp = timestamps.get(bundle.authored)
+                cells[meta_column] = authored_timestamp if authored_timestamp is not None else bundle.authored
             for answer in bundle.answers:
-                label = build_answer_label(answer)
+                key = (answer.questionnaire, answer.question, answer.section, answer.link_id)
+                column = self.label_columns.get(key)
+                if column is None:
+                    column = self.label_columns[key] = self.column_for(build_answer_label(answer))
 
                 display_value = answer.display if answer.display is not None else ""
-                if label not in row or not row[label]:
-                    row[label] = display_value
+                accumulator = cells.get(column)
+                if accumulator is None:
+                    cells[column] = _CellAccumulator(display_value)
                 else:
-                    existing_value = row[label]
-                    existing_tokens: List[str]
-                    if isinstance(existing_value, str):
-                        existing_tokens = [token.strip() for token in existing_value.split(";") if token.strip()]
-                    elif isinstance(existing_value, list):
-                        existing_tokens = [str(token) for token in existing_value]
-                    else:
-                        existing_tokens = [str(existing_value)]
+                    accumulator.add(str(display_value))
+
+        for column, value in cells.items():
+            if isinstance(value, _CellAccumulator):
+                cells[column] = value.text
+        return cells
+
+
+def _summary_cells(
+    sessions: Mapping[str, List[QuestionnaireResponseBundle]],
+    question_catalog: Optional[Sequence[Mapping[str, Any]]],
+    timestamps: Mapping[str, Any],
+) -> Tuple[List[str], List[str], Dict[Tuple[int, int], Any]]:
+    """Return ``(session IDs, column labels, (row, column) -> cell)`` of the summary table.
+
+    Answers are accumulated into a long ``(session, column) -> cell`` table against a fixed
+    column index taken from ``question_catalog`` (see :class:`_SummaryColumns`). Columns
+    without any value are dropped.
+    """
+    session_ids = sorted(sessions.keys())
+    summary_columns = _SummaryColumns(question_catalog)
+    cells: Dict[Tuple[int, int], Any] = {}
+    for row_index, session_id in enumerate(session_ids):
+        for column, value in summary_columns.session_cells(session_id, sessions.get(session_id, []), timestamps).items():
+            cells[(row_index, column)] = value
+
+    labels = summary_columns.labels()
+    used_columns = sorted({column for _row, column in cells})
+    position = {column: offset for offset, column in enumerate(used_columns)}
+    return (
+        session_ids,
+        [labels[column] for column in used_columns],
+        {(row_index, position[column]): value for (row_index, column), value in cells.items()},
+    )
+
+
+def build_summary_dataframe(
+    sessions: Mapping[str, List[QuestionnaireResponseBundle]],
+    question_catalog: Optional[Sequence[Mapping[str, Any]]] = None,
+    timestamps: Optional[Mapping[str, Optional[pd.Timestamp]]] = None,
+) -> pd.DataFrame:
+    """Build the wide per-session summary table.
+
+    The cells (see :func:`_summary_cells`) are assembled into the wide table in a single
+    pivot. ``timestamps`` maps authored strings to parsed values (see
+    :func:`collect_authored_timestamps`) and is computed when omitted.
+    """
+    import numpy as np
+    import pandas as pd
 
-                    candidate = str(display_value)
-                    if candidate and candidate not in existing_tokens:
-                        existing_tokens.append(candidate)
-                        row[label] = "; ".join(existing_tokens)
+    if not sessions:
+        return pd.DataFrame()
+    if timestamps is None:
+        timestamps = collect_authored_timestamps(sessions)
 
-        rows.append(row)
+    session_ids, columns, cells = _summary_cells(sessions, question_catalog, timestamps)
+    matrix = np.full((len(session_ids), len(columns)), np.nan, dtype=object)
+    for (row_index, column), value in cells.items():
+        matrix[row_index, column] = value
 
-    summary_df = pd.DataFrame(rows)
-    if not summary_df.empty:
-        summary_df = summary_df.sort_values("Session ID").reset_index(drop=True)
+    summary_df = pd.DataFrame(matrix, columns=columns).infer_objects()
     return summary_df
 
 
+def build_summary_rows(
+    sessions: Mapping[str, List[QuestionnaireResponseBundle]],
+    question_catalog: Optional[Sequence[Mapping[str, Any]]],
+    timestamps: Mapping[str, Optional[datetime]],
+) -> Tuple[List[str], List[List[Any]]]:
+    """Build the summary table of :func:`build_summary_dataframe` as plain ``(header, rows)``.
+
+    Used by the standard-library report path; missing cells are ``None``.
+    """
+    session_ids, columns, cells = _summary_cells(sessions, question_catalog, timestamps)
+    rows: List[List[Any]] = [[None] * len(columns) for _session_id in session_ids]
+    for (row_index, column), value in cells.items():
+        rows[row_index][column] = value
+    return columns, rows
+
+
+def add_kccq12_scores(
+    summary_df: pd.DataFrame,
+    sessions: Mapping[str, List[QuestionnaireResponseBundle]],
+) -> pd.DataFrame:
+    """Append the KCCQ-12 domain and overall summary scores (see kccq12_scoring.py) to the summary.
+
+    Sessions without any KCCQ-12 answers leave the score columns out entirely.
+    """
+    import pandas as pd
+
+    from kccq12_scoring import kccq12_scores
+
+    scores_df = kccq12_scores(list(summary_df["Session ID"]), sessions)
+    if scores_df.isna().all().all():
+        return summary_df
+    return pd.concat([summary_df.reset_index(drop=True), scores_df], axis=1)
+
+
+def add_kccq12_score_rows(
+    header: List[str],
+    rows: List[List[Any]],
+    sessions: Mapping[str, List[QuestionnaireResponseBundle]],
+) -> Tuple[List[str], List[List[Any]]]:
+    """Standard-library counterpart of :func:`add_kccq12_scores` for :func:`build_summary_rows` output."""
+    from kccq12_scoring import KCCQ12_SCORE_COLUMNS, kccq12_score_rows
+
+    session_column = header.index("Session ID")
+    score_rows = kccq12_score_rows([row[session_column] for row in rows], sessions)
+    if all(score is None for scores in score_rows for score in scores):
+        return header, rows
+    return header + KCCQ12_SCORE_COLUMNS, [row + scores for row, scores in zip(rows, score_rows)]
+
+
+def add_recording_columns(
+    summary_df: pd.DataFrame,
+    recording_summary: Mapping[str, Mapping[str, Any]],
+) -> pd.DataFrame:
+    """Append the per-session recording metrics (see recording_analytics.py) to the summary."""
+    import pandas as pd
+
+    from recording_analytics import RECORDING_SUMMARY_COLUMNS, recording_rows_by_session
+
+    recording_df = pd.DataFrame(
+        recording_rows_by_session(summary_df["Session ID"], recording_summary),
+        columns=RECORDING_SUMMARY_COLUMNS,
+    )
+    return pd.concat([summary_df.reset_index(drop=True), recording_df], axis=1)
+
+
+def _format_frame_sheet(
+    sheet: Any,
+    frame: pd.DataFrame,
+    header_fmt: Any,
+    date_fmt: Any,
+    number_fmt: Any,
+    wrap: Any,
+) -> None:
+    """Freeze, filter and size the columns of a sheet written with ``DataFrame.to_excel``."""
+    import pandas as pd
+
+    sheet.freeze_panes(1, 0)
+    sheet.set_row(0, None, header_fmt)
+    if not frame.empty:
+        sheet.autofilter(0, 0, frame.shape[0], frame.shape[1] - 1)
+
+    date_columns = [col for col in frame.columns if pd.api.types.is_datetime64_any_dtype(frame[col])]
+    for idx, column in enumerate(frame.columns):
+        series = frame[column]
+        if column in date_columns:
+            sheet.set_column(idx, idx, 22, date_fmt)
+        elif pd.api.types.is_integer_dtype(series) or pd.api.types.is_float_dtype(series):
+            sheet.set_column(idx, idx, 18, number_fmt)
+        else:
+            col_values = series.astype(str).replace({"nan": ""})
+            max_content = max([len(column)] + [len(v) for v in col_values]) if not col_values.empty else len(column)
+            width = min(60, max(12, max_content + 2))
+            fmt = wrap if pd.api.types.is_object_dtype(series) else None
+            sheet.set_column(idx, idx, width, fmt)
+
+
 def write_excel_report(
     excel_path: Path,
     summary_df: pd.DataFrame,
     sessions: Mapping[str, List[QuestionnaireResponseBundle]],
     question_catalog: Sequence[Mapping[str, Any]],
+    timestamps: Optional[Mapping[str, Optional[pd.Timestamp]]] = None,
+    vitals_trends: Optional[pd.DataFrame] = None,
 ) -> None:
+    import pandas as pd
+
     excel_path.parent.mkdir(parents=True, exist_ok=True)
+    if timestamps is None:
+        timestamps = collect_authored_timestamps(sessions)
 
     with pd.ExcelWriter(excel_path, engine="xlsxwriter") as writer:
         summary_df.to_excel(writer, sheet_name="Summary", index=False)
@@ -400,37 +1243,17 @@ def write_excel_report(
         header_fmt = workbook.add_format({"bold": True, "bg_color": "#F2F5FA"})
         date_fmt = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm"})
         integer_fmt = workbook.add_format({"num_format": "0"})
+        decimal_fmt = workbook.add_format({"num_format": "0.0"})
 
-        summary_sheet = writer.sheets["Summary"]
-        summary_sheet.freeze_panes(1, 0)
-        summary_sheet.set_row(0, None, header_fmt)
-        if not summary_df.empty:
-            summary_sheet.autofilter(0, 0, summary_df.shape[0], summary_df.shape[1] - 1)
-
-        date_columns = [col for col in summary_df.columns if pd.api.types.is_datetime64_any_dtype(summary_df[col])]
-        for idx, column in enumerate(summary_df.columns):
-            series = summary_df[column]
-            if column in date_columns:
-                summary_sheet.set_column(idx, idx, 22, date_fmt)
-            elif pd.api.types.is_integer_dtype(series) or pd.api.types.is_float_dtype(series):
-                summary_sheet.set_column(idx, idx, 18, integer_fmt)
-            else:
-                col_values = series.astype(str).replace({"nan": ""})
-                max_content = max([len(column)] + [len(v) for v in col_values]) if not col_values.empty else len(column)
-                width = min(60, max(12, max_content + 2))
-                fmt = wrap if pd.api.types.is_object_dtype(series) else None
-                summary_sheet.set_column(idx, idx, width, fmt)
+        _format_frame_sheet(writer.sheets["Summary"], summary_df, header_fmt, date_fmt, integer_fmt, wrap)
 
-        used_sheet_names: Dict[str, int] = {}
+        if vitals_trends is not None and not vitals_trends.empty:
+            vitals_trends.to_excel(writer, sheet_name=VITALS_TRENDS_SHEET, index=False)
+            _format_frame_sheet(writer.sheets[VITALS_TRENDS_SHEET], vitals_trends, header_fmt, date_fmt, decimal_fmt, wrap)
+
+        sheet_namer = SheetNamer()
         for session_id in sorted(sessions.keys()):
-            base_name = session_id[:31] or "Session"
-            sheet_name = base_name
-            counter = 1
-            while sheet_name in used_sheet_names:
-                suffix = f"_{counter}"
-                sheet_name = f"{base_name[:31 - len(suffix)]}{suffix}"
-                counter += 1
-            used_sheet_names[sheet_name] = 1
+            sheet_name = sheet_namer(session_id)
 
             worksheet = workbook.add_worksheet(sheet_name)
             writer.sheets[sheet_name] = worksheet
@@ -456,7 +1279,7 @@ def write_excel_report(
                 worksheet.write(row, 0, bundle.title, bold)
                 if bundle.authored:
                     worksheet.write(row, 1, "Authored", bold)
-                    authored_ts = parse_timestamp(bundle.authored)
+                    authored_ts = timestamps.get(bundle.authored)
                     if authored_ts is not None:
                         worksheet.write_datetime(row, 2, authored_ts, date_fmt)
                     else:
@@ -512,11 +1335,944 @@ def write_excel_report(
                 catalog_sheet.set_column(idx, idx, width, fmt)
 
 
+def _column_width(max_content: int) -> int:
+    return min(60, max(12, max_content + 2))
+
+
+def _cell_text_length(value: Any) -> int:
+    # NaN and NaT are the only cell values that compare unequal to themselves.
+    if value is None or value != value:
+        return 0
+    return len(str(value))
+
+
+class SheetNamer:
+    """Assign unique worksheet names (at most 31 characters) to session IDs.
+
+    Names collide when session IDs share their first 31 characters; later sessions get
+    ``_1``, ``_2``, ... suffixes. The next suffix to try is remembered per base name, so
+    naming stays constant-time per sheet however many sessions share a prefix.
+    """
+
+    def __init__(self, reserved: Iterable[str] = ()) -> None:
+        self.used = set(reserved)
+        self.next_suffix: Dict[str, int] = {}
+
+    def __call__(self, session_id: str) -> str:
+        base_name = session_id[:31] or "Session"
+        sheet_name = base_name
+        counter = self.next_suffix.get(base_name, 1)
+        if sheet_name in self.used:
+            while True:
+                suffix = f"_{counter}"
+                sheet_name = f"{base_name[:31 - len(suffix)]}{suffix}"
+                counter += 1
+                if sheet_name not in self.used:
+                    break
+            self.next_suffix[base_name] = counter
+        self.used.add(sheet_name)
+        return sheet_name
+
+
+@dataclass
+class _StreamingFormats:
+    bold: Any
+    wrap: Any
+    header: Any
+    table_header: Any
+    date: Any
+    datetime_cell: Any
+    integer: Any
+    decimal: Any
+
+
+def _streaming_formats(workbook: Any) -> _StreamingFormats:
+    return _StreamingFormats(
+        bold=workbook.add_format({"bold": True}),
+        wrap=workbook.add_format({"text_wrap": True}),
+        header=workbook.add_format({"bold": True, "bg_color": "#F2F5FA"}),
+        # Mirrors the header cell style pandas applies when writing DataFrames.
+        table_header=workbook.add_format(
+            {"bold": True, "border": 1, "align": "center", "valign": "top", "bg_color": "#F2F5FA"}
+        ),
+        date=workbook.add_format({"num_format": "yyyy-mm-dd hh:mm"}),
+        datetime_cell=workbook.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"}),
+        integer=workbook.add_format({"num_format": "0"}),
+        decimal=workbook.add_format({"num_format": "0.0"}),
+    )
+
+
+SESSION_ANSWER_COLUMNS = ("LinkId", "Question", "Section", "Response")
+WRAPPED_SESSION_ANSWER_COLUMNS = {"Section", "Question", "Response"}
+
+
+def _answer_column_layout(column: str, values: Sequence[Any]) -> Tuple[int, bool]:
+    """Return the width of one answer column and whether it is numeric, as pandas infers them.
+
+    Mirrors the per-bundle sizing of :func:`write_excel_report`: numeric columns are 14
+    wide, and text columns are sized from ``str`` of every value, where ``None`` counts as
+    ``"None"`` and ``"nan"`` as empty.
+    """
+    present = [value for value in values if value is not None]
+    if present and (
+        all(isinstance(value, bool) for value in present)
+        or all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present)
+    ):
+        return 14, True
+    texts = (str(value) for value in values)
+    return _column_width(max([len(column)] + [0 if text == "nan" else len(text) for text in texts])), False
+
+
+def _write_session_sheet_streaming(
+    worksheet: Any,
+    session_id: str,
+    bundles: Sequence[QuestionnaireResponseBundle],
+    timestamps: Mapping[str, Optional[pd.Timestamp]],
+    formats: _StreamingFormats,
+) -> None:
+    """Write one per-session sheet row by row (see :func:`write_excel_report_streaming`)."""
+    row = 0
+    worksheet.write(row, 0, "Session ID", formats.bold)
+    worksheet.write(row, 1, session_id)
+    row += 1
+
+    participants = sorted({bundle.subject for bundle in bundles if bundle.subject})
+    if participants:
+        worksheet.write(row, 0, "Participants", formats.bold)
+        worksheet.write(row, 1, ", ".join(participants))
+        row += 1
+
+    worksheet.write(row, 0, "Questionnaires", formats.bold)
+    worksheet.write(row, 1, str(len(bundles)))
+    row += 2
+
+    # Like write_excel_report, the columns are sized by the last questionnaire with answers.
+    column_layout: Optional[List[Tuple[int, bool]]] = None
+    for bundle in bundles:
+        worksheet.write(row, 0, bundle.title, formats.bold)
+        if bundle.authored:
+            worksheet.write(row, 1, "Authored", formats.bold)
+            authored_ts = timestamps.get(bundle.authored)
+            if authored_ts is not None:
+                worksheet.write_datetime(row, 2, authored_ts.to_pydatetime(), formats.date)
+            else:
+                worksheet.write(row, 2, bundle.authored)
+        row += 1
+
+        if bundle.answers:
+            worksheet.set_row(row, None, formats.header)
+            for col_idx, column in enumerate(SESSION_ANSWER_COLUMNS):
+                worksheet.write(row, col_idx, column, formats.table_header)
+            row += 1
+            rows = [(answer.link_id, answer.question, answer.section, answer.display) for answer in bundle.answers]
+            for values in rows:
+                for col_idx, value in enumerate(values):
+                    if not value:
+                        continue
+                    worksheet.write_string(row, col_idx, str(value))
+                row += 1
+            row += 1
+            column_layout = [
+                _answer_column_layout(column, [values[col_idx] for values in rows])
+                for col_idx, column in enumerate(SESSION_ANSWER_COLUMNS)
+            ]
+        else:
+            worksheet.write(row, 0, "No answers found.")
+            row += 2
+
+    if column_layout is None:
+        return
+    for col_idx, (column, (width, numeric)) in enumerate(zip(SESSION_ANSWER_COLUMNS, column_layout)):
+        if numeric:
+            worksheet.set_column(col_idx, col_idx, width, formats.integer)
+        else:
+            fmt = formats.wrap if column in WRAPPED_SESSION_ANSWER_COLUMNS else None
+            worksheet.set_column(col_idx, col_idx, width, fmt)
+
+
+def write_excel_report_streaming(
+    excel_path: Path,
+    summary_df: pd.DataFrame,
+    sessions: Mapping[str, List[QuestionnaireResponseBundle]],
+    question_catalog: Sequence[Mapping[str, Any]],
+    timestamps: Optional[Mapping[str, Optional[pd.Timestamp]]] = None,
+    vitals_trends: Optional[pd.DataFrame] = None,
+    session_index: Optional[Sequence[SessionShardEntry]] = None,
+) -> None:
+    """Write the same workbook as :func:`write_excel_report` (cell values, formats and column
+    widths) in xlsxwriter constant-memory mode.
+
+    Every sheet is written strictly row by row and flushed as it goes, answers are written
+    straight to cells without intermediate DataFrames, and column widths are tracked while
+    writing instead of re-scanning the data afterwards. With ``session_index`` (used for
+    sharded output) a Session Index sheet links to session sheets in other workbooks.
+    """
+    import pandas as pd
+    import xlsxwriter
+
+    excel_path.parent.mkdir(parents=True, exist_ok=True)
+    if timestamps is None:
+        timestamps = collect_authored_timestamps(sessions)
+
+    workbook = xlsxwriter.Workbook(str(excel_path), {"constant_memory": True})
+    try:
+        formats = _streaming_formats(workbook)
+        wrap = formats.wrap
+        header_fmt = formats.header
+        table_header_fmt = formats.table_header
+        date_fmt = formats.date
+
+        def write_value(sheet: Any, row: int, col: int, value: Any) -> None:
+            if value is None or value is pd.NaT:
+                return
+            if isinstance(value, pd.Timestamp):
+                sheet.write_datetime(row, col, value.to_pydatetime(), formats.datetime_cell)
+            elif isinstance(value, float) and pd.isna(value):
+                return
+            else:
+                sheet.write(row, col, value)
+
+        def write_frame_sheet(sheet_name: str, frame: pd.DataFrame, number_fmt: Any) -> None:
+            sheet = workbook.add_worksheet(sheet_name)
+            columns = [str(column) for column in frame.columns]
+            sheet.freeze_panes(1, 0)
+            sheet.set_row(0, None, header_fmt)
+            for idx, column in enumerate(columns):
+                sheet.write(0, idx, column, table_header_fmt)
+            if not frame.empty:
+                sheet.autofilter(0, 0, frame.shape[0], frame.shape[1] - 1)
+
+            widths = [len(column) for column in columns]
+            for row_idx, values in enumerate(frame.itertuples(index=False, name=None), start=1):
+                for idx, value in enumerate(values):
+                    write_value(sheet, row_idx, idx, value)
+                    widths[idx] = max(widths[idx], _cell_text_length(value))
+
+            for idx, column in enumerate(frame.columns):
+                series = frame[column]
+                if pd.api.types.is_datetime64_any_dtype(series):
+                    sheet.set_column(idx, idx, 22, date_fmt)
+                elif pd.api.types.is_integer_dtype(series) or pd.api.types.is_float_dtype(series):
+                    sheet.set_column(idx, idx, 18, number_fmt)
+                else:
+                    fmt = wrap if pd.api.types.is_object_dtype(series) else None
+                    sheet.set_column(idx, idx, _column_width(widths[idx]), fmt)
+
+        write_frame_sheet("Summary", summary_df, formats.integer)
+        if vitals_trends is not None and not vitals_trends.empty:
+            write_frame_sheet(VITALS_TRENDS_SHEET, vitals_trends, formats.decimal)
+        if session_index is not None:
+            _write_session_index_sheet(workbook, session_index, formats)
+
+        sheet_namer = SheetNamer()
+        for session_id in sorted(sessions.keys()):
+            worksheet = workbook.add_worksheet(sheet_namer(session_id))
+            _write_session_sheet_streaming(worksheet, session_id, sessions.get(session_id, []), timestamps, formats)
+
+        if question_catalog:
+            catalog_columns = list(dict.fromkeys(key for entry in question_catalog for key in entry))
+            catalog_rows = sorted(
+                question_catalog,
+                key=lambda entry: tuple(
+                    (entry.get(key) is None, entry.get(key) or "") for key in ("Questionnaire", "Section", "Question")
+                ),
+            )
+            catalog_sheet = workbook.add_worksheet("Question Catalog")
+            catalog_sheet.freeze_panes(1, 0)
+            catalog_sheet.set_row(0, None, header_fmt)
+            for idx, column in enumerate(catalog_columns):
+                catalog_sheet.write(0, idx, column, table_header_fmt)
+            catalog_sheet.autofilter(0, 0, len(catalog_rows), len(catalog_columns) - 1)
+
+            catalog_widths = [len(column) for column in catalog_columns]
+            for row_idx, entry in enumerate(catalog_rows, start=1):
+                for idx, column in enumerate(catalog_columns):
+                    value = entry.get(column)
+                    if value is None:
+                        continue
+                    catalog_sheet.write(row_idx, idx, value)
+                    catalog_widths[idx] = max(catalog_widths[idx], len(str(value)))
+
+            for idx, column in enumerate(catalog_columns):
+                fmt = wrap if column in {"Section", "Question", "Possible Choices"} else None
+                catalog_sheet.set_column(idx, idx, _column_width(catalog_widths[idx]), fmt)
+    finally:
+        workbook.close()
+
+
+SHARD_MODES = ("month", "count")
+# Labels plan_session_shards gives shards: a month, ``undated`` or a zero-padded count.
+SHARD_LABEL_PATTERN = r"\d{4}-\d{2}|undated|\d{3,}"
+# xlsxwriter writes at most this many hyperlinks per worksheet; later index rows are plain text.
+MAX_WORKSHEET_LINKS = 65530
+
+
+@dataclass
+class SessionShardEntry:
+    """Where a session's sheet lives in a sharded report."""
+
+    session_id: str
+    shard: str
+    workbook: str
+    sheet: str
+
+
+def _write_session_index_sheet(workbook: Any, entries: Sequence[SessionShardEntry], formats: _StreamingFormats) -> None:
+    sheet = workbook.add_worksheet("Session Index")
+    columns = ["Session ID", "Shard", "Workbook", "Sheet"]
+    sheet.freeze_panes(1, 0)
+    sheet.set_row(0, None, formats.header)
+    for idx, column in enumerate(columns):
+        sheet.write(0, idx, column, formats.table_header)
+    if entries:
+        sheet.autofilter(0, 0, len(entries), len(columns) - 1)
+
+    widths = [len(column) for column in columns]
+    for row, entry in enumerate(entries, start=1):
+        values = (entry.session_id, entry.shard, entry.workbook, entry.sheet)
+        if row <= MAX_WORKSHEET_LINKS:
+            sheet.write_url(row, 0, f"external:{entry.workbook}#'{entry.sheet}'!A1", string=entry.session_id)
+        else:
+            sheet.write_string(row, 0, entry.session_id)
+        for idx, value in enumerate(values[1:], start=1):
+            sheet.write_string(row, idx, value)
+        for idx, value in enumerate(values):
+            widths[idx] = max(widths[idx], len(value))
+    for idx, width in enumerate(widths):
+        sheet.set_column(idx, idx, _column_width(width))
+
+
+def plan_session_shards(
+    sessions: Mapping[str, Sequence[QuestionnaireResponseBundle]],
+    timestamps: Mapping[str, Optional[pd.Timestamp]],
+    shard_by: str,
+    shard_size: int = 500,
+) -> List[Tuple[str, List[str]]]:
+    """Split the sorted session IDs into ``(label, session_ids)`` shards.
+
+    ``month`` groups sessions by the month of their earliest parsed authored time (sessions
+    without one go to an ``undated`` shard); ``count`` cuts consecutive runs of
+    ``shard_size`` sessions labelled ``001``, ``002``, ...
+    """
+    session_ids = sorted(sessions)
+    if shard_by == "count":
+        return [
+            (f"{number:03d}", session_ids[start:start + shard_size])
+            for number, start in enumerate(range(0, len(session_ids), shard_size), start=1)
+        ]
+    if shard_by != "month":
+        raise ValueError(f"Unknown shard mode {shard_by!r}; expected one of {', '.join(SHARD_MODES)}.")
+
+    months: Dict[str, List[str]] = defaultdict(list)
+    for session_id in session_ids:
+        authored = [
+            timestamps.get(bundle.authored) for bundle in sessions[session_id] if bundle.authored
+        ]
+        authored = [timestamp for timestamp in authored if timestamp is not None]
+        months[min(authored).strftime("%Y-%m") if authored else "undated"].append(session_id)
+    return sorted(months.items(), key=lambda item: (item[0] == "undated", item[0]))
+
+
+def _write_session_shard(
+    task: Tuple[str, Path, Dict[str, List[QuestionnaireResponseBundle]], Dict[str, Optional[pd.Timestamp]]],
+) -> List[SessionShardEntry]:
+    """Write one shard workbook of per-session sheets; runs in a worker process."""
+    import xlsxwriter
+
+    label, shard_path, shard_sessions, shard_timestamps = task
+    entries: List[SessionShardEntry] = []
+    workbook = xlsxwriter.Workbook(str(shard_path), {"constant_memory": True})
+    try:
+        formats = _streaming_formats(workbook)
+        sheet_namer = SheetNamer()
+        for session_id in sorted(shard_sessions):
+            sheet_name = sheet_namer(session_id)
+            worksheet = workbook.add_worksheet(sheet_name)
+            _write_session_sheet_streaming(worksheet, session_id, shard_sessions[session_id], shard_timestamps, formats)
+            entries.append(SessionShardEntry(session_id, label, shard_path.name, sheet_name))
+    finally:
+        workbook.close()
+    return entries
+
+
+def write_sharded_excel_report(
+    excel_path: Path,
+    summary_df: pd.DataFrame,
+    sessions: Mapping[str, List[QuestionnaireResponseBundle]],
+    question_catalog: Sequence[Mapping[str, Any]],
+    timestamps: Optional[Mapping[str, Optional[pd.Timestamp]]] = None,
+    vitals_trends: Optional[pd.DataFrame] = None,
+    shard_by: str = "month",
+    shard_size: int = 500,
+    workers: int = 1,
+) -> List[Path]:
+    """Write per-session sheets into shard workbooks next to an index workbook at ``excel_path``.
+
+    Shards are named ``<stem>_<label>.xlsx`` and written in up to ``workers`` worker
+    processes; shards left over from an earlier run with a different split are removed
+    first, so the index never sits next to stale sessions. The index workbook holds the
+    Summary, Vitals Trends and Question Catalog sheets plus a Session Index sheet linking
+    every session to its sheet in a shard. Returns the shard paths.
+    """
+    excel_path.parent.mkdir(parents=True, exist_ok=True)
+    shard_name = re.compile(
+        rf"{re.escape(excel_path.stem)}_(?:{SHARD_LABEL_PATTERN}){re.escape(excel_path.suffix)}"
+    )
+    for stale_path in excel_path.parent.iterdir():
+        if shard_name.fullmatch(stale_path.name) and stale_path.is_file():
+            stale_path.unlink()
+    if timestamps is None:
+        timestamps = collect_authored_timestamps(sessions)
+
+    tasks = []
+    for label, session_ids in plan_session_shards(sessions, timestamps, shard_by, shard_size):
+        shard_sessions = {session_id: sessions[session_id] for session_id in session_ids}
+        shard_timestamps = {
+            bundle.authored: timestamps.get(bundle.authored)
+            for bundles in shard_sessions.values()
+            for bundle in bundles
+            if bundle.authored
+        }
+        shard_path = excel_path.with_name(f"{excel_path.stem}_{label}{excel_path.suffix}")
+        tasks.append((label, shard_path, shard_sessions, shard_timestamps))
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            shard_entries = list(executor.map(_write_session_shard, tasks))
+    else:
+        shard_entries = [_write_session_shard(task) for task in tasks]
+
+    session_index = [entry for entries in shard_entries for entry in entries]
+    write_excel_report_streaming(
+        excel_path,
+        summary_df,
+        {},
+        question_catalog,
+        timestamps,
+        vitals_trends,
+        session_index=session_index,
+    )
+    return [task[1] for task in tasks]
+
+
 def write_csv_summary(csv_path: Path, summary_df: pd.DataFrame) -> None:
     csv_path.parent.mkdir(parents=True, exist_ok=True)
     summary_df.to_csv(csv_path, index=False)
 
 
+def _csv_datetime_formatter(values: Sequence[datetime]) -> Any:
+    """Return the formatter pandas' ``to_csv`` applies to a datetime column holding ``values``."""
+    if all(not (value.hour or value.minute or value.second or value.microsecond) for value in values):
+        return lambda value: value.strftime("%Y-%m-%d")
+    if any(value.microsecond % 1000 for value in values):
+        return lambda value: value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    if any(value.microsecond for value in values):
+        return lambda value: value.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    return lambda value: value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def write_csv_summary_rows(csv_path: Path, header: Sequence[str], rows: Sequence[Sequence[Any]]) -> None:
+    """Write :func:`build_summary_rows` output with the standard library, byte-for-byte as :func:`write_csv_summary`.
+
+    A column holding only timestamps is formatted like a pandas datetime column (dates only
+    when every time is midnight, otherwise down to the finest fraction of a second used);
+    timestamps mixed with unparsed text are written with ``str`` like any other object.
+    """
+    formatters: List[Any] = []
+    for column in range(len(header)):
+        values = [row[column] for row in rows if row[column] is not None]
+        if values and all(isinstance(value, datetime) for value in values):
+            formatters.append(_csv_datetime_formatter(values))
+        else:
+            formatters.append(str)
+
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    with csv_path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle, lineterminator=os.linesep)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(["" if value is None else formatter(value) for formatter, value in zip(formatters, row)])
+
+
+# Sessions flattened and written per step of the streaming CSV summary.
+STREAMING_BATCH_SESSIONS = 256
+
+
+def write_csv_summary_streaming(
+    csv_path: Path,
+    root: Path,
+    workers: int = 1,
+    decryption_key: Optional[bytes] = None,
+    definitions_dir: Optional[Path] = None,
+    run_report: Optional[RunReport] = None,
+    batch_size: int = STREAMING_BATCH_SESSIONS,
+) -> int:
+    """Flatten the export session by session and write each summary row straight to CSV.
+
+    Unlike :func:`collect_questionnaire_data` followed by :func:`write_csv_summary`, only
+    the sorted file names of each questionnaire folder and ``batch_size`` sessions are
+    held in memory: the folders are merged by session ID, so peak memory grows by one
+    short string per response file rather than with the flattened answers. The columns
+    are fixed up front from the question catalog plus the KCCQ-12 scores, so columns
+    without any answer are kept, and authored times are written as ``YYYY-MM-DD HH:MM:SS``
+    (see :func:`parse_iso_timestamp`). Uses the standard library only. Returns the number
+    of rows written.
+    """
+    from kccq12_scoring import KCCQ12_SCORE_COLUMNS, kccq12_score_rows
+
+    with _stage(run_report, "load_questionnaires"):
+        questionnaire_entries = sorted(
+            (
+                (priority, title, q_path, build_question_bank(questionnaire, title))
+                for priority, title, q_path, _data, questionnaire in read_questionnaire_definitions(
+                    list_definitions(definitions_dir if definitions_dir is not None else root)
+                )
+            ),
+            key=lambda entry: (entry[0], entry[1]),
+        )
+        question_catalog: List[Dict[str, Any]] = []
+        for _priority, title, _q_path, question_bank in questionnaire_entries:
+            question_catalog.extend(question_catalog_entries(title, question_bank))
+        folder_stems = [list_response_stems(root / q_path.stem) for _priority, _title, q_path, _bank in questionnaire_entries]
+    question_banks = {
+        entry_index: question_bank for entry_index, (_priority, _title, _q_path, question_bank) in enumerate(questionnaire_entries)
+    }
+
+    # (session ID, questionnaire order) across all folders, so a session's files arrive together
+    # and in the order collect_questionnaire_data appends its bundles.
+    files = heapq.merge(*(zip(stems, itertools.repeat(order)) for order, stems in enumerate(folder_stems)))
+    sessions = (
+        (session_id, [order for _stem, order in group]) for session_id, group in itertools.groupby(files, key=lambda file: file[0])
+    )
+
+    summary_columns = _SummaryColumns(question_catalog)
+    header = summary_columns.labels() + KCCQ12_SCORE_COLUMNS
+    score_offset = len(header) - len(KCCQ12_SCORE_COLUMNS)
+    counts = {"sessions": 0, "response_files": 0, "answers": 0, "skipped_unknown_items": 0, "unparsable_timestamps": 0}
+
+    executor: Optional[ProcessPoolExecutor] = None
+    cipher = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_flatten_worker,
+            initargs=(question_banks, decryption_key),
+        )
+    elif decryption_key is not None:
+        from decrypt_files import create_cipher
+
+        cipher = create_cipher(decryption_key)
+
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with _stage(run_report, "stream_summary"), csv_path.open("w", encoding="utf-8", newline="") as handle:
+            writer = csv.writer(handle, lineterminator=os.linesep)
+            writer.writerow(header)
+            while True:
+                batch_sessions = list(itertools.islice(sessions, batch_size))
+                if not batch_sessions:
+                    break
+                tasks = [
+                    (questionnaire_entries[order][1], order, root / questionnaire_entries[order][2].stem / f"{session_id}.json")
+                    for session_id, orders in batch_sessions
+                    for order in orders
+                ]
+                if executor is not None:
+                    results = executor.map(_read_and_flatten_task, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+                else:
+                    results = (
+                        read_and_flatten(response_path, title, question_banks[bank_key], cipher)
+                        for title, bank_key, response_path in tasks
+                    )
+                results = iter(results)
+
+                batch_ids = [session_id for session_id, _orders in batch_sessions]
+                batch = {session_id: [next(results)[1] for _order in orders] for session_id, orders in batch_sessions}
+                score_rows = kccq12_score_rows(batch_ids, batch)
+
+                for session_id, scores in zip(batch_ids, score_rows):
+                    bundles = batch[session_id]
+                    timestamps = {bundle.authored: parse_iso_timestamp(bundle.authored) for bundle in bundles if bundle.authored}
+                    cells = summary_columns.session_cells(session_id, bundles, timestamps)
+                    if len(summary_columns.index) != score_offset:
+                        raise RuntimeError(f"Session {session_id} has answers outside the question catalog.")
+                    row: List[Any] = [None] * len(header)
+                    for column, value in cells.items():
+                        row[column] = value
+                    row[score_offset:] = scores
+                    writer.writerow(row)
+
+                    counts["sessions"] += 1
+                    counts["response_files"] += len(bundles)
+                    counts["answers"] += sum(len(bundle.answers) for bundle in bundles)
+                    counts["skipped_unknown_items"] += sum(bundle.skipped_items for bundle in bundles)
+                    counts["unparsable_timestamps"] += sum(
+                        1 for bundle in bundles if bundle.authored and timestamps[bundle.authored] is None
+                    )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if run_report is not None:
+        run_report.count("questionnaires", len(questionnaire_entries))
+        for name, value in counts.items():
+            run_report.count(name, value)
+        run_report.count("summary_rows", counts["sessions"])
+    return counts["sessions"]
+
+
+def write_vitals_trends_csv(csv_path: Path, vitals_trends: pd.DataFrame) -> None:
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    vitals_trends.to_csv(csv_path, index=False)
+
+
+ANSWER_TABLE_COLUMNS = [
+    "Session ID",
+    "Subject",
+    "Questionnaire",
+    "LinkId",
+    "Section",
+    "Question",
+    "Code",
+    "Display",
+    "Raw Value",
+    "Authored",
+]
+# Low-cardinality columns stored as categoricals, i.e. dictionary-encoded in Parquet/Arrow.
+ANSWER_TABLE_CATEGORICAL_COLUMNS = ["Session ID", "Subject", "Questionnaire", "LinkId", "Section", "Question", "Code", "Display"]
+CATALOG_TABLE_COLUMNS = ["Questionnaire", "Section", "Question", "LinkId", "Type", "Possible Choices"]
+ANSWER_EXPORT_SUFFIXES = {".parquet", ".arrow", ".feather", ".csv"}
+
+
+def format_raw_value(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def iter_answer_records(
+    sessions: Mapping[str, List[QuestionnaireResponseBundle]],
+    timestamps: Mapping[str, Any],
+) -> Iterator[Tuple[Any, ...]]:
+    """Yield every flattened answer as a tuple in :data:`ANSWER_TABLE_COLUMNS` order."""
+    for session_id in sorted(sessions.keys()):
+        for bundle in sessions[session_id]:
+            authored = timestamps.get(bundle.authored) if bundle.authored else None
+            for answer in bundle.answers:
+                yield (
+                    session_id,
+                    bundle.subject,
+                    answer.questionnaire,
+                    answer.link_id,
+                    answer.section,
+                    answer.question,
+                    answer.code,
+                    answer.display,
+                    format_raw_value(answer.raw_value),
+                    authored,
+                )
+
+
+def build_answer_table(
+    sessions: Mapping[str, List[QuestionnaireResponseBundle]],
+    timestamps: Optional[Mapping[str, Optional[pd.Timestamp]]] = None,
+) -> pd.DataFrame:
+    """Return every flattened answer as one long table, one row per ``AnswerRow``.
+
+    Repetitive string columns are categoricals so they are dictionary-encoded when written
+    to a columnar format. Raw values are kept as text (JSON booleans, numbers as written)
+    and ``Authored`` holds the parsed UTC-naive timestamp.
+    """
+    import pandas as pd
+
+    if timestamps is None:
+        timestamps = collect_authored_timestamps(sessions)
+
+    columns: Dict[str, List[Any]] = {column: [] for column in ANSWER_TABLE_COLUMNS}
+    column_values = list(columns.values())
+    for record in iter_answer_records(sessions, timestamps):
+        for values, value in zip(column_values, record):
+            values.append(value)
+
+    answer_df = pd.DataFrame(
+        {
+            column: (
+                pd.Categorical(values)
+                if column in ANSWER_TABLE_CATEGORICAL_COLUMNS
+                else pd.Series(values, dtype="datetime64[ns]" if column == "Authored" else object)
+            )
+            for column, values in columns.items()
+        }
+    )
+    return answer_df
+
+
+def build_catalog_table(question_catalog: Sequence[Mapping[str, Any]]) -> pd.DataFrame:
+    import pandas as pd
+
+    catalog_df = pd.DataFrame(list(question_catalog), columns=CATALOG_TABLE_COLUMNS)
+    for column in ("Questionnaire", "Section", "Type"):
+        catalog_df[column] = pd.Categorical(catalog_df[column])
+    return catalog_df
+
+
+def columnar_companion_path(path: Path, name: str) -> Path:
+    return path.with_name(f"{path.stem}_{name}{path.suffix}")
+
+
+def write_columnar_table(path: Path, table: pd.DataFrame) -> None:
+    """Write ``table`` as Parquet (``.parquet``) or Arrow IPC/Feather (``.arrow``/``.feather``)."""
+    suffix = path.suffix.lower()
+    if suffix not in {".parquet", ".arrow", ".feather"}:
+        raise ValueError(f"Unsupported columnar format '{path.suffix}'; use .parquet, .arrow or .feather.")
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as error:
+        raise SystemExit("Columnar export requires pyarrow. Install via \"pip install pyarrow\".") from error
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if suffix == ".parquet":
+        table.to_parquet(path, index=False)
+    else:
+        table.reset_index(drop=True).to_feather(path)
+
+
+def write_answer_export(
+    answers_path: Path,
+    sessions: Mapping[str, List[QuestionnaireResponseBundle]],
+    question_catalog: Sequence[Mapping[str, Any]],
+    timestamps: Optional[Mapping[str, Optional[pd.Timestamp]]] = None,
+) -> Path:
+    """Write the long answer table and its companion question catalog; returns the catalog path.
+
+    A ``.csv`` path is written with the standard library (see :func:`write_answer_csv`).
+    """
+    if answers_path.suffix.lower() == ".csv":
+        if timestamps is None:
+            timestamps = collect_authored_timestamps(sessions)
+        return write_answer_csv(answers_path, sessions, question_catalog, timestamps)
+    write_columnar_table(answers_path, build_answer_table(sessions, timestamps))
+    catalog_path = columnar_companion_path(answers_path, "catalog")
+    write_columnar_table(catalog_path, build_catalog_table(question_catalog))
+    return catalog_path
+
+
+def write_answer_csv(
+    answers_path: Path,
+    sessions: Mapping[str, List[QuestionnaireResponseBundle]],
+    question_catalog: Sequence[Mapping[str, Any]],
+    timestamps: Mapping[str, Any],
+) -> Path:
+    """Write the long answer table and question catalog as CSV files; returns the catalog path.
+
+    ``Authored`` holds the parsed UTC time as ``YYYY-MM-DD HH:MM:SS`` and raw values are
+    written as by :func:`format_raw_value`.
+    """
+    answers_path.parent.mkdir(parents=True, exist_ok=True)
+    with answers_path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle, lineterminator=os.linesep)
+        writer.writerow(ANSWER_TABLE_COLUMNS)
+        writer.writerows(iter_answer_records(sessions, timestamps))
+
+    catalog_path = columnar_companion_path(answers_path, "catalog")
+    with catalog_path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle, lineterminator=os.linesep)
+        writer.writerow(CATALOG_TABLE_COLUMNS)
+        writer.writerows([entry.get(column) for column in CATALOG_TABLE_COLUMNS] for entry in question_catalog)
+    return catalog_path
+
+
+@dataclass(frozen=True)
+class ReportData:
+    """The flattened export every output is written from, built once per run.
+
+    Writers only read it, so output worker processes inherit it on fork (or, without
+    fork, are sent one copy each through the pool initializer) instead of rebuilding or
+    re-parsing anything.
+    The summary is either ``summary_df`` or, for --csv-only, ``summary_header`` and
+    ``summary_rows``.
+    """
+
+    sessions: Mapping[str, List[QuestionnaireResponseBundle]]
+    question_catalog: Sequence[Mapping[str, Any]]
+    timestamps: Mapping[str, Any]
+    summary_df: Optional[pd.DataFrame] = None
+    summary_header: Sequence[str] = ()
+    summary_rows: Sequence[Sequence[Any]] = ()
+    vitals_trends: Optional[pd.DataFrame] = None
+
+
+@dataclass(frozen=True)
+class OutputTask:
+    """One output of a run: a module-level writer, its path and writer-specific options."""
+
+    name: str
+    writer: Callable[..., "OutputResult"]
+    path: Path
+    options: Mapping[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class OutputResult:
+    """Messages, counts and timings of one written output."""
+
+    messages: List[str] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+
+
+def write_excel_output(
+    data: ReportData,
+    path: Path,
+    shard_by: Optional[str] = None,
+    shard_size: int = 500,
+    workers: int = 1,
+    streaming: bool = False,
+) -> OutputResult:
+    result = OutputResult()
+    if shard_by is not None:
+        shard_paths = write_sharded_excel_report(
+            path,
+            data.summary_df,
+            data.sessions,
+            data.question_catalog,
+            data.timestamps,
+            data.vitals_trends,
+            shard_by=shard_by,
+            shard_size=shard_size,
+            workers=workers,
+        )
+    else:
+        shard_paths = []
+        writer = write_excel_report_streaming if streaming else write_excel_report
+        writer(path, data.summary_df, data.sessions, data.question_catalog, data.timestamps, data.vitals_trends)
+    result.messages.append(f"Written Excel report to {path}")
+    if shard_paths:
+        result.counts["workbook_shards"] = len(shard_paths)
+        result.messages.append(f"Written {len(shard_paths)} session workbooks to {path.parent}")
+    return result
+
+
+def write_csv_output(data: ReportData, path: Path, vitals_path: Optional[Path] = None) -> OutputResult:
+    result = OutputResult()
+    if data.summary_df is not None:
+        write_csv_summary(path, data.summary_df)
+    else:
+        write_csv_summary_rows(path, data.summary_header, data.summary_rows)
+    result.messages.append(f"Written CSV summary to {path}")
+    if vitals_path is not None and data.vitals_trends is not None and not data.vitals_trends.empty:
+        write_vitals_trends_csv(vitals_path, data.vitals_trends)
+        result.messages.append(f"Written vitals trends to {vitals_path}")
+    return result
+
+
+def write_answers_output(data: ReportData, path: Path) -> OutputResult:
+    catalog_path = write_answer_export(path, data.sessions, data.question_catalog, data.timestamps)
+    return OutputResult(messages=[f"Written answer table to {path}", f"Written question catalog to {catalog_path}"])
+
+
+def write_store_output(data: ReportData, path: Path) -> OutputResult:
+    from answer_store import AnswerStore
+
+    with AnswerStore(path) as store:
+        stats = store.upsert(data.sessions, data.question_catalog, data.timestamps)
+    return OutputResult(
+        messages=[
+            f"Upserted answers into {path} ({stats.inserted} new, "
+            f"{stats.updated} changed, {stats.unchanged} unchanged responses)"
+        ],
+        counts={
+            "store_responses_inserted": stats.inserted,
+            "store_responses_updated": stats.updated,
+            "store_responses_unchanged": stats.unchanged,
+        },
+    )
+
+
+# Report data shared by the output writers of one worker process.
+_WORKER_REPORT_DATA: Optional[ReportData] = None
+
+
+def _init_output_worker(data: ReportData) -> None:
+    global _WORKER_REPORT_DATA
+    _WORKER_REPORT_DATA = data
+
+
+def _output_executor(data: ReportData, max_workers: int) -> ProcessPoolExecutor:
+    """Return a pool whose workers see ``data`` as ``_WORKER_REPORT_DATA``.
+
+    Forked workers inherit it from this process, so nothing is pickled; where fork is not
+    available every worker is sent its own copy through the initializer.
+    """
+    global _WORKER_REPORT_DATA
+    if "fork" in multiprocessing.get_all_start_methods():
+        _WORKER_REPORT_DATA = data
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("fork"))
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_output_worker, initargs=(data,))
+
+
+def _run_output_task(task: OutputTask, data: Optional[ReportData] = None) -> OutputResult:
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = task.writer(data if data is not None else _WORKER_REPORT_DATA, task.path, **task.options)
+    result.wall_seconds = time.perf_counter() - wall_start
+    result.cpu_seconds = time.process_time() - cpu_start
+    return result
+
+
+def write_report_outputs(
+    data: ReportData,
+    tasks: Sequence[OutputTask],
+    workers: int = 1,
+    run_report: Optional[RunReport] = None,
+) -> List[OutputResult]:
+    """Write every output in ``tasks`` from ``data``; returns their results in task order.
+
+    With more than one worker the first task (put the slowest writer first) runs in this
+    process while the others run concurrently in worker processes, so the stage takes
+    about as long as the slowest writer. A ``workers`` option of the first task (the
+    --shard workbook pool) is cut to the workers the output pool leaves free, so no more
+    than ``workers`` processes write at once. Each writer is recorded in the run report
+    as a stage nested in ``write_outputs``.
+    """
+    global _WORKER_REPORT_DATA
+    with _stage(run_report, "write_outputs"):
+        if workers > 1 and len(tasks) > 1:
+            pool_size = min(workers, len(tasks)) - 1
+            first = tasks[0]
+            if "workers" in first.options:
+                first = replace(first, options={**first.options, "workers": max(1, workers - pool_size)})
+            try:
+                with _output_executor(data, pool_size) as executor:
+                    futures = [executor.submit(_run_output_task, task) for task in tasks[1:]]
+                    results = [_run_output_task(first, data)] + [future.result() for future in futures]
+            finally:
+                _WORKER_REPORT_DATA = None
+        else:
+            results = [_run_output_task(task, data) for task in tasks]
+
+    if run_report is not None:
+        for task, result in zip(tasks, results):
+            run_report.stages.append(
+                StageMetrics(
+                    name=task.name,
+                    wall_seconds=result.wall_seconds,
+                    cpu_seconds=result.cpu_seconds,
+                    parent="write_outputs",
+                )
+            )
+            for name, value in result.counts.items():
+                run_report.count(name, value)
+    return results
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Generate ENGAGE-HF session reports.")
     parser.add_argument(
@@ -537,24 +2293,371 @@ def main() -> None:
         default=DEFAULT_OUTPUT_DIR / "session_summary.csv",
         help="Path for the generated CSV summary.",
     )
+    parser.add_argument(
+        "--csv-only",
+        action="store_true",
+        help="Skip the Excel workbook and vitals trends and write the CSV summary with the standard "
+        "library only, without importing pandas (fast start for small incremental runs).",
+    )
+    parser.add_argument(
+        "--streaming-csv",
+        action="store_true",
+        help="Like --csv-only, but flatten and write the CSV summary one session at a time so memory "
+        "stays bounded; every catalog column and the KCCQ-12 scores are always written.",
+    )
+    parser.add_argument(
+        "--vitals-csv",
+        type=Path,
+        default=None,
+        help="Path for the per-participant vitals trends CSV, also written to the Vitals Trends sheet "
+        "(default: vitals_trends.csv next to --csv).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to flatten response files, analyse --recordings, write "
+        "--shard workbooks and write the outputs concurrently (default: 1, everything runs serially). "
+        "Output workers share the flattened export copy-on-write where fork is available and get a "
+        "full copy each elsewhere, so peak memory can grow by up to one export per extra worker.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Directory for the flattened-response cache; only new or changed files are re-flattened. "
+        "Cache files are pickles, and loading a pickle can run arbitrary code, so keep the directory "
+        "private: files and directories not owned by you or writable by others are ignored.",
+    )
+    parser.add_argument(
+        "--streaming-excel",
+        action="store_true",
+        help="Write the Excel workbook row by row in constant-memory mode (recommended for large exports).",
+    )
+    parser.add_argument(
+        "--shard",
+        choices=SHARD_MODES,
+        default=None,
+        help="Write the per-session sheets to several workbooks next to --excel, one per month or per "
+        "--shard-size sessions, in parallel across the --workers the other outputs leave free; "
+        "--excel becomes an index workbook linking to them and earlier <excel stem>_<label> shards "
+        "are removed.",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=500,
+        help="Sessions per workbook with --shard count (default: 500).",
+    )
+    parser.add_argument(
+        "--encrypted",
+        action="store_true",
+        help="Read response files from the encrypted export and decrypt them in memory.",
+    )
+    # The key is not accepted as a value on the command line, where the process list and
+    # shell history would expose it.
+    parser.add_argument(
+        "--key-file",
+        type=Path,
+        default=None,
+        help="File holding the base64 encryption key for --encrypted (defaults to the ENCRYPTION_KEY environment variable).",
+    )
+    parser.add_argument(
+        "--definitions",
+        type=Path,
+        default=None,
+        help="Directory containing the Questionnaire definition JSON files (defaults to --root).",
+    )
+    parser.add_argument(
+        "--answers",
+        type=Path,
+        default=None,
+        help="Optional long-format answer export (.parquet, .arrow, .feather or .csv); the question "
+        "catalog is written next to it with a _catalog suffix.",
+    )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=None,
+        help="Upsert the flattened answers and question catalog into this SQLite database "
+        "(query it with answer_store.py).",
+    )
+    parser.add_argument(
+        "--recordings",
+        action="store_true",
+        help="Analyse the WAV files and Twilio metadata in the recordings folder and add "
+        "duration, talk time, silence and level columns to the summary.",
+    )
+    parser.add_argument(
+        "--run-report",
+        type=Path,
+        default=None,
+        help="Write a JSON run report with wall time and CPU time per stage plus "
+        "file, session, answer and data-quality counts.",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Report the tracemalloc peak per stage in --run-report instead of the timings, which "
+        "memory tracing distorts; run again without it to time the stages.",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        default=None,
+        help="Profile the run with cProfile and dump the stats to this path (read with pstats or snakeviz).",
+    )
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1.")
+    if args.shard_size < 1:
+        parser.error("--shard-size must be at least 1.")
+    key_text: Optional[str] = os.environ.get("ENCRYPTION_KEY")
+    if args.key_file is not None:
+        try:
+            key_text = args.key_file.read_text(encoding="utf-8").strip()
+        except OSError as error:
+            parser.error(f"cannot read --key-file: {error}")
+    if args.encrypted and not key_text:
+        parser.error("--encrypted requires the ENCRYPTION_KEY environment variable or --key-file.")
+    if args.encrypted and args.cache_dir is not None:
+        parser.error("--cache-dir stores decrypted answers on disk and cannot be combined with --encrypted.")
+    if args.csv_only and (args.streaming_excel or args.shard is not None or args.recordings):
+        parser.error("--csv-only cannot be combined with --streaming-excel, --shard or --recordings.")
+    if args.streaming_csv and (
+        args.streaming_excel
+        or args.shard is not None
+        or args.recordings
+        or args.cache_dir is not None
+        or args.answers is not None
+        or args.store is not None
+    ):
+        parser.error(
+            "--streaming-csv cannot be combined with --streaming-excel, --shard, --recordings, "
+            "--cache-dir, --answers or --store."
+        )
 
     root = args.root.resolve()
     excel_path = args.excel if args.excel.is_absolute() else (root / args.excel)
     csv_path = args.csv if args.csv.is_absolute() else (root / args.csv)
-
-    sessions, question_catalog = collect_questionnaire_data(root)
-
-    if not sessions:
-        raise SystemExit("No questionnaire responses found under the specified root directory.")
-
-    summary_df = build_summary_dataframe(sessions)
-
-    write_excel_report(excel_path, summary_df, sessions, question_catalog)
-    write_csv_summary(csv_path, summary_df)
-
-    print(f"Written Excel report to {excel_path}")
-    print(f"Written CSV summary to {csv_path}")
+    if args.vitals_csv is None:
+        vitals_csv_path = csv_path.with_name("vitals_trends.csv")
+    else:
+        vitals_csv_path = args.vitals_csv if args.vitals_csv.is_absolute() else (root / args.vitals_csv)
+    answers_path: Optional[Path] = None
+    if args.answers is not None:
+        answers_path = args.answers if args.answers.is_absolute() else (root / args.answers)
+        if answers_path.suffix.lower() not in ANSWER_EXPORT_SUFFIXES:
+            parser.error("--answers must end in .parquet, .arrow, .feather or .csv.")
+        if args.csv_only and answers_path.suffix.lower() != ".csv":
+            parser.error("--csv-only writes --answers as CSV; use a .csv path.")
+    store_path: Optional[Path] = None
+    if args.store is not None:
+        store_path = args.store if args.store.is_absolute() else (root / args.store)
+    cache_dir: Optional[Path] = None
+    if args.cache_dir is not None:
+        cache_dir = args.cache_dir if args.cache_dir.is_absolute() else (root / args.cache_dir)
+
+    definitions_dir = args.definitions.resolve() if args.definitions is not None else None
+    run_report_path: Optional[Path] = None
+    if args.run_report is not None:
+        run_report_path = args.run_report if args.run_report.is_absolute() else (root / args.run_report)
+    profile_path: Optional[Path] = None
+    if args.profile is not None:
+        profile_path = args.profile if args.profile.is_absolute() else (root / args.profile)
+
+    decryption_key: Optional[bytes] = None
+    decryption_errors: Tuple[type, ...] = ()
+    if args.encrypted:
+        from decrypt_files import DecryptionError, decode_key
+
+        decryption_errors = (DecryptionError,)
+        try:
+            decryption_key = decode_key(key_text)
+        except DecryptionError as error:
+            raise SystemExit(f"Error: {error}") from error
+
+    run_report: Optional[RunReport] = None
+    if run_report_path is not None:
+        run_report = RunReport(
+            trace_memory=args.trace_memory,
+            settings={
+                "root": str(root),
+                "workers": args.workers,
+                "cache": cache_dir is not None,
+                "encrypted": args.encrypted,
+                "csv_only": args.csv_only,
+                "streaming_csv": args.streaming_csv,
+                "streaming_excel": args.streaming_excel,
+                "shard": args.shard,
+                "recordings": args.recordings,
+                "answers": answers_path is not None,
+                "store": store_path is not None,
+            },
+        )
+        run_report.start()
+    profiler = None
+    if profile_path is not None:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        if args.streaming_csv:
+            try:
+                row_count = write_csv_summary_streaming(
+                    csv_path,
+                    root,
+                    workers=args.workers,
+                    decryption_key=decryption_key,
+                    definitions_dir=definitions_dir,
+                    run_report=run_report,
+                )
+            except decryption_errors as error:
+                raise SystemExit(f"Error: failed to decrypt {error}") from error
+            if not row_count:
+                raise SystemExit("No questionnaire responses found under the specified root directory.")
+            print(f"Written CSV summary to {csv_path}")
+            if run_report is not None:
+                run_report.completed = True
+            return
+
+        with _stage(run_report, "index_export"):
+            export_index = index_export(root)
+        try:
+            sessions, question_catalog = collect_questionnaire_data(
+                root,
+                workers=args.workers,
+                cache_dir=cache_dir,
+                decryption_key=decryption_key,
+                definitions_dir=definitions_dir,
+                run_report=run_report,
+                export_index=export_index,
+            )
+        except decryption_errors as error:
+            raise SystemExit(f"Error: failed to decrypt {error}") from error
+
+        if not sessions:
+            raise SystemExit("No questionnaire responses found under the specified root directory.")
+        if run_report is not None:
+            run_report.count("sessions", len(sessions))
+            run_report.count("answers", sum(len(bundle.answers) for bundles in sessions.values() for bundle in bundles))
+
+        if args.csv_only:
+            with _stage(run_report, "build_summary"):
+                timestamps = collect_authored_datetimes(sessions)
+                summary_header, summary_rows = build_summary_rows(sessions, question_catalog, timestamps)
+            with _stage(run_report, "score_kccq12"):
+                summary_header, summary_rows = add_kccq12_score_rows(summary_header, summary_rows, sessions)
+            summary_row_count = len(summary_rows)
+        else:
+            # Importing pandas takes a noticeable share of a small run; keep it out of build_summary.
+            with _stage(run_report, "import_pandas"):
+                _import_pandas()
+            with _stage(run_report, "build_summary"):
+                timestamps = collect_authored_timestamps(sessions)
+                summary_df = build_summary_dataframe(sessions, question_catalog, timestamps)
+            with _stage(run_report, "score_kccq12"):
+                summary_df = add_kccq12_scores(summary_df, sessions)
+            summary_row_count = len(summary_df)
+        if run_report is not None:
+            run_report.count(
+                "unparsable_timestamps",
+                sum(
+                    1
+                    for bundles in sessions.values()
+                    for bundle in bundles
+                    if bundle.authored and timestamps.get(bundle.authored) is None
+                ),
+            )
+            run_report.count("summary_rows", summary_row_count)
+
+        output_tasks: List[OutputTask] = []
+        if args.csv_only:
+            report_data = ReportData(
+                sessions=sessions,
+                question_catalog=question_catalog,
+                timestamps=timestamps,
+                summary_header=summary_header,
+                summary_rows=summary_rows,
+            )
+            output_tasks.append(OutputTask("write_csv", write_csv_output, csv_path))
+        else:
+            from vitals_trends import FLAG_COLUMNS, build_vitals_trends
+
+            with _stage(run_report, "vitals_trends"):
+                vitals_trends = build_vitals_trends(sessions, timestamps)
+            if run_report is not None:
+                run_report.count("vitals_trend_rows", len(vitals_trends))
+                run_report.count("vitals_participants", vitals_trends["Participant"].nunique())
+                run_report.count("vitals_flagged_rows", int(vitals_trends[FLAG_COLUMNS].any(axis=1).sum()))
+            if args.recordings:
+                from recording_analytics import collect_recording_summary
+
+                with _stage(run_report, "analyse_recordings"):
+                    recording_summary = collect_recording_summary(
+                        root,
+                        workers=args.workers,
+                        decryption_key=decryption_key,
+                        export_index=export_index,
+                        run_report=run_report,
+                    )
+                    summary_df = add_recording_columns(summary_df, recording_summary)
+
+            report_data = ReportData(
+                sessions=sessions,
+                question_catalog=question_catalog,
+                timestamps=timestamps,
+                summary_df=summary_df,
+                vitals_trends=vitals_trends,
+            )
+            # The workbook is by far the slowest output, so it goes first (see write_report_outputs).
+            output_tasks.append(
+                OutputTask(
+                    "write_excel",
+                    write_excel_output,
+                    excel_path,
+                    {
+                        "shard_by": args.shard,
+                        "shard_size": args.shard_size,
+                        "workers": args.workers,
+                        "streaming": args.streaming_excel,
+                    },
+                )
+            )
+            output_tasks.append(OutputTask("write_csv", write_csv_output, csv_path, {"vitals_path": vitals_csv_path}))
+
+        if answers_path is not None:
+            output_tasks.append(OutputTask("write_answers", write_answers_output, answers_path))
+        if store_path is not None:
+            output_tasks.append(OutputTask("write_store", write_store_output, store_path))
+
+        store_errors: Tuple[type, ...] = ()
+        if store_path is not None:
+            from answer_store import StoreError
+
+            store_errors = (StoreError,)
+        try:
+            output_results = write_report_outputs(report_data, output_tasks, workers=args.workers, run_report=run_report)
+        except store_errors as error:
+            raise SystemExit(f"Error: {error}") from error
+        for result in output_results:
+            for message in result.messages:
+                print(message)
+
+        if run_report is not None:
+            run_report.completed = True
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profile_path.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(profile_path)
+            print(f"Written profile to {profile_path}")
+        if run_report is not None:
+            run_report.stop()
+            run_report.write(run_report_path)
+            print(f"Written run report to {run_report_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Generate a synthetic decrypted session export for load testing.
+
+The export mirrors the layout generate_session_reports.py reads: one
+Questionnaire definition per response folder (``vital_signs.json``,
+``kccq12_questionnairs.json``, ``q17.json``) copied from the real definitions in
+``Sources/App/Resources``, plus one QuestionnaireResponse per call and
+questionnaire. Responses are built from the mock responses in
+``Resources/MockData`` with their answers replaced by random valid codes and
+in-range vitals, and are named like the voice service names them (the first 16
+hex digits of SHA-256 over phone number and call date).
+
+Output is deterministic for a given seed and size.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import hashlib
+import json
+import random
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DEFAULT_RESOURCES_DIR = SCRIPT_DIR.parent / "Sources" / "App" / "Resources"
+
+# Response folder name -> Questionnaire definition in the app resources.
+QUESTIONNAIRE_SOURCES = {
+    "vital_signs": "vitalSigns.json",
+    "kccq12_questionnairs": "kccq12.json",
+    "q17": "q17.json",
+}
+
+START_DATE = datetime(2025, 1, 6, tzinfo=timezone.utc)
+# Pacific time, like the timestamps written by the voice service.
+CALL_TIMEZONE = timezone(timedelta(hours=-8))
+
+
+@dataclass
+class ItemSpec:
+    """How to generate an answer for one questionnaire item."""
+
+    codes: List[str]
+    minimum: Optional[int]
+    maximum: Optional[int]
+
+
+@dataclass
+class Participant:
+    phone_number: str
+    weight: float
+    systolic: float
+    diastolic: float
+    heart_rate: float
+
+
+def load_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def build_item_specs(questionnaire: Mapping[str, Any]) -> Dict[str, ItemSpec]:
+    specs: Dict[str, ItemSpec] = {}
+
+    def walk(items: Sequence[Mapping[str, Any]]) -> None:
+        for item in items:
+            codes = [
+                str(option["valueCoding"]["code"])
+                for option in item.get("answerOption", [])
+                if option.get("valueCoding", {}).get("code") is not None
+            ]
+            bounds = {
+                extension["url"].rsplit("/", 1)[-1]: extension.get("valueInteger")
+                for extension in item.get("extension", [])
+                if "url" in extension
+            }
+            specs[item["linkId"]] = ItemSpec(codes=codes, minimum=bounds.get("minValue"), maximum=bounds.get("maxValue"))
+            walk(item.get("item", []))
+
+    walk(questionnaire.get("item", []))
+    return specs
+
+
+def session_file_stem(phone_number: str, call_date: datetime) -> str:
+    """Mirror ``fileName(phoneNumber:date:internalTestingMode:)`` of the voice service."""
+    combined = phone_number + call_date.strftime("%Y-%m-%d")
+    return hashlib.sha256(combined.encode("utf-8")).hexdigest()[:16]
+
+
+def format_authored(moment: datetime) -> str:
+    return moment.astimezone(CALL_TIMEZONE).isoformat(timespec="seconds")
+
+
+def _clamp(value: float, spec: ItemSpec) -> int:
+    lower = spec.minimum if spec.minimum is not None else value
+    upper = spec.maximum if spec.maximum is not None else value
+    return int(round(min(max(value, lower), upper)))
+
+
+def fill_response(
+    template: Mapping[str, Any],
+    specs: Mapping[str, ItemSpec],
+    participant: Participant,
+    authored: str,
+    rng: random.Random,
+) -> Dict[str, Any]:
+    response = copy.deepcopy(dict(template))
+    response["subject"] = {"reference": participant.phone_number}
+    response["authored"] = authored
+    vitals = {
+        "systolic": participant.systolic,
+        "diastolic": participant.diastolic,
+        "heart-rate": participant.heart_rate,
+        "weight": participant.weight,
+    }
+
+    def walk(items: List[Dict[str, Any]]) -> None:
+        for item in items:
+            spec = specs.get(item.get("linkId"))
+            for answer in item.get("answer", []):
+                if spec is None:
+                    continue
+                if spec.codes:
+                    code = rng.choice(spec.codes)
+                    for key in list(answer):
+                        del answer[key]
+                    answer["valueString"] = code
+                elif "valueInteger" in answer:
+                    centre = vitals.get(item["linkId"], ((spec.minimum or 0) + (spec.maximum or 100)) / 2)
+                    answer["valueInteger"] = _clamp(rng.gauss(centre, 3.0), spec)
+            walk(item.get("item", []))
+
+    walk(response.get("item", []))
+    return response
+
+
+def generate_export(
+    output_dir: Path,
+    sessions: int,
+    participants: Optional[int] = None,
+    seed: int = 0,
+    completion: float = 0.9,
+    resources_dir: Path = DEFAULT_RESOURCES_DIR,
+) -> Dict[str, int]:
+    """Write a synthetic export with ``sessions`` calls and return file counts per folder."""
+    rng = random.Random(seed)
+    participants = participants or max(1, sessions // 10)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    templates: Dict[str, Tuple[Dict[str, Any], Dict[str, ItemSpec]]] = {}
+    for folder, definition_name in QUESTIONNAIRE_SOURCES.items():
+        definition_path = resources_dir / definition_name
+        shutil.copyfile(definition_path, output_dir / f"{folder}.json")
+        template = load_json(resources_dir / "MockData" / folder / "1.json")
+        templates[folder] = (template, build_item_specs(load_json(definition_path)))
+        (output_dir / folder).mkdir(exist_ok=True)
+
+    cohort = [
+        Participant(
+            phone_number=f"+1650{index:07d}",
+            weight=rng.uniform(130, 260),
+            systolic=rng.uniform(105, 150),
+            diastolic=rng.uniform(65, 95),
+            heart_rate=rng.uniform(55, 95),
+        )
+        for index in range(participants)
+    ]
+    calls_per_participant = -(-sessions // participants)
+    counts = {folder: 0 for folder in QUESTIONNAIRE_SOURCES}
+
+    written = 0
+    for call_index in range(calls_per_participant):
+        for participant in cohort:
+            if written >= sessions:
+                break
+            written += 1
+            # Roughly one call every few days per participant, with slow vitals drift. Calls fall
+            # between 08:00 and 15:59 Pacific so each call date maps to one file stem.
+            moment = START_DATE + timedelta(days=call_index * 3 + rng.randint(0, 2), minutes=rng.randint(16 * 60, 24 * 60 - 1))
+            participant.weight += rng.gauss(0.1, 0.8)
+            authored = format_authored(moment)
+            stem = session_file_stem(participant.phone_number, moment.astimezone(CALL_TIMEZONE))
+            for folder, (template, specs) in templates.items():
+                if rng.random() > completion:
+                    continue
+                response = fill_response(template, specs, participant, authored, rng)
+                with (output_dir / folder / f"{stem}.json").open("w", encoding="utf-8") as handle:
+                    json.dump(response, handle, indent=2)
+                counts[folder] += 1
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic ENGAGE-HF session export.")
+    parser.add_argument("output", type=Path, help="Directory to write the export to.")
+    parser.add_argument("--sessions", type=int, default=1000, help="Number of calls to generate (default: 1000).")
+    parser.add_argument("--participants", type=int, default=None, help="Number of participants (default: sessions / 10).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0).")
+    parser.add_argument(
+        "--completion",
+        type=float,
+        default=0.9,
+        help="Probability that a call has a response for each questionnaire (default: 0.9).",
+    )
+    parser.add_argument(
+        "--resources",
+        type=Path,
+        default=DEFAULT_RESOURCES_DIR,
+        help="Directory with the Questionnaire definitions and MockData responses.",
+    )
+    args = parser.parse_args()
+    if args.sessions < 1:
+        parser.error("--sessions must be at least 1.")
+
+    counts = generate_export(
+        args.output,
+        sessions=args.sessions,
+        participants=args.participants,
+        seed=args.seed,
+        completion=args.completion,
+        resources_dir=args.resources,
+    )
+    for folder, count in counts.items():
+        print(f"{folder}: {count} responses")
+    print(f"Written synthetic export to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
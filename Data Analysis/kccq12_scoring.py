@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""KCCQ-12 domain and summary scores for flattened questionnaire responses.
+
+Scores follow the published KCCQ-12 scoring rules (Spertus & Jones, 2015):
+
+* Every item is rescaled to 0-100 over its valid codes, ``(code - 1) / (max - 1)``.
+  Codes above the valid range ("limited for other reasons", "does not apply")
+  count as missing.
+* Physical Limitation (items 1a-1c), Symptom Frequency (items 2-5), Quality of
+  Life (items 6-7) and Social Limitation (items 8a-8c) are the mean of their
+  answered items, provided at least 2, 2, 1 and 2 items were answered.
+* The Overall Summary score is the mean of the domain scores that could be
+  computed.
+
+Answers are gathered into one sessions x items matrix and all scores are computed
+with NumPy in a single pass over that matrix. The short internal-testing form
+only asks items 1a-1c, so it yields Physical Limitation (and the summary) only.
+
+``kccq12_score_rows`` computes the same values in plain Python for the
+standard-library report path; NumPy and pandas are only imported by the
+vectorized functions.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+
+@dataclass(frozen=True)
+class KccqItem:
+    """A scored KCCQ-12 item; codes above ``max_code`` are treated as missing."""
+
+    link_id: str
+    domain: str
+    max_code: int
+
+
+PHYSICAL_LIMITATION = "Physical Limitation"
+SYMPTOM_FREQUENCY = "Symptom Frequency"
+QUALITY_OF_LIFE = "Quality of Life"
+SOCIAL_LIMITATION = "Social Limitation"
+
+KCCQ12_ITEMS = [
+    KccqItem("a459b804-35bf-4792-f1eb-0b52c4e176e1", PHYSICAL_LIMITATION, 5),  # 1a showering/bathing
+    KccqItem("cf9c5031-1ed5-438a-fc7d-dc69234015a0", PHYSICAL_LIMITATION, 5),  # 1b walking 1 block
+    KccqItem("1fad0f81-b2a9-4c8f-9a78-4b2a5d7aef07", PHYSICAL_LIMITATION, 5),  # 1c hurrying or jogging
+    KccqItem("692bda7d-a616-43d1-8dc6-8291f6460ab2", SYMPTOM_FREQUENCY, 5),  # 2 swelling
+    KccqItem("b1734b9e-1d16-4238-8556-5ae3fa0ba913", SYMPTOM_FREQUENCY, 7),  # 3 fatigue
+    KccqItem("57f37fb3-a0ad-4b1f-844e-3f67d9b76946", SYMPTOM_FREQUENCY, 7),  # 4 shortness of breath
+    KccqItem("396164df-d045-4c56-d710-513297bdc6f2", SYMPTOM_FREQUENCY, 5),  # 5 sleeping sitting up
+    KccqItem("75e3f62e-e37d-48a2-f4d9-af2db8922da0", QUALITY_OF_LIFE, 5),  # 6 enjoyment of life
+    KccqItem("fce3a16e-c6d8-4bac-8ab5-8f4aee4adc08", QUALITY_OF_LIFE, 5),  # 7 satisfaction
+    KccqItem("8b022e69-127d-4447-8190-39ac645e60e1", SOCIAL_LIMITATION, 5),  # 8a hobbies
+    KccqItem("1eee7259-da1c-4cba-80a9-e67e684573a1", SOCIAL_LIMITATION, 5),  # 8b working or chores
+    KccqItem("883a22a8-2f6e-4b41-84b7-0028ed543192", SOCIAL_LIMITATION, 5),  # 8c visiting family or friends
+]
+KCCQ12_ITEM_INDEX = {item.link_id: index for index, item in enumerate(KCCQ12_ITEMS)}
+
+# Minimum number of answered items for each domain score.
+DOMAIN_MINIMUM_ANSWERED = {
+    PHYSICAL_LIMITATION: 2,
+    SYMPTOM_FREQUENCY: 2,
+    QUALITY_OF_LIFE: 1,
+    SOCIAL_LIMITATION: 2,
+}
+
+KCCQ12_SCORE_COLUMNS = [f"KCCQ-12 {domain} Score" for domain in DOMAIN_MINIMUM_ANSWERED] + ["KCCQ-12 Overall Summary Score"]
+
+
+def _answer_code(answer: Any) -> Optional[float]:
+    value = answer.code if answer.code is not None else answer.raw_value
+    try:
+        return float(int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _item_codes(bundles: Iterable[Any]) -> Dict[int, float]:
+    """Return item index -> code of one session; the last answer to an item counts."""
+    codes: Dict[int, float] = {}
+    for bundle in bundles:
+        for answer in bundle.answers:
+            column = KCCQ12_ITEM_INDEX.get(answer.link_id)
+            if column is None:
+                continue
+            code = _answer_code(answer)
+            if code is not None:
+                codes[column] = code
+    return codes
+
+
+def kccq12_item_matrix(
+    session_ids: Sequence[str],
+    sessions: Mapping[str, Iterable[Any]],
+) -> np.ndarray:
+    """Return the raw KCCQ-12 item codes as a ``len(session_ids) x 12`` float matrix (NaN = missing).
+
+    ``sessions`` maps a session ID to its questionnaire response bundles. When a session
+    answers an item more than once, the last answer counts.
+    """
+    import numpy as np
+
+    cells: Dict[tuple, float] = {}
+    for row, session_id in enumerate(session_ids):
+        for column, code in _item_codes(sessions.get(session_id, ())).items():
+            cells[(row, column)] = code
+
+    matrix = np.full((len(session_ids), len(KCCQ12_ITEMS)), np.nan)
+    if cells:
+        rows, columns = zip(*cells)
+        matrix[list(rows), list(columns)] = list(cells.values())
+    return matrix
+
+
+def score_kccq12(matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """Compute the domain and overall summary scores from a KCCQ-12 item matrix."""
+    import numpy as np
+
+    max_codes = np.array([item.max_code for item in KCCQ12_ITEMS], dtype=np.float64)
+    valid = (matrix >= 1) & (matrix <= max_codes)
+    rescaled = np.where(valid, (matrix - 1) / (max_codes - 1) * 100.0, 0.0)
+
+    scores: Dict[str, np.ndarray] = {}
+    domain_scores: List[np.ndarray] = []
+    for (domain, minimum), column in zip(DOMAIN_MINIMUM_ANSWERED.items(), KCCQ12_SCORE_COLUMNS):
+        mask = np.array([item.domain == domain for item in KCCQ12_ITEMS])
+        answered = valid[:, mask].sum(axis=1)
+        total = rescaled[:, mask].sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            score = np.where(answered >= minimum, total / answered, np.nan)
+        scores[column] = score
+        domain_scores.append(score)
+
+    stacked = np.column_stack(domain_scores)
+    available = ~np.isnan(stacked)
+    counts = available.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores[KCCQ12_SCORE_COLUMNS[-1]] = np.where(
+            counts > 0, np.where(available, stacked, 0.0).sum(axis=1) / counts, np.nan
+        )
+    return scores
+
+
+def kccq12_scores(
+    session_ids: Sequence[str],
+    sessions: Mapping[str, Iterable[Any]],
+    decimals: int = 2,
+) -> pd.DataFrame:
+    """Return the KCCQ-12 scores of ``session_ids`` as a frame with :data:`KCCQ12_SCORE_COLUMNS`."""
+    import numpy as np
+    import pandas as pd
+
+    scores = score_kccq12(kccq12_item_matrix(session_ids, sessions))
+    return pd.DataFrame({column: np.round(scores[column], decimals) for column in KCCQ12_SCORE_COLUMNS})
+
+
+def _round_half_even(value: float, decimals: int) -> float:
+    # np.round scales, rounds half to even and scales back; round(value, decimals) can differ.
+    scale = 10.0**decimals
+    return round(value * scale) / scale
+
+
+def kccq12_score_rows(
+    session_ids: Sequence[str],
+    sessions: Mapping[str, Iterable[Any]],
+    decimals: int = 2,
+) -> List[List[Optional[float]]]:
+    """Return the :func:`kccq12_scores` values row by row in plain Python (``None`` = missing).
+
+    Items and domains are summed in the same order as the NumPy version, so the scores are
+    identical to the last bit.
+    """
+    rows: List[List[Optional[float]]] = []
+    for session_id in session_ids:
+        codes = _item_codes(sessions.get(session_id, ()))
+        domain_scores: List[Optional[float]] = []
+        for domain, minimum in DOMAIN_MINIMUM_ANSWERED.items():
+            answered = 0
+            total = 0.0
+            for index, item in enumerate(KCCQ12_ITEMS):
+                code = codes.get(index)
+                if item.domain == domain and code is not None and 1 <= code <= item.max_code:
+                    answered += 1
+                    total += (code - 1) / (item.max_code - 1) * 100.0
+            domain_scores.append(total / answered if answered >= minimum else None)
+
+        available = [score for score in domain_scores if score is not None]
+        summary = sum(available, 0.0) / len(available) if available else None
+        rows.append(
+            [None if score is None else _round_half_even(score, decimals) for score in domain_scores + [summary]]
+        )
+    return rows
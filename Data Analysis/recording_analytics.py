@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Streaming analytics for decrypted call recordings.
+
+The voice service stores every Twilio recording as ``<prefix>_<RecordingSid>.wav``
+with a ``<prefix>_<RecordingSid>.json`` metadata sidecar in the ``recordings``
+folder, where ``<prefix>`` is the same hashed phone number/date used for the
+questionnaire response files of that call. This module memory-maps each WAV file
+and computes its duration, silence ratio, talk time and level statistics in
+chunked NumPy passes over fixed-length windows, so a recording is never read into
+Python as a whole. Recordings converted to FLAC by ``decrypt_files.py
+--audio-format flac`` are decoded block by block with soundfile instead, and
+encrypted recordings are decrypted and analysed chunk by chunk as the ciphertext
+is read, so memory stays bounded per recording in every case.
+
+Requires numpy (and soundfile for FLAC recordings).
+"""
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from export_index import ExportIndex, index_export, parse_session_name
+
+
+WINDOW_SECONDS = 0.02
+SILENCE_THRESHOLD_DBFS = -40.0
+WINDOWS_PER_CHUNK = 8192
+# Streamed recordings whose header does not parse within this many bytes are rejected.
+MAX_HEADER_BYTES = 64 * 1024
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_ALAW = 0x0006
+WAVE_FORMAT_MULAW = 0x0007
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavFormatError(Exception):
+    """Raised when a file is not a WAV file this module can analyse."""
+
+
+@dataclass
+class WavLayout:
+    """Location and encoding of the sample data inside a WAV file."""
+
+    format_tag: int
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+    block_align: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def frame_count(self) -> int:
+        return self.data_size // self.block_align if self.block_align else 0
+
+
+@dataclass
+class RecordingMetrics:
+    """Audio statistics and Twilio metadata for one call recording."""
+
+    session_id: str
+    recording_sid: str
+    path: Path
+    sample_rate: int
+    channels: int
+    duration_seconds: float
+    silence_ratio: Optional[float] = None
+    talk_time_seconds: Optional[float] = None
+    channel_talk_time_seconds: Tuple[float, ...] = ()
+    rms_dbfs: Optional[float] = None
+    peak_dbfs: Optional[float] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def parse_recording_name(path: Path) -> Tuple[str, str]:
+    """Split ``<prefix>_<RecordingSid>.wav`` into the session prefix and the recording SID."""
+    session_id, sid, _recognised = parse_session_name(path.stem)
+    return session_id, sid or ""
+
+
+def parse_wav_layout(buffer: Any, total_size: Optional[int] = None) -> WavLayout:
+    """Parse the RIFF/WAVE header of ``buffer`` (bytes, memoryview or mmap).
+
+    ``buffer`` may hold just the start of a file of ``total_size`` bytes, as long as it
+    reaches the start of the data chunk.
+    """
+    size = len(buffer)
+    if size < 12 or bytes(buffer[0:4]) != b"RIFF" or bytes(buffer[8:12]) != b"WAVE":
+        raise WavFormatError("Not a RIFF/WAVE file")
+
+    fmt: Optional[Tuple[int, int, int, int, int]] = None
+    offset = 12
+    while offset + 8 <= size:
+        chunk_id = bytes(buffer[offset:offset + 4])
+        (chunk_size,) = struct.unpack("<I", buffer[offset + 4:offset + 8])
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            if chunk_size < 16:
+                raise WavFormatError("Truncated fmt chunk")
+            format_tag, channels, sample_rate, _byte_rate, block_align, bits = struct.unpack(
+                "<HHIIHH", buffer[body:body + 16]
+            )
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 26:
+                # The first two bytes of the SubFormat GUID carry the actual format tag.
+                (format_tag,) = struct.unpack("<H", buffer[body + 24:body + 26])
+            fmt = (format_tag, channels, sample_rate, block_align, bits)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise WavFormatError("data chunk before fmt chunk")
+            format_tag, channels, sample_rate, block_align, bits = fmt
+            if channels < 1 or sample_rate < 1 or block_align < 1:
+                raise WavFormatError("Invalid fmt chunk")
+            # Recordings written while streaming may carry a placeholder size.
+            data_size = min(chunk_size, (total_size if total_size is not None else size) - body)
+            return WavLayout(
+                format_tag=format_tag,
+                channels=channels,
+                sample_rate=sample_rate,
+                bits_per_sample=bits,
+                block_align=block_align,
+                data_offset=body,
+                data_size=data_size - data_size % block_align,
+            )
+        offset = body + chunk_size + (chunk_size & 1)
+    raise WavFormatError("No data chunk found")
+
+
+def _mulaw_table() -> np.ndarray:
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    sign = codes & 0x80
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(sign, -magnitude, magnitude).astype(np.float32) / 32768.0
+
+
+def _alaw_table() -> np.ndarray:
+    codes = np.arange(256, dtype=np.int32) ^ 0x55
+    sign = codes & 0x80
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = np.where(
+        exponent == 0,
+        (mantissa << 4) + 8,
+        ((mantissa << 4) + 0x108) << np.maximum(exponent - 1, 0),
+    )
+    return np.where(sign, magnitude, -magnitude).astype(np.float32) / 32768.0
+
+
+_COMPANDING_TABLES: Dict[int, np.ndarray] = {}
+
+
+def _decode_pcm24(raw: np.ndarray) -> np.ndarray:
+    """Map packed little-endian 24-bit samples (``V3`` items) to floats in [-1, 1]."""
+    octets = raw.view(np.uint8).reshape(-1, 3)
+    samples = octets[:, 0].astype(np.int32)
+    samples |= octets[:, 1].astype(np.int32) << 8
+    # The high byte carries the sign.
+    samples |= octets[:, 2].view(np.int8).astype(np.int32) << 16
+    return samples.astype(np.float32) / 8388608.0
+
+
+def _sample_decoder(layout: WavLayout) -> Tuple[np.dtype, Any]:
+    """Return the raw sample dtype and a function mapping raw samples to floats in [-1, 1]."""
+    bits = layout.bits_per_sample
+    if layout.format_tag == WAVE_FORMAT_PCM and bits == 8:
+        return np.dtype(np.uint8), lambda raw: (raw.astype(np.float32) - 128.0) / 128.0
+    if layout.format_tag == WAVE_FORMAT_PCM and bits == 16:
+        return np.dtype("<i2"), lambda raw: raw.astype(np.float32) / 32768.0
+    if layout.format_tag == WAVE_FORMAT_PCM and bits == 24:
+        return np.dtype("V3"), _decode_pcm24
+    if layout.format_tag == WAVE_FORMAT_PCM and bits == 32:
+        return np.dtype("<i4"), lambda raw: raw.astype(np.float64) / 2147483648.0
+    if layout.format_tag == WAVE_FORMAT_IEEE_FLOAT and bits == 32:
+        return np.dtype("<f4"), lambda raw: raw
+    if layout.format_tag == WAVE_FORMAT_IEEE_FLOAT and bits == 64:
+        return np.dtype("<f8"), lambda raw: raw
+    if layout.format_tag in (WAVE_FORMAT_MULAW, WAVE_FORMAT_ALAW) and bits == 8:
+        table = _COMPANDING_TABLES.get(layout.format_tag)
+        if table is None:
+            table = _mulaw_table() if layout.format_tag == WAVE_FORMAT_MULAW else _alaw_table()
+            _COMPANDING_TABLES[layout.format_tag] = table
+        return np.dtype(np.uint8), lambda raw: table[raw]
+    raise WavFormatError(f"Unsupported WAV encoding (format {layout.format_tag:#06x}, {bits} bits)")
+
+
+def _to_dbfs(amplitude: float) -> Optional[float]:
+    if amplitude <= 0.0:
+        return None
+    return 20.0 * math.log10(amplitude)
+
+
+def iter_wav_chunks(buffer: Any, layout: WavLayout, chunk_frames: int) -> Iterator[np.ndarray]:
+    """Yield the samples of a WAV file as ``(frames, channels)`` floats in [-1, 1], chunk by chunk.
+
+    Each chunk is decoded from a zero-copy view of ``buffer``, so memory use is bounded by
+    ``chunk_frames``.
+    """
+    dtype, decode = _sample_decoder(layout)
+    if dtype.itemsize * layout.channels != layout.block_align:
+        raise WavFormatError("Block alignment does not match the sample format")
+    frames = layout.frame_count
+    for start in range(0, frames, chunk_frames):
+        count = min(chunk_frames, frames - start)
+        raw = np.frombuffer(
+            buffer,
+            dtype=dtype,
+            count=count * layout.channels,
+            offset=layout.data_offset + start * layout.block_align,
+        )
+        yield decode(raw).reshape(count, layout.channels)
+        # Drop the view before the next chunk so callers can close an mmap afterwards.
+        del raw
+
+
+def analyse_samples(
+    read_chunks: Callable[[int], Iterable[np.ndarray]],
+    sample_rate: int,
+    channels: int,
+    frames: int,
+    window_seconds: float = WINDOW_SECONDS,
+    silence_threshold_dbfs: float = SILENCE_THRESHOLD_DBFS,
+) -> Dict[str, Any]:
+    """Compute duration, silence and level statistics from chunks of decoded samples.
+
+    ``read_chunks(chunk_frames)`` yields ``(frames, channels)`` float arrays of
+    ``chunk_frames`` frames (the last may be shorter), which are reduced to per-window
+    mean power. A window is silent on a channel when its RMS level is below
+    ``silence_threshold_dbfs``; the silence ratio counts windows that are silent on every
+    channel, and talk time is reported per channel and for any channel.
+    """
+    duration = frames / sample_rate
+    result: Dict[str, Any] = {
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "duration_seconds": duration,
+    }
+    if frames == 0:
+        return result
+
+    window_frames = max(1, int(round(sample_rate * window_seconds)))
+    chunk_frames = window_frames * WINDOWS_PER_CHUNK
+    threshold_power = 10.0 ** (silence_threshold_dbfs / 10.0)
+
+    power_sum = np.zeros(channels, dtype=np.float64)
+    peak = 0.0
+    silent_windows = 0
+    active_windows = np.zeros(channels, dtype=np.int64)
+    active_any_windows = 0
+    total_windows = 0
+
+    for samples in read_chunks(chunk_frames):
+        count = len(samples)
+        squares = np.square(samples, dtype=np.float64)
+        power_sum += squares.sum(axis=0)
+        peak = max(peak, float(np.abs(samples).max()))
+
+        full = count // window_frames
+        window_power = squares[:full * window_frames].reshape(full, window_frames, channels).mean(axis=1)
+        if count % window_frames:
+            window_power = np.vstack([window_power, squares[full * window_frames:].mean(axis=0, keepdims=True)])
+        active = window_power >= threshold_power
+        active_windows += active.sum(axis=0)
+        any_active = active.any(axis=1)
+        active_any_windows += int(any_active.sum())
+        silent_windows += int((~any_active).sum())
+        total_windows += len(window_power)
+        del samples, squares, window_power
+
+    window_duration = window_frames / sample_rate
+    rms = math.sqrt(float(power_sum.sum()) / (frames * channels))
+    result.update(
+        {
+            "silence_ratio": silent_windows / total_windows,
+            # The last window may be partial; cap talk time at the recording length.
+            "talk_time_seconds": min(duration, active_any_windows * window_duration),
+            "channel_talk_time_seconds": tuple(min(duration, int(n) * window_duration) for n in active_windows),
+            "rms_dbfs": _to_dbfs(rms),
+            "peak_dbfs": _to_dbfs(peak),
+        }
+    )
+    return result
+
+
+def analyse_wav_buffer(
+    buffer: Any,
+    window_seconds: float = WINDOW_SECONDS,
+    silence_threshold_dbfs: float = SILENCE_THRESHOLD_DBFS,
+) -> Dict[str, Any]:
+    """Compute duration, silence and level statistics for a WAV file held in ``buffer``.
+
+    Samples are decoded chunk by chunk as zero-copy views of ``buffer`` (see
+    :func:`iter_wav_chunks`) and analysed with :func:`analyse_samples`.
+    """
+    layout = parse_wav_layout(buffer)
+    return analyse_samples(
+        lambda chunk_frames: iter_wav_chunks(buffer, layout, chunk_frames),
+        layout.sample_rate,
+        layout.channels,
+        layout.frame_count,
+        window_seconds=window_seconds,
+        silence_threshold_dbfs=silence_threshold_dbfs,
+    )
+
+
+def analyse_wav_stream(chunks: Iterable[Any], total_size: int, **options: Any) -> Dict[str, Any]:
+    """Analyse a WAV file of ``total_size`` bytes that arrives as consecutive byte chunks.
+
+    The header is parsed from the first chunks and samples are decoded as the chunks
+    arrive, holding at most one analysis chunk plus one incoming chunk in memory. A
+    header that does not parse within :data:`MAX_HEADER_BYTES` is rejected. When a result
+    is returned the iterator has been exhausted, so a decrypting iterator has verified its
+    tag.
+    """
+    chunks = iter(chunks)
+    head = bytearray()
+    while True:
+        chunk = next(chunks, None)
+        if chunk is not None:
+            head += chunk
+        try:
+            layout = parse_wav_layout(head, total_size)
+            break
+        except (WavFormatError, struct.error) as error:
+            if chunk is None or len(head) >= min(total_size, MAX_HEADER_BYTES):
+                raise WavFormatError(str(error) or "Truncated WAV header") from error
+
+    dtype, decode = _sample_decoder(layout)
+    if dtype.itemsize * layout.channels != layout.block_align:
+        raise WavFormatError("Block alignment does not match the sample format")
+    del head[:layout.data_offset]
+    del head[layout.data_size:]
+
+    def read_chunks(chunk_frames: int) -> Iterator[np.ndarray]:
+        pending = head
+        remaining = layout.data_size - len(pending)
+        chunk_bytes = chunk_frames * layout.block_align
+        while True:
+            while len(pending) >= chunk_bytes:
+                raw = np.frombuffer(pending, dtype=dtype, count=chunk_frames * layout.channels).copy()
+                del pending[:chunk_bytes]
+                yield decode(raw).reshape(chunk_frames, layout.channels)
+            chunk = next(chunks, None) if remaining else None
+            if chunk is None:
+                break
+            taken = chunk[:remaining]
+            pending += taken
+            remaining -= len(taken)
+        if pending:
+            raw = np.frombuffer(bytes(pending), dtype=dtype)
+            yield decode(raw).reshape(-1, layout.channels)
+
+    result = analyse_samples(
+        read_chunks,
+        layout.sample_rate,
+        layout.channels,
+        layout.frame_count,
+        **options,
+    )
+    for _chunk in chunks:
+        pass
+    return result
+
+
+def analyse_flac_file(path: Path, **options: Any) -> Dict[str, Any]:
+    """Decode a FLAC recording block by block with soundfile and analyse it."""
+    try:
+        import soundfile
+    except ImportError as error:
+        raise WavFormatError("FLAC recordings require soundfile (pip install soundfile)") from error
+
+    try:
+        info = soundfile.info(str(path))
+        return analyse_samples(
+            lambda chunk_frames: soundfile.blocks(str(path), blocksize=chunk_frames, dtype="float32", always_2d=True),
+            info.samplerate,
+            info.channels,
+            info.frames,
+            **options,
+        )
+    except soundfile.LibsndfileError as error:
+        raise WavFormatError(str(error)) from error
+
+
+def analyse_wav_file(path: Path, **options: Any) -> Dict[str, Any]:
+    """Memory-map ``path`` and analyse it with :func:`analyse_wav_buffer`."""
+    with path.open("rb") as handle:
+        if path.stat().st_size == 0:
+            raise WavFormatError("Empty file")
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return analyse_wav_buffer(mapped, **options)
+
+
+def load_sidecar(path: Path, stream_key: Any = None) -> Dict[str, Any]:
+    """Load the Twilio metadata stored next to a recording, or ``{}`` if unavailable."""
+    sidecar = path.with_suffix(".json")
+    if stream_key is None:
+        try:
+            data = sidecar.read_bytes()
+        except OSError:
+            return {}
+    else:
+        from decrypt_files import DecryptionError, iter_decrypt_stream
+
+        try:
+            with sidecar.open("rb") as handle:
+                # The chunks are views of one reused buffer; copy each before the next arrives.
+                data = b"".join(
+                    bytes(chunk) for chunk in iter_decrypt_stream(stream_key, handle, os.fstat(handle.fileno()).st_size)
+                )
+        except (OSError, DecryptionError):
+            return {}
+    try:
+        metadata = json.loads(data)
+    except ValueError:
+        return {}
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def analyse_recording(path: Path, stream_key: Any = None) -> Optional[RecordingMetrics]:
+    """Analyse one recording and its sidecar; returns ``None`` if the recording cannot be read.
+
+    With a ``stream_key`` (see ``decrypt_files.create_stream_key``) both files come from the
+    encrypted export; the recording is decrypted chunk by chunk and analysed with
+    :func:`analyse_wav_stream`, and discarded if its authentication tag does not verify.
+    Every recording that cannot be analysed is reported on stderr.
+    """
+    session_id, recording_sid = parse_recording_name(path)
+    metadata = load_sidecar(path, stream_key)
+    try:
+        if stream_key is None:
+            stats = analyse_flac_file(path) if path.suffix == ".flac" else analyse_wav_file(path)
+        else:
+            from decrypt_files import NONCE_SIZE, TAG_SIZE, DecryptionError, iter_decrypt_stream
+
+            try:
+                with path.open("rb") as handle:
+                    size = os.fstat(handle.fileno()).st_size
+                    stats = analyse_wav_stream(
+                        iter_decrypt_stream(stream_key, handle, size), max(0, size - NONCE_SIZE - TAG_SIZE)
+                    )
+            except DecryptionError as error:
+                print(f"Warning: Cannot analyse recording {path.name}: {error}", file=sys.stderr)
+                return None
+    except (OSError, ValueError, WavFormatError) as error:
+        print(f"Warning: Cannot analyse recording {path.name}: {error}", file=sys.stderr)
+        return None
+    return RecordingMetrics(
+        session_id=session_id,
+        recording_sid=metadata.get("recordingSid") or recording_sid,
+        path=path,
+        metadata=metadata,
+        **stats,
+    )
+
+
+def find_recordings(root: Path, export_index: Optional[ExportIndex] = None) -> List[Path]:
+    """Return the recordings (WAV or FLAC) in ``root/recordings``, sorted by name."""
+    if export_index is None:
+        export_index = index_export(root)
+    return export_index.recordings
+
+
+# Decryption key shared by the jobs of one worker process.
+_WORKER_STREAM_KEY: Any = None
+
+
+def _init_recording_worker(decryption_key: Optional[bytes]) -> None:
+    global _WORKER_STREAM_KEY
+    _WORKER_STREAM_KEY = None
+    if decryption_key is not None:
+        from decrypt_files import create_stream_key
+
+        _WORKER_STREAM_KEY = create_stream_key(decryption_key)
+
+
+def _analyse_recording_task(path: Path) -> Optional[RecordingMetrics]:
+    return analyse_recording(path, _WORKER_STREAM_KEY)
+
+
+def analyse_recordings(
+    paths: Sequence[Path],
+    workers: int = 1,
+    decryption_key: Optional[bytes] = None,
+) -> List[RecordingMetrics]:
+    """Analyse ``paths`` (optionally across worker processes), skipping unreadable files."""
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_recording_worker,
+            initargs=(decryption_key,),
+        ) as executor:
+            results = list(executor.map(_analyse_recording_task, paths))
+    else:
+        _init_recording_worker(decryption_key)
+        results = [_analyse_recording_task(path) for path in paths]
+    return [metrics for metrics in results if metrics is not None]
+
+
+def _parse_seconds(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def summarise_recordings(recordings: Iterable[RecordingMetrics]) -> Dict[str, Dict[str, Any]]:
+    """Aggregate recordings per session into the columns added to the summary sheet."""
+    grouped: Dict[str, List[RecordingMetrics]] = {}
+    for metrics in recordings:
+        grouped.setdefault(metrics.session_id, []).append(metrics)
+
+    summary: Dict[str, Dict[str, Any]] = {}
+    for session_id, items in grouped.items():
+        items.sort(key=lambda metrics: (metrics.metadata.get("callStart") or "", metrics.recording_sid))
+        duration = sum(metrics.duration_seconds for metrics in items)
+        analysed = [metrics for metrics in items if metrics.silence_ratio is not None]
+        analysed_duration = sum(metrics.duration_seconds for metrics in analysed)
+        call_durations = [_parse_seconds(metrics.metadata.get("callDuration")) for metrics in items]
+        call_starts = [metrics.metadata.get("callStart") for metrics in items if metrics.metadata.get("callStart")]
+        call_sids = list(dict.fromkeys(metrics.metadata["callSid"] for metrics in items if metrics.metadata.get("callSid")))
+
+        row: Dict[str, Any] = {
+            "Recording Count": len(items),
+            "Recording SIDs": "; ".join(metrics.recording_sid for metrics in items),
+            "Call SIDs": "; ".join(call_sids) or None,
+            "Call Start": call_starts[0] if call_starts else None,
+            "Call Duration (s)": sum(value for value in call_durations if value is not None)
+            if any(value is not None for value in call_durations)
+            else None,
+            "Recording Duration (s)": round(duration, 3),
+            "Talk Time (s)": None,
+            "Silence Ratio": None,
+            "RMS Level (dBFS)": None,
+            "Peak Level (dBFS)": None,
+        }
+        if analysed and analysed_duration > 0:
+            row["Talk Time (s)"] = round(sum(metrics.talk_time_seconds or 0.0 for metrics in analysed), 3)
+            row["Silence Ratio"] = round(
+                sum((metrics.silence_ratio or 0.0) * metrics.duration_seconds for metrics in analysed) / analysed_duration,
+                4,
+            )
+            power = sum(
+                (10.0 ** (metrics.rms_dbfs / 10.0) if metrics.rms_dbfs is not None else 0.0) * metrics.duration_seconds
+                for metrics in analysed
+            ) / analysed_duration
+            row["RMS Level (dBFS)"] = round(10.0 * math.log10(power), 2) if power > 0 else None
+            peaks = [metrics.peak_dbfs for metrics in analysed if metrics.peak_dbfs is not None]
+            row["Peak Level (dBFS)"] = round(max(peaks), 2) if peaks else None
+        summary[session_id] = row
+    return summary
+
+
+RECORDING_SUMMARY_COLUMNS = [
+    "Recording Count",
+    "Recording SIDs",
+    "Call SIDs",
+    "Call Start",
+    "Call Duration (s)",
+    "Recording Duration (s)",
+    "Talk Time (s)",
+    "Silence Ratio",
+    "RMS Level (dBFS)",
+    "Peak Level (dBFS)",
+]
+
+
+def collect_recording_summary(
+    root: Path,
+    workers: int = 1,
+    decryption_key: Optional[bytes] = None,
+    export_index: Optional[ExportIndex] = None,
+    run_report: Optional[Any] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Analyse every recording under ``root/recordings`` and aggregate it per session.
+
+    A ``run_report`` (see ``generate_session_reports.RunReport``) receives the number of
+    recordings found and of those that could not be analysed.
+    """
+    paths = find_recordings(root, export_index)
+    recordings = analyse_recordings(paths, workers=workers, decryption_key=decryption_key)
+    if run_report is not None:
+        run_report.count("recordings", len(paths))
+        run_report.count("unreadable_recordings", len(paths) - len(recordings))
+    return summarise_recordings(recordings)
+
+
+def recording_rows_by_session(
+    session_ids: Iterable[str],
+    summary: Mapping[str, Mapping[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Return one row of recording columns per session (empty values without a recording)."""
+    empty = dict.fromkeys(RECORDING_SUMMARY_COLUMNS)
+    empty["Recording Count"] = 0
+    return [dict(summary.get(session_id, empty)) for session_id in session_ids]
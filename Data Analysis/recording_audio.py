@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Compressed and downsampled copies of decrypted call recordings.
+
+``decrypt_files.py`` decrypts every recording to a WAV file and can then
+
+* re-encode it losslessly as FLAC (``write_flac``), which typically halves the size
+  of speech recordings and reads back sample for sample, and
+* write a 16-bit PCM analysis copy decimated to a lower sample rate
+  (``write_analysis_copy``) for level and silence analysis, where full-rate audio
+  is not needed.
+
+Both read the source in fixed-size blocks, so memory use does not grow with the
+length of a call. FLAC needs soundfile ("pip install soundfile"); analysis copies
+need numpy.
+"""
+from __future__ import annotations
+
+import mmap
+import wave
+from pathlib import Path
+from typing import Any
+
+AUDIO_FORMATS = ("wav", "flac")
+DEFAULT_ANALYSIS_RATE = 8000
+BLOCK_FRAMES = 65536
+
+# WAV encodings FLAC can store without loss, and the FLAC subtype each is written as.
+# Float and 32-bit integer samples have no lossless FLAC equivalent and stay WAV.
+FLAC_SUBTYPES = {
+    "PCM_S8": "PCM_S8",
+    "PCM_U8": "PCM_S8",
+    "PCM_16": "PCM_16",
+    "PCM_24": "PCM_24",
+    "ULAW": "PCM_16",
+    "ALAW": "PCM_16",
+}
+
+
+class AudioConversionError(ValueError):
+    """Raised when a recording cannot be read or converted."""
+
+
+def require_soundfile() -> Any:
+    try:
+        import soundfile
+    except ImportError as error:
+        raise SystemExit(
+            "Error: FLAC output requires the soundfile library.\nInstall it with: pip3 install soundfile"
+        ) from error
+    return soundfile
+
+
+def flac_compatible(wav_path: Path) -> bool:
+    """Whether the encoding of ``wav_path`` can be stored losslessly as FLAC; reads only the header."""
+    soundfile = require_soundfile()
+    try:
+        return soundfile.info(str(wav_path)).subtype in FLAC_SUBTYPES
+    except (soundfile.LibsndfileError, RuntimeError) as error:
+        raise AudioConversionError(f"{wav_path.name}: {error}") from error
+
+
+def write_flac(wav_path: Path, flac_path: Path) -> bool:
+    """Losslessly re-encode ``wav_path`` as FLAC at ``flac_path``, block by block.
+
+    Returns ``False`` (writing nothing) when the WAV encoding has no lossless FLAC
+    equivalent. Samples are passed through as integers, so decoding the FLAC file yields
+    exactly the samples of the WAV file.
+    """
+    soundfile = require_soundfile()
+    try:
+        with soundfile.SoundFile(str(wav_path)) as source:
+            subtype = FLAC_SUBTYPES.get(source.subtype)
+            if subtype is None:
+                return False
+            with soundfile.SoundFile(
+                str(flac_path),
+                "w",
+                samplerate=source.samplerate,
+                channels=source.channels,
+                format="FLAC",
+                subtype=subtype,
+            ) as destination:
+                for block in source.blocks(blocksize=BLOCK_FRAMES, dtype="int32", always_2d=True):
+                    destination.write(block)
+    except (soundfile.LibsndfileError, RuntimeError) as error:
+        raise AudioConversionError(f"{wav_path.name}: {error}") from error
+    return True
+
+
+def decimation_factor(sample_rate: int, target_rate: int) -> int:
+    """Return the largest integer factor that divides ``sample_rate`` without going below ``target_rate``."""
+    factor = max(1, sample_rate // max(1, target_rate))
+    while sample_rate % factor:
+        factor -= 1
+    return factor
+
+
+def write_analysis_copy(wav_path: Path, destination: Path, target_rate: int = DEFAULT_ANALYSIS_RATE) -> int:
+    """Write a 16-bit PCM copy of ``wav_path`` decimated towards ``target_rate``; returns its rate.
+
+    Each output sample is the mean of ``factor`` input samples (see
+    :func:`decimation_factor`), a box filter that keeps the signal power intact for the
+    silence and level analysis. Recordings at or below ``target_rate`` keep their rate.
+    """
+    import numpy as np
+
+    from recording_analytics import WavFormatError, iter_wav_chunks, parse_wav_layout
+
+    with wav_path.open("rb") as handle:
+        if wav_path.stat().st_size == 0:
+            raise AudioConversionError(f"{wav_path.name}: empty file")
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            try:
+                layout = parse_wav_layout(mapped)
+                factor = decimation_factor(layout.sample_rate, target_rate)
+                output_rate = layout.sample_rate // factor
+                with wave.open(str(destination), "wb") as output:
+                    output.setnchannels(layout.channels)
+                    output.setsampwidth(2)
+                    output.setframerate(output_rate)
+                    for samples in iter_wav_chunks(mapped, layout, BLOCK_FRAMES * factor):
+                        full = len(samples) // factor
+                        decimated = samples[:full * factor].reshape(full, factor, layout.channels).mean(axis=1)
+                        if len(samples) % factor:
+                            decimated = np.vstack([decimated, samples[full * factor:].mean(axis=0, keepdims=True)])
+                        pcm = np.clip(np.rint(decimated * 32768.0), -32768, 32767).astype("<i2")
+                        output.writeframes(pcm.tobytes())
+                        del samples
+            except WavFormatError as error:
+                raise AudioConversionError(f"{wav_path.name}: {error}") from error
+    return output_rate
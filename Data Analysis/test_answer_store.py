@@ -0,0 +1,94 @@
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Tests for answer_store.py: incremental upserts and read-only queries."""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+
+import pytest
+
+from answer_store import AnswerStore, StoreError, main
+from generate_session_reports import collect_questionnaire_data
+from generate_synthetic_export import generate_export
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    root = tmp_path / "export"
+    generate_export(root, sessions=40, seed=3)
+    sessions, catalog = collect_questionnaire_data(root)
+    path = tmp_path / "answers.db"
+    with AnswerStore(path) as store:
+        stats = store.upsert(sessions, catalog)
+        assert stats.inserted == sum(len(bundles) for bundles in sessions.values())
+        assert store.upsert(sessions, catalog).unchanged == stats.inserted
+    return path
+
+
+def _digest(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_queries_leave_the_store_unchanged(store_path, capsys):
+    before = _digest(store_path)
+
+    assert main([str(store_path), "participants"]) == 0
+    assert main([str(store_path), "answers", "--questionnaire", "KCCQ-12"]) == 0
+    assert capsys.readouterr().out.startswith("subject,sessions,responses")
+    assert main([str(store_path), "sql", "DELETE FROM answers"]) == 1
+
+    assert _digest(store_path) == before
+
+
+def test_read_only_store_rejects_writes(store_path):
+    with AnswerStore(store_path, read_only=True) as store:
+        with pytest.raises(StoreError):
+            store.upsert({})
+        with pytest.raises(sqlite3.OperationalError):
+            store.connection.execute("DELETE FROM answers")
+
+
+def test_read_only_open_requires_an_answer_store(tmp_path):
+    path = tmp_path / "other.db"
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE t (a)")
+    connection.close()
+
+    with pytest.raises(StoreError, match="not an answer store"):
+        AnswerStore(path, read_only=True)
+
+
+def test_definitions_sharing_a_title_keep_separate_responses(tmp_path):
+    root = tmp_path / "export"
+    generate_export(root, sessions=20, seed=5, completion=1.0)
+    definition_path = root / "q17.json"
+    definition = json.loads(definition_path.read_text(encoding="utf-8"))
+    definition["title"] = json.loads((root / "vital_signs.json").read_text(encoding="utf-8"))["title"]
+    definition_path.write_text(json.dumps(definition), encoding="utf-8")
+    sessions, catalog = collect_questionnaire_data(root)
+    responses = sum(len(bundles) for bundles in sessions.values())
+
+    with AnswerStore(tmp_path / "answers.db") as store:
+        assert store.upsert(sessions, catalog).inserted == responses
+        assert store.upsert(sessions, catalog).unchanged == responses
+        rows = store.query(
+            "SELECT definition, questionnaire, COUNT(*) AS responses, SUM(answer_count) AS answers "
+            "FROM responses GROUP BY definition ORDER BY definition"
+        )
+
+    assert {row["definition"]: row["responses"] for row in rows} == {
+        folder: len(list((root / folder).iterdir())) for folder in ("kccq12_questionnairs", "q17", "vital_signs")
+    }
+    shared = {row["definition"]: row for row in rows if row["questionnaire"] == definition["title"]}
+    assert set(shared) == {"q17", "vital_signs"}
+    assert sum(row["answers"] for row in rows) == sum(
+        len(bundle.answers) for bundles in sessions.values() for bundle in bundles
+    )
@@ -0,0 +1,187 @@
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Tests for decrypt_files.py: chunked decryption, tag checks and the up-to-date check."""
+from __future__ import annotations
+
+import base64
+import io
+import os
+import struct
+import wave
+
+import pytest
+
+pytest.importorskip("cryptography")
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from decrypt_files import (
+    NONCE_SIZE,
+    RECORDINGS_FOLDER,
+    DecryptionError,
+    DecryptionJob,
+    RecordingOptions,
+    create_stream_key,
+    decrypt_file,
+    decrypt_stream,
+    main,
+    plan_decryption,
+)
+
+KEY = bytes(range(32))
+OTHER_KEY = bytes(reversed(range(32)))
+
+
+def encrypt(plaintext: bytes, key: bytes = KEY) -> bytes:
+    """Encrypt like the voice service: ``nonce || ciphertext || tag``."""
+    nonce = os.urandom(NONCE_SIZE)
+    return nonce + AESGCM(key).encrypt(nonce, plaintext, None)
+
+
+def decrypt_bytes(payload: bytes, key: bytes = KEY, chunk_size: int = 1 << 20) -> bytes:
+    output = io.BytesIO()
+    decrypt_stream(create_stream_key(key), io.BytesIO(payload), len(payload), output, chunk_size)
+    return output.getvalue()
+
+
+def write_wav(path, sample_width: int = 2, frames: int = 4000) -> None:
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(sample_width)
+        handle.setframerate(8000)
+        handle.writeframes(bytes(range(256)) * (frames * sample_width // 256))
+
+
+def write_float_wav(path, frames: int = 4000) -> None:
+    data = struct.pack(f"<{frames}f", *[(index % 100) / 100.0 for index in range(frames)])
+    fmt = struct.pack("<HHIIHH", 3, 1, 8000, 8000 * 4, 4, 32)
+    path.write_bytes(
+        b"RIFF" + struct.pack("<I", 4 + 8 + len(fmt) + 8 + len(data)) + b"WAVE"
+        + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        + b"data" + struct.pack("<I", len(data)) + data
+    )
+
+
+@pytest.mark.parametrize("size", [0, 1, 15, 16, 17, 1000, 65536 + 3])
+@pytest.mark.parametrize("chunk_size", [7, 16, 4096])
+def test_decrypt_stream_round_trip(size, chunk_size):
+    plaintext = os.urandom(size)
+
+    assert decrypt_bytes(encrypt(plaintext), chunk_size=chunk_size) == plaintext
+
+
+def test_decrypt_stream_rejects_wrong_key():
+    with pytest.raises(DecryptionError, match="tag mismatch"):
+        decrypt_bytes(encrypt(b"{}" * 1000), key=OTHER_KEY)
+
+
+def test_decrypt_stream_rejects_modified_tag_and_ciphertext():
+    payload = bytearray(encrypt(b"x" * 1000))
+    tampered_tag = bytes(payload[:-1]) + bytes([payload[-1] ^ 1])
+    payload[NONCE_SIZE + 10] ^= 1
+
+    for tampered in (tampered_tag, bytes(payload)):
+        with pytest.raises(DecryptionError):
+            decrypt_bytes(tampered, chunk_size=64)
+
+
+def test_decrypt_stream_rejects_short_payload():
+    with pytest.raises(DecryptionError, match="too small"):
+        decrypt_bytes(b"\0" * 20)
+
+
+def test_decrypt_file_writes_only_verified_output(tmp_path):
+    source = tmp_path / "in.json"
+    source.write_bytes(encrypt(b'{"resourceType": "QuestionnaireResponse"}'))
+    destination = tmp_path / "out" / "in.json"
+
+    decrypt_file(create_stream_key(KEY), DecryptionJob(source=source, destination=destination))
+    assert destination.read_bytes() == b'{"resourceType": "QuestionnaireResponse"}'
+
+    other = tmp_path / "out" / "other.json"
+    with pytest.raises(DecryptionError):
+        decrypt_file(create_stream_key(OTHER_KEY), DecryptionJob(source=source, destination=other))
+    assert sorted(path.name for path in (tmp_path / "out").iterdir()) == ["in.json"]
+
+
+def test_decrypt_file_cleans_up_analysis_copy_on_tag_failure(tmp_path):
+    source = tmp_path / "call.wav"
+    wav = tmp_path / "plain.wav"
+    write_wav(wav)
+    source.write_bytes(encrypt(wav.read_bytes()))
+    job = DecryptionJob(
+        source=source,
+        destination=tmp_path / "out" / "call.wav",
+        analysis_destination=tmp_path / "analysis" / "call.wav",
+    )
+
+    with pytest.raises(DecryptionError):
+        decrypt_file(create_stream_key(OTHER_KEY), job)
+    assert list((tmp_path / "out").iterdir()) == []
+    assert list((tmp_path / "analysis").iterdir()) == []
+
+
+def _export(tmp_path, recordings):
+    source = tmp_path / "export" / RECORDINGS_FOLDER
+    source.mkdir(parents=True)
+    for name, writer in recordings.items():
+        plain = tmp_path / name
+        writer(plain)
+        (source / name).write_bytes(encrypt(plain.read_bytes()))
+    return tmp_path / "export"
+
+
+def _run(export, output, audio_format):
+    options = RecordingOptions(audio_format=audio_format)
+    plan = plan_decryption(export, output, folders=[RECORDINGS_FOLDER], recording_options=options)
+    for job in plan.jobs:
+        decrypt_file(create_stream_key(KEY), job, options)
+    return plan, sorted(path.name for path in (output / RECORDINGS_FOLDER).iterdir())
+
+
+def test_switching_audio_format_regenerates_recordings(tmp_path):
+    pytest.importorskip("soundfile")
+    export = _export(tmp_path, {"pcm.wav": write_wav, "float.wav": write_float_wav})
+    output = tmp_path / "out"
+
+    plan, names = _run(export, output, "wav")
+    assert (len(plan.jobs), names) == (2, ["float.wav", "pcm.wav"])
+    plan, names = _run(export, output, "wav")
+    assert (len(plan.jobs), plan.skipped_files) == (0, 2)
+
+    # The float recording has no lossless FLAC encoding, so its WAV already is the FLAC-mode output.
+    plan, names = _run(export, output, "flac")
+    assert ([job.source.name for job in plan.jobs], names) == (["pcm.wav"], ["float.wav", "pcm.flac"])
+    plan, names = _run(export, output, "flac")
+    assert (len(plan.jobs), plan.skipped_files) == (0, 2)
+
+    plan, names = _run(export, output, "wav")
+    assert ([job.source.name for job in plan.jobs], names) == (["pcm.wav"], ["float.wav", "pcm.wav"])
+
+
+def test_main_reads_the_key_from_a_file_or_the_environment(tmp_path, monkeypatch):
+    export = tmp_path / "export"
+    (export / "q17").mkdir(parents=True)
+    (export / "q17" / "call.json").write_bytes(encrypt(b"{}"))
+    key_file = tmp_path / "key.txt"
+    key_file.write_text(base64.b64encode(KEY).decode() + "\n", encoding="utf-8")
+    monkeypatch.delenv("ENCRYPTION_KEY", raising=False)
+    arguments = ["--source", str(export), "--output", str(tmp_path / "out"), "--workers", "1"]
+
+    with pytest.raises(SystemExit):
+        main([base64.b64encode(KEY).decode(), *arguments])
+    with pytest.raises(SystemExit):
+        main(arguments)
+
+    assert main(["--key-file", str(key_file), *arguments]) == 0
+    assert (tmp_path / "out" / "q17" / "call.json").read_bytes() == b"{}"
+
+    monkeypatch.setenv("ENCRYPTION_KEY", base64.b64encode(KEY).decode())
+    (tmp_path / "out" / "q17" / "call.json").unlink()
+    assert main(arguments) == 0
+    assert (tmp_path / "out" / "q17" / "call.json").read_bytes() == b"{}"
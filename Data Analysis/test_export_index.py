@@ -0,0 +1,82 @@
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Tests for export_index.py: file name parsing and the per-session join of an export."""
+from __future__ import annotations
+
+from export_index import index_export, list_definitions, list_response_stems, parse_session_name
+
+SESSION = "0123456789abcdef"
+OTHER_SESSION = "fedcba9876543210"
+SID = "RE" + "0123456789abcdef" * 2
+OTHER_SID = "RE" + "a" * 32
+
+
+def test_parse_session_name():
+    assert parse_session_name(SESSION) == (SESSION, None, True)
+    assert parse_session_name(f"{SESSION}_{SID}") == (SESSION, SID, True)
+    assert parse_session_name("0123456789ABCDEF") == ("0123456789ABCDEF", None, False)
+    assert parse_session_name(f"{SESSION}_notasid") == (SESSION, "notasid", False)
+    assert parse_session_name("notes") == ("notes", None, False)
+
+
+def _touch(path, content=b"{}"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_index_joins_responses_and_recordings_per_session(tmp_path):
+    definitions = [_touch(tmp_path / "kccq12.json"), _touch(tmp_path / "vital_signs.json")]
+    vitals = _touch(tmp_path / "vital_signs" / f"{SESSION}.json")
+    other_vitals = _touch(tmp_path / "vital_signs" / f"{OTHER_SESSION}.json")
+    kccq = _touch(tmp_path / "kccq12" / f"{SESSION}.json")
+    wav = _touch(tmp_path / "recordings" / f"{SESSION}_{SID}.wav")
+    sidecar = _touch(tmp_path / "recordings" / f"{SESSION}_{SID}.json")
+    flac = _touch(tmp_path / "recordings" / f"{SESSION}_{OTHER_SID}.flac")
+    unrecognised = _touch(tmp_path / "vital_signs" / "notes.json")
+    # Hidden files, files of other types and nested folders are not part of the export.
+    _touch(tmp_path / ".hidden.json")
+    _touch(tmp_path / "vital_signs" / f".{SESSION}.json")
+    _touch(tmp_path / "vital_signs" / f"{SESSION}.txt")
+    _touch(tmp_path / "recordings" / f"{SESSION}_{SID}.mp3")
+    _touch(tmp_path / "vital_signs" / "nested" / f"{SESSION}.json")
+
+    index = index_export(tmp_path)
+
+    assert index.definitions == definitions
+    assert index.response_folders == {"kccq12": [kccq], "vital_signs": [vitals, other_vitals, unrecognised]}
+    assert index.recordings == [wav, flac]
+    assert index.recording_metadata == [sidecar]
+    assert index.unrecognised == [unrecognised]
+    assert set(index.sessions) == {SESSION, OTHER_SESSION, "notes"}
+
+    session = index.sessions[SESSION]
+    assert session.responses == {"kccq12": kccq, "vital_signs": vitals}
+    assert session.recordings == {SID: wav, OTHER_SID: flac}
+    assert session.recording_metadata == {SID: sidecar}
+    assert session.recording_sids == sorted([SID, OTHER_SID])
+    assert index.sessions[OTHER_SESSION].recordings == {}
+
+
+def test_listing_helpers_match_the_index(tmp_path):
+    _touch(tmp_path / "vital_signs.json")
+    for session in (OTHER_SESSION, SESSION):
+        _touch(tmp_path / "vital_signs" / f"{session}.json")
+
+    index = index_export(tmp_path)
+
+    assert list_definitions(tmp_path) == index.definitions
+    assert list_response_stems(tmp_path / "vital_signs") == [path.stem for path in index.response_folders["vital_signs"]]
+    assert list_response_stems(tmp_path / "missing") == []
+
+
+def test_missing_root_gives_an_empty_index(tmp_path):
+    index = index_export(tmp_path / "missing")
+
+    assert (index.definitions, index.response_folders, index.sessions) == ([], {}, {})
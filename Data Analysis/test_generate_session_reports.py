@@ -0,0 +1,454 @@
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Tests for generate_session_reports.py on synthetic exports (see generate_synthetic_export.py)."""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from generate_session_reports import (
+    ANSWER_TABLE_CATEGORICAL_COLUMNS,
+    ANSWER_TABLE_COLUMNS,
+    CATALOG_TABLE_COLUMNS,
+    AnswerRow,
+    QuestionnaireResponseBundle,
+    RunReport,
+    SheetNamer,
+    build_answer_label,
+    build_metadata_label,
+    build_summary_dataframe,
+    build_summary_rows,
+    collect_authored_timestamps,
+    collect_questionnaire_data,
+    parse_iso_timestamp,
+    parse_timestamp,
+    parse_timestamps,
+    write_answer_export,
+    write_excel_report,
+    write_excel_report_streaming,
+)
+from generate_synthetic_export import generate_export
+
+SCRIPT = Path(__file__).with_name("generate_session_reports.py")
+
+
+@pytest.fixture
+def export(tmp_path):
+    root = tmp_path / "export"
+    generate_export(root, sessions=60, seed=7)
+    return root
+
+
+def _collect(root, cache_dir=None):
+    run_report = RunReport(trace_memory=False)
+    sessions, catalog = collect_questionnaire_data(root, cache_dir=cache_dir, run_report=run_report)
+    return sessions, catalog, run_report.counts
+
+
+def _answers(sessions):
+    return {
+        session_id: [
+            (
+                bundle.title,
+                bundle.authored,
+                [(answer.link_id, answer.code, answer.display, answer.raw_value) for answer in bundle.answers],
+            )
+            for bundle in bundles
+        ]
+        for session_id, bundles in sessions.items()
+    }
+
+
+def test_cache_hits_unchanged_files(export, tmp_path):
+    cache_dir = tmp_path / "cache"
+    sessions, catalog, counts = _collect(export, cache_dir)
+    assert counts["cached_responses"] == 0
+
+    cached_sessions, cached_catalog, counts = _collect(export, cache_dir)
+    assert counts["cached_responses"] == counts["response_files"]
+    assert _answers(cached_sessions) == _answers(sessions)
+    assert cached_catalog == catalog
+
+
+def test_cache_misses_after_content_change(export, tmp_path):
+    cache_dir = tmp_path / "cache"
+    _collect(export, cache_dir)
+    responses = sorted((export / "vital_signs").iterdir())
+
+    # Same size, new content and mtime: one digit of the response changes.
+    same_size = responses[0]
+    content = same_size.read_text(encoding="utf-8")
+    position = max(index for index, character in enumerate(content) if character.isdigit())
+    digit = str((int(content[position]) + 1) % 10)
+    same_size.write_text(content[:position] + digit + content[position + 1:], encoding="utf-8")
+
+    # Different size, mtime restored to the cached one.
+    resized = responses[1]
+    stat = resized.stat()
+    resized.write_text(resized.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    os.utime(resized, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    # Touched only: the content hash still matches, so the cached bundle is reused.
+    touched = responses[2]
+    os.utime(touched, ns=(touched.stat().st_atime_ns, touched.stat().st_mtime_ns + 10**9))
+
+    sessions, _catalog, counts = _collect(export, cache_dir)
+    assert counts["response_files"] - counts["cached_responses"] == 2
+    assert _answers(sessions) == _answers(_collect(export)[0])
+
+
+def test_question_banks_are_kept_per_definition_file(export):
+    sessions, _catalog, counts = _collect(export)
+
+    # Two definitions sharing a title must still flatten their responses with their own items.
+    definition_path = export / "q17.json"
+    definition = json.loads(definition_path.read_text(encoding="utf-8"))
+    definition["title"] = json.loads((export / "vital_signs.json").read_text(encoding="utf-8"))["title"]
+    definition_path.write_text(json.dumps(definition), encoding="utf-8")
+
+    duplicate_sessions, _catalog, duplicate_counts = _collect(export)
+    assert duplicate_counts["skipped_unknown_items"] == counts["skipped_unknown_items"]
+
+    def answer_count(found):
+        return sum(len(bundle.answers) for bundles in found.values() for bundle in bundles)
+
+    assert answer_count(duplicate_sessions) == answer_count(sessions)
+
+
+def test_sheet_namer_truncates_and_dedupes_at_31_characters():
+    namer = SheetNamer(reserved=["Summary"])
+    prefix = "a" * 31
+
+    names = [namer(prefix + "1"), namer(prefix + "2"), namer(prefix), namer("Summary"), namer("")]
+    names += [namer(prefix + str(index)) for index in range(3, 12)]
+
+    assert names[:5] == [prefix, prefix[:29] + "_1", prefix[:29] + "_2", "Summary_1", "Session"]
+    assert names[-1] == prefix[:28] + "_11"
+    assert len(set(names)) == len(names)
+    assert all(len(name) <= 31 for name in names)
+
+
+def _run_report(root, *arguments):
+    subprocess.run(
+        [sys.executable, str(SCRIPT), "--root", str(root), *map(str, arguments)],
+        check=True,
+        capture_output=True,
+    )
+
+
+def _pandas_csv(root, tmp_path):
+    pytest.importorskip("pandas")
+    pytest.importorskip("xlsxwriter")
+    path = tmp_path / "pandas" / "summary.csv"
+    _run_report(root, "--csv", path, "--excel", tmp_path / "pandas" / "report.xlsx")
+    return path
+
+
+def test_csv_only_matches_pandas_csv(export, tmp_path):
+    expected = _pandas_csv(export, tmp_path)
+    actual = tmp_path / "csv-only" / "summary.csv"
+
+    _run_report(export, "--csv-only", "--csv", actual)
+
+    assert actual.read_bytes() == expected.read_bytes()
+    # Vitals trends go next to --csv unless --vitals-csv says otherwise.
+    assert (expected.parent / "vitals_trends.csv").is_file()
+
+
+def test_streaming_csv_matches_pandas_csv_values(export, tmp_path):
+    expected = _pandas_csv(export, tmp_path)
+    actual = tmp_path / "streaming" / "summary.csv"
+
+    _run_report(export, "--streaming-csv", "--csv", actual)
+
+    # The streaming summary writes every catalog column, answered or not.
+    with expected.open(newline="", encoding="utf-8") as handle:
+        expected_rows = list(csv.DictReader(handle))
+    with actual.open(newline="", encoding="utf-8") as handle:
+        reader = csv.DictReader(handle)
+        actual_rows = list(reader)
+    assert set(expected_rows[0]) <= set(reader.fieldnames)
+    assert len(actual_rows) == len(expected_rows)
+    for expected_row, actual_row in zip(expected_rows, actual_rows):
+        assert {column: actual_row[column] for column in expected_row} == expected_row
+        assert not any(actual_row[column] for column in set(actual_row) - set(expected_row))
+
+
+def test_run_report_times_stages_unless_memory_is_traced(export, tmp_path):
+    pytest.importorskip("pandas")
+    outputs = ["--csv", tmp_path / "summary.csv", "--excel", tmp_path / "report.xlsx"]
+
+    _run_report(export, *outputs, "--run-report", tmp_path / "timed.json")
+    _run_report(export, *outputs, "--run-report", tmp_path / "traced.json", "--trace-memory")
+
+    timed = json.loads((tmp_path / "timed.json").read_text(encoding="utf-8"))
+    traced = json.loads((tmp_path / "traced.json").read_text(encoding="utf-8"))
+    stages = [stage["name"] for stage in timed["stages"]]
+    assert stages.index("import_pandas") == stages.index("build_summary") - 1
+    assert not timed["memory_traced"] and timed["total_wall_seconds"] > 0
+    assert all(stage["wall_seconds"] is not None and stage["peak_memory_bytes"] is None for stage in timed["stages"])
+    assert traced["memory_traced"] and traced["total_wall_seconds"] is None
+    assert all(stage["wall_seconds"] is None and stage["cpu_seconds"] is None for stage in traced["stages"])
+    assert traced["stages"][0]["peak_memory_bytes"] > 0
+
+
+def test_resharding_removes_stale_shard_workbooks(export, tmp_path):
+    pytest.importorskip("pandas")
+    pytest.importorskip("xlsxwriter")
+    excel = tmp_path / "report" / "report.xlsx"
+    unrelated = excel.with_name("report_notes.xlsx")
+    outputs = ["--excel", excel, "--csv", tmp_path / "summary.csv", "--workers", 2]
+
+    _run_report(export, *outputs, "--shard", "count", "--shard-size", 10)
+    assert excel.with_name("report_001.xlsx").is_file()
+    unrelated.write_bytes(b"kept")
+
+    _run_report(export, *outputs, "--shard", "month")
+
+    shards = sorted(path.name for path in excel.parent.glob("report_*.xlsx"))
+    assert "report_001.xlsx" not in shards and "report_notes.xlsx" in shards
+    assert any(name[len("report_"):-len(".xlsx")].count("-") == 1 for name in shards)
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="cache files are trusted without POSIX owners")
+def test_cache_written_private_and_ignored_when_others_can_write(export, tmp_path, capsys):
+    cache_dir = tmp_path / "cache"
+    _collect(export, cache_dir)
+    cache_files = sorted(cache_dir.glob("*.pickle"))
+    assert cache_files
+    assert cache_dir.stat().st_mode & 0o777 == 0o700
+    assert all(path.stat().st_mode & 0o777 == 0o600 for path in cache_files)
+
+    cache_files[0].chmod(0o666)
+    _sessions, _catalog, counts = _collect(export, cache_dir)
+    assert 0 < counts["cached_responses"] < counts["response_files"]
+    assert f"Ignoring cache '{cache_files[0]}' because it is writable by other users" in capsys.readouterr().err
+
+    # The untrusted file was rewritten privately, so the next run trusts it again.
+    _sessions, _catalog, counts = _collect(export, cache_dir)
+    assert counts["cached_responses"] == counts["response_files"]
+
+
+def _workbook_contents(path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.load_workbook(path)
+    return {
+        sheet.title: (
+            [list(row) for row in sheet.iter_rows(values_only=True)],
+            {key: dimension.width for key, dimension in sheet.column_dimensions.items() if dimension.width},
+        )
+        for sheet in workbook.worksheets
+    }
+
+
+def test_streaming_workbook_matches_pandas_workbook(export, tmp_path):
+    pytest.importorskip("pandas")
+    pytest.importorskip("xlsxwriter")
+    from vitals_trends import build_vitals_trends
+
+    sessions, catalog, _counts = _collect(export)
+    timestamps = collect_authored_timestamps(sessions)
+    summary = build_summary_dataframe(sessions, catalog, timestamps)
+    trends = build_vitals_trends(sessions, timestamps)
+    arguments = (summary, sessions, catalog, timestamps, trends)
+
+    write_excel_report(tmp_path / "pandas.xlsx", *arguments)
+    write_excel_report_streaming(tmp_path / "streaming.xlsx", *arguments)
+
+    expected = _workbook_contents(tmp_path / "pandas.xlsx")
+    actual = _workbook_contents(tmp_path / "streaming.xlsx")
+    assert list(actual) == list(expected)
+    for title, (rows, widths) in expected.items():
+        assert actual[title][0] == rows, title
+        assert actual[title][1] == widths, title
+
+
+def _row_by_row_summary(sessions):
+    """The summary as the original row-by-row builder made it: one dict per session."""
+    import pandas as pd
+
+    rows = []
+    for session_id in sorted(sessions):
+        bundles = sessions[session_id]
+        row = {"Session ID": session_id, "Questionnaire Count": len(bundles)}
+        subjects = {bundle.subject for bundle in bundles if bundle.subject}
+        if subjects:
+            row["Participant References"] = "; ".join(sorted(subjects))
+        for bundle in bundles:
+            if bundle.authored:
+                parsed = parse_timestamp(bundle.authored)
+                row[build_metadata_label(bundle.title, "Authored On")] = parsed if parsed is not None else bundle.authored
+            for answer in bundle.answers:
+                label = build_answer_label(answer)
+                value = answer.display if answer.display is not None else ""
+                if not row.get(label):
+                    row[label] = value
+                    continue
+                tokens = [token.strip() for token in row[label].split(";") if token.strip()]
+                if value and value not in tokens:
+                    row[label] = "; ".join(tokens + [value])
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def _repeated_answers_session():
+    displays = ["", "a", "a", "b; c", "c", None, "d", "b"]
+    answers = [
+        AnswerRow("Patient Vitals", "weight", "Weight", "Vitals", None, display, display)
+        for display in displays
+    ]
+    bundle = QuestionnaireResponseBundle("vital_signs", "Patient Vitals", "2025-03-04T10:00:00Z", "Patient/x", answers)
+    return {"ffffffffffffffff": [bundle]}
+
+
+def test_summary_matches_row_by_row_builder(export):
+    pd = pytest.importorskip("pandas")
+    sessions, catalog, _counts = _collect(export)
+    repeated = _repeated_answers_session()
+    sessions.update(repeated)
+
+    expected = _row_by_row_summary(sessions)
+    actual = build_summary_dataframe(sessions, catalog)
+
+    assert sorted(actual.columns) == sorted(expected.columns)
+    assert list(actual.columns[:2]) == ["Session ID", "Questionnaire Count"]
+    pd.testing.assert_frame_equal(actual[expected.columns], expected)
+    label = build_answer_label(repeated["ffffffffffffffff"][0].answers[0])
+    assert actual.set_index("Session ID").at["ffffffffffffffff", label] == "a; b; c; d"
+
+    header, rows = build_summary_rows(sessions, catalog, collect_authored_timestamps(sessions))
+    assert header == list(actual.columns)
+    assert len(rows) == len(actual)
+
+
+def test_summary_column_order_follows_catalog_not_sessions(export):
+    pytest.importorskip("pandas")
+    sessions, catalog, _counts = _collect(export)
+    reversed_sessions = {session_id: list(reversed(bundles)) for session_id, bundles in sessions.items()}
+
+    assert list(build_summary_dataframe(reversed_sessions, catalog).columns) == list(
+        build_summary_dataframe(sessions, catalog).columns
+    )
+
+
+ISO_TIMESTAMPS = [
+    "2025-03-04T10:15:30Z",
+    "2025-03-04T10:15:30.123456Z",
+    "2025-03-04T10:15:30.5+02:00",
+    "2025-03-04T23:15:30-05:00",
+    "2025-03-04T10:15:30",
+    "2025-03-04",
+    " 2025-03-04T10:15:30Z ",
+    "2025-03-04-10-15-30",
+]
+
+
+def test_batch_timestamps_match_scalar_parsing():
+    pd = pytest.importorskip("pandas")
+    values = ISO_TIMESTAMPS + ["March 4, 2025 10:15", "not a time", "2025-02-30T10:00:00Z", "   ", "", None]
+
+    parsed = parse_timestamps(values + values)
+
+    assert set(parsed) == {value for value in values if value}
+    for value, timestamp in parsed.items():
+        expected = parse_timestamp(value)
+        if expected is None:
+            assert timestamp is None, value
+        else:
+            assert timestamp == expected and timestamp.tzinfo is None, value
+    assert parsed["2025-03-04T23:15:30-05:00"] == pd.Timestamp("2025-03-05T04:15:30")
+    assert parsed["2025-03-04-10-15-30"] == pd.Timestamp("2025-03-04T10:15:30")
+    # Only pandas' lenient scalar parser understands this one; the batch falls back to it.
+    assert parsed["March 4, 2025 10:15"] == pd.Timestamp("2025-03-04T10:15:00")
+
+
+def test_standard_library_timestamps_match_pandas_for_iso_input():
+    pytest.importorskip("pandas")
+    for value in ISO_TIMESTAMPS:
+        assert parse_iso_timestamp(value) == parse_timestamp(value).to_pydatetime(), value
+    assert parse_iso_timestamp("March 4, 2025 10:15") is None
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".feather"])
+def test_answer_export_is_long_typed_and_dictionary_encoded(export, tmp_path, suffix):
+    pytest.importorskip("pandas")
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.feather
+    import pyarrow.parquet
+
+    read = pyarrow.parquet.read_table if suffix == ".parquet" else pyarrow.feather.read_table
+    sessions, catalog, _counts = _collect(export)
+    answers = [answer for bundles in sessions.values() for bundle in bundles for answer in bundle.answers]
+
+    catalog_path = write_answer_export(tmp_path / f"answers{suffix}", sessions, catalog)
+    table = read(tmp_path / f"answers{suffix}")
+    catalog_table = read(catalog_path)
+
+    assert catalog_path.name == f"answers_catalog{suffix}"
+    assert table.column_names == ANSWER_TABLE_COLUMNS
+    assert table.num_rows == len(answers)
+    for column in ANSWER_TABLE_CATEGORICAL_COLUMNS:
+        assert pa.types.is_dictionary(table.schema.field(column).type), column
+    assert pa.types.is_timestamp(table.schema.field("Authored").type)
+    assert pa.types.is_string(table.schema.field("Raw Value").type)
+    assert catalog_table.column_names == CATALOG_TABLE_COLUMNS
+    assert catalog_table.num_rows == len(catalog)
+
+
+def test_answer_csv_has_the_columnar_rows(export, tmp_path):
+    pd = pytest.importorskip("pandas")
+    pq = pytest.importorskip("pyarrow.parquet")
+    sessions, catalog, _counts = _collect(export)
+
+    write_answer_export(tmp_path / "answers.parquet", sessions, catalog)
+    write_answer_export(tmp_path / "answers.csv", sessions, catalog)
+
+    expected = pq.read_table(tmp_path / "answers.parquet").to_pandas()
+    with (tmp_path / "answers.csv").open(newline="", encoding="utf-8") as handle:
+        rows = list(csv.reader(handle))
+    assert rows[0] == ANSWER_TABLE_COLUMNS
+    assert len(rows) - 1 == len(expected)
+    for row, (_index, record) in zip(rows[1:], expected.iterrows()):
+        assert row == ["" if pd.isna(value) else str(value) for value in record], row[0]
+
+
+def test_concurrent_outputs_match_sequential_outputs(export, tmp_path):
+    pytest.importorskip("pandas")
+    pytest.importorskip("xlsxwriter")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    def run(name, workers):
+        out = tmp_path / name
+        _run_report(
+            export,
+            "--excel", out / "report.xlsx",
+            "--csv", out / "summary.csv",
+            "--answers", out / "answers.parquet",
+            "--store", out / "answers.sqlite",
+            "--workers", workers,
+        )
+        with sqlite3.connect(out / "answers.sqlite") as connection:
+            store = list(connection.iterdump())
+        return out, store
+
+    sequential, sequential_store = run("sequential", 1)
+    concurrent, concurrent_store = run("concurrent", 3)
+
+    for name in ("summary.csv", "vitals_trends.csv", "answers_catalog.parquet"):
+        assert (concurrent / name).read_bytes() == (sequential / name).read_bytes(), name
+    assert pq.read_table(concurrent / "answers.parquet").equals(pq.read_table(sequential / "answers.parquet"))
+    assert _workbook_contents(concurrent / "report.xlsx") == _workbook_contents(sequential / "report.xlsx")
+    assert concurrent_store == sequential_store
@@ -0,0 +1,75 @@
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Tests for kccq12_scoring.py: the NumPy and plain-Python scorers must agree exactly."""
+from __future__ import annotations
+
+import math
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from kccq12_scoring import KCCQ12_ITEMS, KCCQ12_SCORE_COLUMNS, kccq12_score_rows, kccq12_scores
+
+
+def _bundle(codes):
+    """A response bundle answering item ``index`` with ``code`` for every entry of ``codes``."""
+    return SimpleNamespace(
+        answers=[
+            SimpleNamespace(link_id=KCCQ12_ITEMS[index].link_id, code=str(code), raw_value=None)
+            for index, code in codes.items()
+        ]
+    )
+
+
+def _random_sessions(count, seed=0):
+    rng = random.Random(seed)
+    sessions = {}
+    for number in range(count):
+        # Codes 0 and max + 1 are out of range and must count as missing.
+        codes = {
+            index: rng.randint(0, item.max_code + 1)
+            for index, item in enumerate(KCCQ12_ITEMS)
+            if rng.random() < 0.8
+        }
+        sessions[f"session{number}"] = [_bundle(codes)]
+    return sessions
+
+
+def test_plain_python_scores_match_numpy_scores():
+    sessions = _random_sessions(2000)
+    session_ids = list(sessions) + ["unanswered"]
+
+    frame = kccq12_scores(session_ids, sessions)
+    rows = kccq12_score_rows(session_ids, sessions)
+
+    assert len(rows) == len(session_ids)
+    for row_index, row in enumerate(rows):
+        for column, value in zip(KCCQ12_SCORE_COLUMNS, row):
+            expected = frame[column].iloc[row_index]
+            if math.isnan(expected):
+                assert value is None
+            else:
+                assert value == expected
+
+
+def test_domain_minimums_and_summary():
+    # Physical limitation 1a=5, 1b=3 (2 answered): (100 + 50) / 2. Symptom frequency has
+    # one valid answer only, quality of life one, social limitation none valid.
+    codes = {0: 5, 1: 3, 3: 5, 4: 8, 7: 1, 9: 6}
+    rows = kccq12_score_rows(["s"], {"s": [_bundle(codes)]})
+
+    assert rows == [[75.0, None, 0.0, None, 37.5]]
+
+
+def test_last_answer_to_an_item_counts():
+    sessions = {"s": [_bundle({0: 1, 1: 1}), _bundle({0: 5})]}
+
+    assert kccq12_score_rows(["s"], sessions)[0][0] == pytest.approx(50.0)
+    assert kccq12_scores(["s"], sessions)[KCCQ12_SCORE_COLUMNS[0]].iloc[0] == pytest.approx(50.0)
@@ -0,0 +1,142 @@
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Tests for recording_analytics.py: sample decoding, streamed and encrypted recordings."""
+from __future__ import annotations
+
+import json
+import os
+import struct
+
+import numpy as np
+import pytest
+
+from recording_analytics import (
+    MAX_HEADER_BYTES,
+    WavFormatError,
+    analyse_recording,
+    analyse_wav_file,
+    analyse_wav_stream,
+    collect_recording_summary,
+    load_sidecar,
+)
+
+pytest.importorskip("cryptography")
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from decrypt_files import NONCE_SIZE, create_stream_key
+from generate_session_reports import RunReport
+
+KEY = bytes(range(32))
+NAME = "0123456789abcdef_RE0123456789abcdef0123456789abcdef"
+
+
+def encrypt(plaintext: bytes) -> bytes:
+    nonce = os.urandom(NONCE_SIZE)
+    return nonce + AESGCM(KEY).encrypt(nonce, plaintext, None)
+
+
+def wav_bytes(format_tag: int, bits: int, data: bytes, channels: int = 1, rate: int = 8000) -> bytes:
+    block_align = channels * bits // 8
+    fmt = struct.pack("<HHIIHH", format_tag, channels, rate, rate * block_align, block_align, bits)
+    return (
+        b"RIFF" + struct.pack("<I", 4 + 8 + len(fmt) + 8 + len(data)) + b"WAVE"
+        + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        + b"data" + struct.pack("<I", len(data)) + data
+    )
+
+
+def pcm24_bytes(samples: np.ndarray) -> bytes:
+    return samples.astype("<i4").view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+
+
+def tone(frames: int = 24000) -> np.ndarray:
+    """A quarter of silence followed by a tone at half scale, as 24-bit integers."""
+    samples = np.round(0.5 * np.sin(np.arange(frames) * 0.3) * 8388607).astype(np.int64)
+    samples[: frames // 4] = 0
+    return samples
+
+
+def test_24_bit_pcm_decodes_like_float_samples(tmp_path):
+    samples = tone()
+    pcm24 = tmp_path / "pcm24.wav"
+    pcm24.write_bytes(wav_bytes(1, 24, pcm24_bytes(samples)))
+    floats = tmp_path / "float.wav"
+    floats.write_bytes(wav_bytes(3, 32, (samples / 8388608.0).astype("<f4").tobytes()))
+
+    expected = analyse_wav_file(floats)
+    actual = analyse_wav_file(pcm24)
+
+    assert actual["duration_seconds"] == expected["duration_seconds"] == 3.0
+    assert actual["silence_ratio"] == expected["silence_ratio"] == pytest.approx(0.25, abs=0.01)
+    assert actual["rms_dbfs"] == pytest.approx(expected["rms_dbfs"], abs=1e-6)
+    assert actual["peak_dbfs"] == pytest.approx(expected["peak_dbfs"], abs=1e-6)
+
+
+def test_24_bit_extremes():
+    samples = np.array([-8388608, -1, 0, 1, 8388607])
+    data = wav_bytes(1, 24, pcm24_bytes(samples))
+
+    stats = analyse_wav_stream([data], len(data), window_seconds=1.0)
+
+    assert stats["peak_dbfs"] == pytest.approx(0.0)
+
+
+def test_encrypted_recording_matches_plain_recording(tmp_path):
+    wav = wav_bytes(1, 24, pcm24_bytes(tone()))
+    plain = tmp_path / "plain" / f"{NAME}.wav"
+    encrypted = tmp_path / "encrypted" / f"{NAME}.wav"
+    plain.parent.mkdir()
+    encrypted.parent.mkdir()
+    plain.write_bytes(wav)
+    encrypted.write_bytes(encrypt(wav))
+
+    expected = analyse_recording(plain)
+    actual = analyse_recording(encrypted, create_stream_key(KEY))
+
+    assert actual is not None and expected is not None
+    assert (actual.duration_seconds, actual.silence_ratio, actual.rms_dbfs) == (
+        expected.duration_seconds,
+        expected.silence_ratio,
+        expected.rms_dbfs,
+    )
+
+
+def test_encrypted_sidecar_larger_than_one_chunk(tmp_path):
+    metadata = {"recordingSid": "RE1", "notes": "".join(chr(ord("a") + index % 26) for index in range(3 << 20))}
+    recording = tmp_path / f"{NAME}.wav"
+    recording.with_suffix(".json").write_bytes(encrypt(json.dumps(metadata).encode("utf-8")))
+
+    assert load_sidecar(recording, create_stream_key(KEY)) == metadata
+
+
+def test_stream_rejects_a_missing_header_without_reading_the_whole_file():
+    consumed = []
+
+    def chunks():
+        for index in range(64):
+            consumed.append(index)
+            yield b"\0" * (MAX_HEADER_BYTES // 4)
+
+    with pytest.raises(WavFormatError):
+        analyse_wav_stream(chunks(), 64 * (MAX_HEADER_BYTES // 4))
+    assert len(consumed) == 4
+
+
+def test_unreadable_recordings_are_reported_and_counted(tmp_path, capsys):
+    recordings = tmp_path / "recordings"
+    recordings.mkdir()
+    (recordings / f"{NAME}.wav").write_bytes(wav_bytes(1, 24, pcm24_bytes(tone())))
+    (recordings / "0123456789abcdef_RE0000000000000000000000000000000b.wav").write_bytes(b"not a wav file")
+    run_report = RunReport(trace_memory=False)
+
+    summary = collect_recording_summary(tmp_path, run_report=run_report)
+
+    assert run_report.counts == {"recordings": 2, "unreadable_recordings": 1}
+    assert sum(row["Recording Count"] for row in summary.values()) == 1
+    assert "Cannot analyse recording 0123456789abcdef_RE0000000000000000000000000000000b.wav" in capsys.readouterr().err
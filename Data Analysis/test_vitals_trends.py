@@ -0,0 +1,121 @@
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Tests for vitals_trends.py: per-participant deltas, rolling windows and threshold flags."""
+from __future__ import annotations
+
+import math
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from generate_session_reports import AnswerRow, QuestionnaireResponseBundle
+from vitals_trends import (
+    FLAG_COLUMNS,
+    TrendThresholds,
+    build_vitals_trends,
+    compute_vitals_trends,
+    trend_columns,
+)
+
+NAN = math.nan
+
+# Participant, session, authored, systolic, diastolic, heart rate, weight.
+MEASUREMENTS = [
+    ("Patient/a", "a1", "2025-03-01 09:00", 120, 80, 70, 180.0),
+    ("Patient/a", "a2", "2025-03-02 09:00", 120, 80, 70, 182.4),  # +2.4 lb in one day
+    ("Patient/a", "a3", "2025-03-02 21:00", 145, 80, 70, NAN),  # high blood pressure, not weighed
+    ("Patient/a", "a4", "2025-03-04 09:00", 120, 80, 70, 183.5),  # +1.1 lb over two days
+    ("Patient/a", "a5", "2025-03-07 09:00", 120, 80, 70, 185.5),  # +5.5 lb over the week
+    ("Patient/a", "a6", "2025-03-10 09:00", 85, 60, 45, 185.0),  # low pressure and heart rate
+    ("Patient/b", "b1", "2025-03-03 09:00", 130, 92, 101, 150.0),
+]
+EXPECTED_FLAGS = {
+    "a1": set(),
+    "a2": {"Rapid Weight Gain"},
+    "a3": {"High Blood Pressure"},
+    "a4": set(),
+    "a5": {"Rapid Weight Gain"},
+    "a6": {"Low Blood Pressure", "Abnormal Heart Rate"},
+    "b1": {"High Blood Pressure", "Abnormal Heart Rate"},
+}
+
+
+def _vitals():
+    columns = ["Participant", "Session ID", "Authored", "Systolic (mmHg)", "Diastolic (mmHg)", "Heart Rate (bpm)", "Weight (lb)"]
+    frame = pd.DataFrame(list(reversed(MEASUREMENTS)), columns=columns)
+    frame["Authored"] = pd.to_datetime(frame["Authored"])
+    return frame
+
+
+def _by_session(trends):
+    return trends.set_index("Session ID")
+
+
+def test_series_are_ordered_per_participant_with_deltas():
+    trends = compute_vitals_trends(_vitals())
+
+    assert list(trends.columns) == trend_columns()
+    assert list(trends["Session ID"]) == ["a1", "a2", "a3", "a4", "a5", "a6", "b1"]
+    rows = _by_session(trends)
+    assert rows["Days Since Previous Call"].tolist()[:3] == pytest.approx([NAN, 1.0, 0.5], nan_ok=True)
+    assert math.isnan(rows.at["b1", "Days Since Previous Call"])
+    # Changes skip the participant's missing measurements.
+    assert rows["Weight (lb) Change"].tolist() == pytest.approx([NAN, 2.4, NAN, 1.1, 2.0, -0.5, NAN], nan_ok=True)
+    assert rows.at["a3", "Systolic (mmHg) Change"] == 25.0
+    assert rows.at["a2", "Weight (lb) 3-Call Mean"] == 181.2
+    assert rows.at["a6", "Weight (lb) 3-Call Mean"] == 184.7
+    assert rows["Weight Gain 7 Days (lb)"].tolist() == pytest.approx([0.0, 2.4, NAN, 3.5, 5.5, 1.5, 0.0], nan_ok=True)
+
+
+def test_threshold_flags():
+    rows = _by_session(compute_vitals_trends(_vitals()))
+
+    for session_id, expected in EXPECTED_FLAGS.items():
+        assert {flag for flag in FLAG_COLUMNS if rows.at[session_id, flag]} == expected, session_id
+
+
+def test_thresholds_are_configurable():
+    thresholds = TrendThresholds(daily_weight_gain_lb=3.0, weekly_weight_gain_lb=6.0, rolling_measurements=2)
+
+    trends = compute_vitals_trends(_vitals(), thresholds)
+
+    assert "Weight (lb) 2-Call Mean" in trends.columns
+    assert not trends["Rapid Weight Gain"].any()
+
+
+def _bundle(subject, authored, **values):
+    answers = [
+        AnswerRow("Patient Vitals", link_id, link_id, "", None, str(value), value) for link_id, value in values.items()
+    ]
+    return QuestionnaireResponseBundle("vital_signs", "Patient Vitals", authored, subject, answers)
+
+
+def test_build_skips_responses_that_cannot_be_placed_in_a_series():
+    sessions = {
+        "s1": [_bundle("Patient/a", "2025-03-01T09:00:00Z", weight=180, systolic="n/a")],
+        "s2": [_bundle("Patient/a", "2025-03-02T09:00:00Z", weight=182.5)],
+        "s3": [_bundle(None, "2025-03-03T09:00:00Z", weight=190)],
+        "s4": [_bundle("Patient/a", "not a time", weight=190)],
+        "s5": [_bundle("Patient/a", "2025-03-05T09:00:00Z", mood="good")],
+    }
+    timestamps = {
+        "2025-03-01T09:00:00Z": pd.Timestamp("2025-03-01 09:00"),
+        "2025-03-02T09:00:00Z": pd.Timestamp("2025-03-02 09:00"),
+        "2025-03-03T09:00:00Z": pd.Timestamp("2025-03-03 09:00"),
+        "not a time": None,
+        "2025-03-05T09:00:00Z": pd.Timestamp("2025-03-05 09:00"),
+    }
+
+    trends = build_vitals_trends(sessions, timestamps)
+
+    assert list(trends["Session ID"]) == ["s1", "s2"]
+    assert math.isnan(trends.at[0, "Systolic (mmHg)"])
+    assert trends.at[1, "Weight (lb) Change"] == 2.5
+    assert trends.at[1, "Rapid Weight Gain"]
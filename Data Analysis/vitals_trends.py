@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+#
+# This source file is part of the ENGAGE-HF-AI-Voice open source project
+#
+# SPDX-FileCopyrightText: 2025 Stanford University and the project authors (see CONTRIBUTORS.md)
+#
+# SPDX-License-Identifier: MIT
+#
+
+"""Longitudinal vitals trends per participant.
+
+Collects the systolic, diastolic, heart-rate and weight answers of the Patient
+Vitals questionnaire from every session, orders them by authored time within
+each participant (the response ``subject``), and computes with grouped pandas
+operations over the whole cohort at once:
+
+* the change since the participant's previous measurement of each vital and the
+  days since the previous call,
+* the mean over the participant's last few measurements of each vital,
+* the weight gain over the trailing seven days (against the lowest weight in that
+  window), and
+* flags for rapid weight gain, high or low blood pressure and an abnormal heart
+  rate.
+
+Responses without a subject or a parseable authored time cannot be placed in a
+series and are left out.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Vitals linkId -> column name.
+VITAL_COLUMNS = {
+    "systolic": "Systolic (mmHg)",
+    "diastolic": "Diastolic (mmHg)",
+    "heart-rate": "Heart Rate (bpm)",
+    "weight": "Weight (lb)",
+}
+WEIGHT_COLUMN = VITAL_COLUMNS["weight"]
+
+
+@dataclass(frozen=True)
+class TrendThresholds:
+    """Limits for the trend flags; the weight limits follow common heart-failure guidance."""
+
+    daily_weight_gain_lb: float = 2.0
+    weekly_weight_gain_lb: float = 5.0
+    systolic_high: float = 140.0
+    systolic_low: float = 90.0
+    diastolic_high: float = 90.0
+    heart_rate_high: float = 100.0
+    heart_rate_low: float = 50.0
+    rolling_measurements: int = 3
+
+
+FLAG_COLUMNS = ["Rapid Weight Gain", "High Blood Pressure", "Low Blood Pressure", "Abnormal Heart Rate"]
+
+
+def trend_columns(thresholds: TrendThresholds = TrendThresholds()) -> List[str]:
+    """Return the columns of :func:`compute_vitals_trends` in output order."""
+    window = thresholds.rolling_measurements
+    columns = ["Participant", "Session ID", "Authored", "Days Since Previous Call"]
+    for column in VITAL_COLUMNS.values():
+        columns += [column, f"{column} Change", f"{column} {window}-Call Mean"]
+    return columns + ["Weight Gain 7 Days (lb)"] + FLAG_COLUMNS
+
+
+def collect_vitals(
+    sessions: Mapping[str, Iterable[Any]],
+    timestamps: Mapping[str, Optional[pd.Timestamp]],
+) -> pd.DataFrame:
+    """Return one row per vitals response with its participant, session, time and values."""
+    records: List[Dict[str, Any]] = []
+    for session_id, bundles in sessions.items():
+        for bundle in bundles:
+            if not bundle.subject or not bundle.authored:
+                continue
+            values: Dict[str, Any] = {}
+            for answer in bundle.answers:
+                column = VITAL_COLUMNS.get(answer.link_id)
+                if column is not None and answer.raw_value is not None:
+                    values[column] = answer.raw_value
+            if not values:
+                continue
+            authored = timestamps.get(bundle.authored)
+            if authored is None:
+                continue
+            values.update({"Participant": bundle.subject, "Session ID": session_id, "Authored": authored})
+            records.append(values)
+
+    frame = pd.DataFrame.from_records(
+        records,
+        columns=["Participant", "Session ID", "Authored"] + list(VITAL_COLUMNS.values()),
+    )
+    for column in VITAL_COLUMNS.values():
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").astype(np.float64)
+    frame["Authored"] = pd.to_datetime(frame["Authored"])
+    return frame
+
+
+def _previous(values: pd.Series, participants: pd.Series) -> pd.Series:
+    """The participant's last non-missing value before each row."""
+    return values.groupby(participants).ffill().groupby(participants).shift()
+
+
+def compute_vitals_trends(vitals: pd.DataFrame, thresholds: TrendThresholds = TrendThresholds()) -> pd.DataFrame:
+    """Compute per-participant deltas, rolling means and flags for a :func:`collect_vitals` frame."""
+    frame = vitals.sort_values(["Participant", "Authored", "Session ID"], kind="stable").reset_index(drop=True)
+    groups = frame.groupby("Participant", sort=False)
+    window = thresholds.rolling_measurements
+
+    frame["Days Since Previous Call"] = (groups["Authored"].diff().dt.total_seconds() / 86400.0).round(2)
+    for column in VITAL_COLUMNS.values():
+        frame[f"{column} Change"] = (frame[column] - _previous(frame[column], frame["Participant"])).round(1)
+        rolling = groups[column].rolling(window, min_periods=1).mean()
+        frame[f"{column} {window}-Call Mean"] = rolling.reset_index(level=0, drop=True).round(1)
+
+    # Lowest weight over the trailing seven days, per participant. The time-based window is
+    # indexed by timestamp, so it is aligned by position: rows are already grouped and sorted.
+    weekly_low = groups.rolling("7D", on="Authored")[WEIGHT_COLUMN].min().to_numpy()
+    frame["Weight Gain 7 Days (lb)"] = (frame[WEIGHT_COLUMN] - weekly_low).round(1)
+
+    # Gains between weighings less than a day apart count as gained within one day.
+    weighed_at = frame["Authored"].where(frame[WEIGHT_COLUMN].notna())
+    days_between_weighings = (weighed_at - _previous(weighed_at, frame["Participant"])).dt.total_seconds() / 86400.0
+    daily_gain = frame[f"{WEIGHT_COLUMN} Change"] / days_between_weighings.clip(lower=1.0)
+
+    systolic = frame[VITAL_COLUMNS["systolic"]]
+    diastolic = frame[VITAL_COLUMNS["diastolic"]]
+    heart_rate = frame[VITAL_COLUMNS["heart-rate"]]
+    frame["Rapid Weight Gain"] = (daily_gain >= thresholds.daily_weight_gain_lb) | (
+        frame["Weight Gain 7 Days (lb)"] >= thresholds.weekly_weight_gain_lb
+    )
+    frame["High Blood Pressure"] = (systolic >= thresholds.systolic_high) | (diastolic >= thresholds.diastolic_high)
+    frame["Low Blood Pressure"] = systolic < thresholds.systolic_low
+    frame["Abnormal Heart Rate"] = (heart_rate > thresholds.heart_rate_high) | (heart_rate < thresholds.heart_rate_low)
+
+    return frame[trend_columns(thresholds)]
+
+
+def build_vitals_trends(
+    sessions: Mapping[str, Iterable[Any]],
+    timestamps: Mapping[str, Optional[pd.Timestamp]],
+    thresholds: TrendThresholds = TrendThresholds(),
+) -> pd.DataFrame:
+    """Collect the vitals of every session and return the per-participant trend table."""
+    return compute_vitals_trends(collect_vitals(sessions, timestamps), thresholds)